@@ -0,0 +1,200 @@
+"""
+CLI cold-start benchmark: launches `nexon <command>` in a fresh interpreter
+against a fixture NEXON_BASE_DIR, repeatedly, and records the `-X importtime`
+breakdown of each command. Exits 1 when a command's median exceeds its budget.
+
+Budgets are milliseconds on top of a bare interpreter start (`python -c pass`,
+measured in the same run) so that slow machines or heavy site-packages don't
+trip them; --gross applies them to the raw wall time instead.
+
+    PYTHONPATH=src python benchmarks/bench_cli_startup.py --output startup.json
+    PYTHONPATH=src python benchmarks/bench_cli_startup.py --budget activate-env=60 --budget run=80
+    PYTHONPATH=src python benchmarks/bench_cli_startup.py --budgets budgets.json --gross
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List
+
+import yaml
+
+# Command label -> argv after `nexon`
+COMMANDS: Dict[str, List[str]] = {
+    "--help": ["--help"],
+    "list-envs": ["list-envs"],
+    "activate-env": ["activate-env", "bench"],
+    "env-file": ["env-file", "bench"],
+    "run": ["run", "bench", "noop"],
+}
+
+# Default budgets (ms over a bare interpreter start). typer and rich alone cost ~40-60 ms
+# of imports, so the hot commands sit at ~130-150 ms here; `run` also parses every
+# package.yaml of the environment for its recipes. --help renders every command's help,
+# so it imports every command module (kubernetes, textual, pydantic...: ~1.1-1.4 s).
+DEFAULT_BUDGETS: Dict[str, float] = {
+    "--help": 1700,
+    "list-envs": 170,
+    "activate-env": 170,
+    "env-file": 170,
+    "run": 200,
+}
+
+# Same entry point as the `nexon` console script
+ENTRY = "import sys; from nexon_cli.cli import cli; sys.argv[0] = 'nexon'; cli()"
+
+
+def make_fixture(base: Path, packages: int = 20):
+    """A NEXON_BASE_DIR with `packages` packages (env vars + a recipe) and one environment using all of them."""
+    names = []
+    for i in range(packages):
+        name, version = f"pkg{i}", "1.0.0"
+        ver_dir = base / "packages" / name / version
+        ver_dir.mkdir(parents=True)
+        (ver_dir / "package.yaml").write_text(yaml.safe_dump({
+            "name": name,
+            "version": version,
+            "requires": [],
+            "env": {"PATH": "{root}/bin:{PATH}", "PYTHONPATH": "{root}/python", f"PKG{i}_ROOT": "{root}"},
+            "commands": {"noop": "true"} if i == 0 else {},
+        }), encoding="utf-8")
+        names.append(f"{name}-{version}")
+    (base / "environments").mkdir(parents=True)
+    (base / "environments" / "bench.yaml").write_text(yaml.safe_dump({
+        "name": "bench", "role": "bench", "packages": names,
+    }), encoding="utf-8")
+
+
+def launch(argv: List[str], env: Dict[str, str]) -> float:
+    """Wall time of one fresh-interpreter launch, in ms."""
+    start = time.perf_counter()
+    proc = subprocess.run(argv, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+    elapsed = (time.perf_counter() - start) * 1000
+    if proc.returncode != 0:
+        raise RuntimeError(f"{' '.join(argv)} exited {proc.returncode}:\n{proc.stderr.decode(errors='replace')}")
+    return elapsed
+
+
+def timings(argv: List[str], env: Dict[str, str], repeat: int, warmup: int) -> Dict[str, float]:
+    for _ in range(warmup):
+        launch(argv, env)
+    samples = [launch(argv, env) for _ in range(repeat)]
+    return {
+        "runs": repeat,
+        "min_ms": round(min(samples), 2),
+        "median_ms": round(statistics.median(samples), 2),
+        "mean_ms": round(statistics.fmean(samples), 2),
+    }
+
+
+def import_profile(args: List[str], env: Dict[str, str], top: int) -> dict:
+    """Parse `python -X importtime` output: total, slowest top-level imports and self time per distribution."""
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", ENTRY, *args], env=env,
+                          stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+    modules, by_package = [], {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip())) // 2
+        name = name.strip()
+        package = name.split(".")[0]
+        by_package[package] = by_package.get(package, 0) + int(self_us) / 1000
+        modules.append({"module": name, "depth": depth, "self_ms": int(self_us) / 1000,
+                        "cumulative_ms": int(cumulative_us) / 1000})
+    roots = [m for m in modules if m["depth"] == 0]
+    return {
+        "modules": len(modules),
+        "total_ms": round(sum(m["cumulative_ms"] for m in roots), 2),
+        "slowest": sorted(roots, key=lambda m: m["cumulative_ms"], reverse=True)[:top],
+        "by_package": dict(sorted(((k, round(v, 2)) for k, v in by_package.items()),
+                                  key=lambda item: item[1], reverse=True)[:top]),
+    }
+
+
+def run_suite(base: Path, args: argparse.Namespace, budgets: Dict[str, float]) -> dict:
+    make_fixture(base, args.packages)
+    env = dict(os.environ, NEXON_BASE_DIR=str(base))
+    # Let the child find nexon_cli the same way this process did
+    env["PYTHONPATH"] = os.pathsep.join(p for p in sys.path if p)
+
+    interpreter = timings([sys.executable, "-c", "pass"], env, args.repeat, args.warmup)
+    results = {}
+    for label, argv in COMMANDS.items():
+        if args.command and label not in args.command:
+            continue
+        result = timings([sys.executable, "-c", ENTRY, *argv], env, args.repeat, args.warmup)
+        result["net_ms"] = round(result["median_ms"] - (0 if args.gross else interpreter["median_ms"]), 2)
+        result["budget_ms"] = budgets.get(label)
+        result["over_budget"] = result["budget_ms"] is not None and result["net_ms"] > result["budget_ms"]
+        result["imports"] = import_profile(argv, env, args.top)
+        results[label] = result
+
+    return {
+        "benchmark": "cli_startup",
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "parameters": {"repeat": args.repeat, "warmup": args.warmup, "packages": args.packages, "gross": args.gross},
+        "interpreter": interpreter,
+        "results": results,
+    }
+
+
+def parse_budgets(args: argparse.Namespace) -> Dict[str, float]:
+    budgets = dict(DEFAULT_BUDGETS)
+    if args.budgets:
+        budgets.update(json.loads(args.budgets.read_text(encoding="utf-8")))
+    for item in args.budget:
+        label, _, ms = item.rpartition("=")
+        if label not in COMMANDS:
+            raise SystemExit(f"Unknown command in --budget {item!r}; expected one of {', '.join(COMMANDS)}")
+        budgets[label] = float(ms)
+    return budgets
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=10, help="Timed launches per command")
+    parser.add_argument("--warmup", type=int, default=2, help="Untimed launches first (fills OS caches, .pyc files)")
+    parser.add_argument("--packages", type=int, default=20, help="Packages in the fixture environment")
+    parser.add_argument("--command", action="append", choices=list(COMMANDS),
+                        help="Only benchmark this command (repeatable)")
+    parser.add_argument("--budget", action="append", default=[], metavar="COMMAND=MS",
+                        help="Override one command's budget (repeatable)")
+    parser.add_argument("--budgets", type=Path, help="JSON file of {command: ms} budgets")
+    parser.add_argument("--gross", action="store_true", help="Apply budgets to raw wall time, not net of interpreter start")
+    parser.add_argument("--top", type=int, default=15, help="Slowest imports to keep per command")
+    parser.add_argument("--output", type=Path, help="Write the JSON results here instead of stdout")
+    args = parser.parse_args()
+    budgets = parse_budgets(args)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        report = run_suite(Path(tmp), args, budgets)
+
+    print(f"{'interpreter':<14} {report['interpreter']['median_ms']:9.1f} ms", file=sys.stderr)
+    for label, result in report["results"].items():
+        budget = f"{result['budget_ms']:.0f}" if result["budget_ms"] is not None else "-"
+        slowest = ", ".join(f"{m['module']} {m['cumulative_ms']:.0f}"
+                            for m in result["imports"]["slowest"][:3])
+        print(f"{label:<14} {result['median_ms']:9.1f} ms  net {result['net_ms']:8.1f} / {budget:>5} ms"
+              f"{'  OVER BUDGET' if result['over_budget'] else ''}  [{slowest}]", file=sys.stderr)
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        args.output.write_text(text + "\n", encoding="utf-8")
+    else:
+        print(text)
+
+    if any(result["over_budget"] for result in report["results"].values()):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
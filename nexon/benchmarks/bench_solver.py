@@ -0,0 +1,162 @@
+"""
+Resolver benchmark suite: generates a synthetic package universe and times
+catalog refreshes, list_packages, resolve, resolve_all and build_graph.
+Results are written as JSON so that runs can be compared across releases.
+
+    PYTHONPATH=src python benchmarks/bench_solver.py --packages 5000 --depth 10 --output current.json
+    PYTHONPATH=src python benchmarks/bench_solver.py --packages 5000 --depth 10 --compare baseline.json
+"""
+import argparse
+import contextlib
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, Dict, Optional
+
+from universe import add_universe_arguments, universe_from_args
+
+
+def measure(fn: Callable, repeat: int, setup: Optional[Callable] = None, per_call: int = 1) -> Dict[str, float]:
+    """Time `fn(setup())` `repeat` times; `setup` is not timed. Times are per call, in ms."""
+    samples = []
+    for _ in range(repeat):
+        arg = setup() if setup else None
+        start = time.perf_counter()
+        fn(arg)
+        samples.append((time.perf_counter() - start) * 1000 / per_call)
+    return {
+        "runs": repeat,
+        "min_ms": round(min(samples), 4),
+        "median_ms": round(statistics.median(samples), 4),
+        "mean_ms": round(statistics.fmean(samples), 4),
+    }
+
+
+def backdate(root: Path, window_ns: int):
+    """
+    Move every mtime under `root` before the catalog's racy window: a freshly
+    generated package.yaml is otherwise re-hashed on every refresh, and the
+    warm numbers would measure near-cold scans.
+    """
+    past = time.time_ns() - 2 * window_ns
+    for dirpath, _, filenames in os.walk(root):
+        for name in filenames:
+            os.utime(os.path.join(dirpath, name), ns=(past, past))
+        os.utime(dirpath, ns=(past, past))
+
+
+def run_suite(base: Path, args: argparse.Namespace) -> dict:
+    # NEXON_BASE_DIR is read at import time: point it at the scratch tree first
+    os.environ["NEXON_BASE_DIR"] = str(base)
+    from nexon_cli.core import dependency_solver
+    from nexon_cli.core.dependency_solver import DependencySolver
+    from nexon_cli.core.package_catalog import PackageCatalog
+    from nexon_cli.core.package_manager import PackageManager
+
+    packages_dir = base / "packages"
+    universe = universe_from_args(packages_dir, args)
+    backdate(packages_dir, PackageCatalog.RACY_WINDOW_NS)
+    roots = [f"p{i}" for i in range(min(args.roots, args.packages))]
+    index = base / "catalog.db"
+    scratch_indexes = iter(base / f"catalog-cold-{i}.db" for i in range(args.repeat))
+
+    def solver(cache: bool = False) -> DependencySolver:
+        s = DependencySolver(packages_dir, lazy=False)
+        s.catalog.index_path = index
+        s._load_definitions()
+        if not cache:
+            s.cache.max_entries = 0
+        return s
+
+    def cold_lazy_solver() -> DependencySolver:
+        dependency_solver._spec_cache.clear()
+        return DependencySolver(packages_dir, lazy=True)
+
+    def warm_cache() -> DependencySolver:
+        s = solver(cache=True)
+        s.resolve_all(roots)
+        return s
+
+    # The warm measurements time an up-to-date index, not the scan that builds it
+    PackageCatalog(packages_dir, index_path=index, jobs=args.jobs).refresh()
+    results = {
+        "catalog_cold": measure(
+            lambda c: c.refresh(), args.repeat,
+            setup=lambda: PackageCatalog(packages_dir, index_path=next(scratch_indexes), jobs=args.jobs)
+        ),
+        "catalog_warm": measure(
+            lambda c: c.refresh(), args.repeat,
+            setup=lambda: PackageCatalog(packages_dir, index_path=index, jobs=args.jobs)
+        ),
+        "list_packages": measure(lambda pm: pm.list_packages(), args.repeat, setup=PackageManager),
+        "resolve": measure(
+            lambda s: [s.resolve(f"p{i}<{args.versions}.0") for i in range(args.packages)],
+            args.repeat, setup=solver, per_call=args.packages
+        ),
+        "resolve_all": measure(lambda s: s.resolve_all(roots), args.repeat, setup=solver),
+        "build_graph": measure(lambda s: s.build_graph(roots), args.repeat, setup=solver),
+        "resolve_all_cached": measure(lambda s: s.resolve_all(roots), args.repeat, setup=warm_cache),
+        "resolve_all_lazy_cold": measure(lambda s: s.resolve_all(roots), args.repeat, setup=cold_lazy_solver),
+    }
+    closure = solver().resolve_all(roots)
+    return {
+        "benchmark": "solver",
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "parameters": {k: v for k, v in vars(args).items() if k not in ("output", "compare", "threshold")},
+        "universe": dict(universe, closure=len(closure)),
+        "results": results,
+    }
+
+
+def compare(current: dict, baseline: dict, threshold: float) -> bool:
+    """Print median ratios against a baseline run; returns False if any exceeds `threshold`."""
+    ok = True
+    for name, result in current["results"].items():
+        before = baseline.get("results", {}).get(name)
+        if not before or not before["median_ms"]:
+            continue
+        ratio = result["median_ms"] / before["median_ms"]
+        flag = "REGRESSION" if ratio > threshold else ""
+        ok &= ratio <= threshold
+        print(f"{name:<24} {before['median_ms']:10.2f} -> {result['median_ms']:10.2f} ms  x{ratio:5.2f} {flag}",
+              file=sys.stderr)
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    add_universe_arguments(parser)
+    parser.add_argument("--roots", type=int, default=10, help="Number of top-level requirements")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per measurement")
+    parser.add_argument("--jobs", type=int, default=0, help="Catalog parser workers (0 = auto)")
+    parser.add_argument("--output", type=Path, help="Write the JSON results here instead of stdout")
+    parser.add_argument("--compare", type=Path, help="Baseline JSON to compare medians against")
+    parser.add_argument("--threshold", type=float, default=1.25,
+                        help="Slowdown ratio reported as a regression (exit code 1)")
+    args = parser.parse_args()
+
+    # Keep stdout clean for the JSON report: nexon's own logging goes to stderr
+    with tempfile.TemporaryDirectory() as tmp, contextlib.redirect_stdout(sys.stderr):
+        report = run_suite(Path(tmp), args)
+
+    for name, result in report["results"].items():
+        print(f"{name:<24} {result['median_ms']:10.2f} ms (min {result['min_ms']:.2f})", file=sys.stderr)
+    text = json.dumps(report, indent=2)
+    if args.output:
+        args.output.write_text(text + "\n", encoding="utf-8")
+    else:
+        print(text)
+
+    if args.compare and not compare(report, json.loads(args.compare.read_text(encoding="utf-8")), args.threshold):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
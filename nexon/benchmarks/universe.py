@@ -0,0 +1,100 @@
+"""
+Synthetic PACKAGES_DIR trees for benchmarks.
+
+    PYTHONPATH=src python benchmarks/universe.py /tmp/universe --packages 5000 --depth 8
+"""
+import argparse
+import random
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+from nexon_cli.utils.file_ops import save_yaml
+
+# Requirement styles; every one of them admits the planted target version
+SPECIFIER_STYLES = ("open", "lower", "upper", "range", "compatible", "exact", "exclude")
+DEFAULT_STYLES = ("open", "lower", "upper", "range", "compatible")
+
+
+def _requirement(rng: random.Random, dep: str, target: int, versions: int, styles: Sequence[str]) -> str:
+    style = rng.choice(styles)
+    if style == "lower":
+        return f"{dep}>={rng.randint(1, target)}.0"
+    if style == "upper":
+        return f"{dep}<{rng.randint(target, versions) + 1}.0"
+    if style == "range":
+        return f"{dep}>={rng.randint(1, target)}.0,<{rng.randint(target, versions) + 1}.0"
+    if style == "compatible":
+        return f"{dep}~={target}.0"
+    if style == "exact":
+        return f"{dep}-{target}.0"
+    if style == "exclude" and versions > 1:
+        return f"{dep}!={rng.choice([v for v in range(1, versions + 1) if v != target])}.0"
+    return dep
+
+
+def generate_universe(root: Path, packages: int, versions: int, fanout: int, seed: int = 0,
+                      depth: Optional[int] = None, styles: Sequence[str] = DEFAULT_STYLES) -> Dict[str, int]:
+    """
+    Write a DAG of `packages` packages p0..p<n-1> with `versions` versions each.
+
+    Every version of p<i> requires up to `fanout` packages p<j> with j > i.
+    With `depth`, packages are split into that many layers and only require
+    packages of the next layer, so the longest chain has `depth` packages.
+    A hidden target version is planted for every package and all specifiers
+    admit it, so a solution always exists, but the newest versions usually do
+    not fit together.
+    Returns a summary of what was written.
+    """
+    unknown = set(styles) - set(SPECIFIER_STYLES)
+    if unknown:
+        raise ValueError(f"Unknown specifier styles: {sorted(unknown)}")
+    rng = random.Random(seed)
+    target = [rng.randint(1, versions) for _ in range(packages)]
+    layers = max(1, min(depth or packages, packages))
+    layer_of = [i * layers // packages for i in range(packages)]
+    by_layer: Dict[int, List[int]] = {}
+    for i, layer in enumerate(layer_of):
+        by_layer.setdefault(layer, []).append(i)
+
+    edges = 0
+    for i in range(packages):
+        if depth:
+            pool = by_layer.get(layer_of[i] + 1, [])
+        else:
+            pool = range(i + 1, packages)
+        for v in range(1, versions + 1):
+            deps = rng.sample(pool, min(fanout, len(pool)))
+            requires = [_requirement(rng, f"p{j}", target[j], versions, styles) for j in deps]
+            edges += len(requires)
+            ver_dir = root / f"p{i}" / f"{v}.0"
+            ver_dir.mkdir(parents=True, exist_ok=True)
+            save_yaml(ver_dir / "package.yaml", {"name": f"p{i}", "version": f"{v}.0", "requires": requires})
+    return {"packages": packages, "versions": packages * versions, "edges": edges, "layers": layers}
+
+
+def add_universe_arguments(parser: argparse.ArgumentParser):
+    """Command-line options shared by the benchmarks that generate a universe."""
+    parser.add_argument("--packages", type=int, default=1000)
+    parser.add_argument("--versions", type=int, default=5, help="Versions per package")
+    parser.add_argument("--fanout", type=int, default=3, help="Requirements per package version")
+    parser.add_argument("--depth", type=int, default=None, help="Number of dependency layers (default: unlayered)")
+    parser.add_argument("--styles", default=",".join(DEFAULT_STYLES),
+                        help=f"Comma-separated specifier styles out of {', '.join(SPECIFIER_STYLES)}")
+    parser.add_argument("--seed", type=int, default=0)
+
+
+def universe_from_args(root: Path, args: argparse.Namespace) -> Dict[str, int]:
+    return generate_universe(root, args.packages, args.versions, args.fanout, args.seed,
+                             depth=args.depth, styles=args.styles.split(","))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("root", type=Path, help="Directory to write the packages into")
+    add_universe_arguments(parser)
+    args = parser.parse_args()
+    print(universe_from_args(args.root, args))
+
+
+if __name__ == "__main__":
+    main()
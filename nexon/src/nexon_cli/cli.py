@@ -1,183 +1,178 @@
 # nexon_cli/cli.py
+import importlib
 import time
+from collections.abc import Mapping
+from typing import Dict, Tuple
 
 import typer
-
-# Core commands
-from nexon_cli.commands.create_env import create_env
-from nexon_cli.commands.activate_env import activate_env
-from nexon_cli.commands.deactivate_env import deactivate_env
-from nexon_cli.commands.diff_env import diff_env
-from nexon_cli.commands.wrap_tool import wrap_tool
-
-from nexon_cli.commands.build_docker import build_docker_cmd
-
-from nexon_cli.commands.install_package import install_package
-from nexon_cli.commands.uninstall_package import uninstall_package
-from nexon_cli.commands.list_envs import list_envs
-from nexon_cli.commands.list_packages import list_packages
-from nexon_cli.commands.detect_hardware import detect_hardware
-from nexon_cli.commands.launch_app import launch_app
-
-# Workspace commands
-from nexon_cli.commands.workspace_create import workspace_create
-from nexon_cli.commands.workspace_link import workspace_link
-from nexon_cli.commands.workspace_list import workspace_list
-
-# Recipe commands
-from nexon_cli.commands.list_recipes import list_recipes_cmd
-from nexon_cli.commands.apply_recipe import apply_recipe_cmd
-
-# Package commands
-from nexon_cli.commands.create_package import create_package_cmd
-
-# Lock and build
-from nexon_cli.commands.lock_env import lock_env
-from nexon_cli.commands.build_package import build_package_cmd
-
-from nexon_cli.commands.render_submit import submit_render_cmd
-from nexon_cli.commands.ci_run import ci_run_cmd
-
-# Layers commands
-from nexon_cli.commands.create_layer import create_layer
-from nexon_cli.commands.list_layers import list_layers
-from nexon_cli.commands.show_effective import show_effective
-
-from nexon_cli.commands.shell import shell_cmd
-from nexon_cli.commands.completion import completion
-
-from nexon_cli.commands.env_file import env_file
-
-from nexon_cli.commands.bump_version import bump_version
-from nexon_cli.commands.build_release import build_release
-
-from nexon_cli.commands.security_scan import security_scan
-
-from nexon_cli.commands.shot_context import shot_context_cmd
-from nexon_cli.commands.p4_sync import p4_sync_cmd
-
-from nexon_cli.commands.cluster_deploy import cluster_deploy
-from nexon_cli.commands.cluster_destroy import cluster_destroy
-from nexon_cli.commands.cluster_list import cluster_list
-
-from nexon_cli.commands.cluster_expose import cluster_expose
-from nexon_cli.commands.cluster_autoscale import cluster_autoscale
-from nexon_cli.commands.cluster_unautoscale import cluster_unautoscale
-
-from nexon_cli.commands.policy_validate import policy_validate
-from nexon_cli.commands.policy_report import policy_report
-
-from nexon_cli.commands.backup_all import backup_all_cmd
-from nexon_cli.commands.restore_backup import restore_cmd
-from nexon_cli.commands.backup_schedule import backup_schedule_cmd
-
-from nexon_cli.commands.run import run_cmd
-
-from nexon_cli.commands.import_pypi import import_pypi
-from nexon_cli.commands.import_wheel import import_wheel
-
-import nexon_cli.commands.plugin as plugin_cmds
-import nexon_cli.commands.token as token_cmds
-import nexon_cli.commands.notify_send as notify_cmds
-import nexon_cli.commands.license as license_cmds
-import nexon_cli. commands.marketplace as marketplace_cmds
-import nexon_cli.commands.pipeline as pipeline_cmds
-import nexon_cli.commands.init as init_cmds
-import nexon_cli.commands.snapshot as snapshot_cmds
+from pathlib import Path
+from typer.core import TyperCommand, TyperGroup
+from typer.models import TyperInfo
 
 from nexon_cli.core.sentry_integration import init_sentry
-from nexon_cli.core.metrics_cli import record_cli_metrics, push_metrics
-from nexon_cli.core.tenant_manager import CLITenantManager
-
-import nexon_cli.commands.tutorial as tutorial_cmds
-import nexon_cli.commands.generate_sdk as generate_sdk_cmds
-
-# before any commands run
-init_sentry()
-
-cli = typer.Typer(help="Nexon: Next-Gen Multimedia Environment Manager")
+from nexon_cli.utils import profiler
 
-# Register commands
-cli.command(name="create-env")(create_env)
-cli.command(name="activate-env")(activate_env)
-cli.command(name="deactivate-env")(deactivate_env)
-cli.command(name="diff-env")(diff_env)
+# Commands are imported when they are invoked, not at startup: the command modules pull in
+# kubernetes, celery, jinja2, requests, textual... which `nexon activate-env` never needs.
+# name -> "module:function"
+COMMANDS: Dict[str, str] = {
+    "create-env": "nexon_cli.commands.create_env:create_env",
+    "activate-env": "nexon_cli.commands.activate_env:activate_env",
+    "deactivate-env": "nexon_cli.commands.deactivate_env:deactivate_env",
+    "diff-env": "nexon_cli.commands.diff_env:diff_env",
+
+    "build-package": "nexon_cli.commands.build_package:build_package_cmd",
+    "build-docker": "nexon_cli.commands.build_docker:build_docker_cmd",
+    "wrap-tool": "nexon_cli.commands.wrap_tool:wrap_tool",
+    "prune-blobs": "nexon_cli.commands.prune_blobs:prune_blobs",
+
+    "create-package": "nexon_cli.commands.create_package:create_package_cmd",
+    "install-package": "nexon_cli.commands.install_package:install_package",
+    "uninstall-package": "nexon_cli.commands.uninstall_package:uninstall_package",
+
+    "list-envs": "nexon_cli.commands.list_envs:list_envs",
+    "list-packages": "nexon_cli.commands.list_packages:list_packages",
+    "refresh-catalog": "nexon_cli.commands.refresh_catalog:refresh_catalog",
+
+    "detect-hardware": "nexon_cli.commands.detect_hardware:detect_hardware",
+
+    "workspace-create": "nexon_cli.commands.workspace_create:workspace_create",
+    "workspace-link": "nexon_cli.commands.workspace_link:workspace_link",
+    "workspace-list": "nexon_cli.commands.workspace_list:workspace_list",
+
+    "list-recipes": "nexon_cli.commands.list_recipes:list_recipes_cmd",
+    "apply-recipe": "nexon_cli.commands.apply_recipe:apply_recipe_cmd",
+
+    "lock-env": "nexon_cli.commands.lock_env:lock_env",
+    "env-file": "nexon_cli.commands.env_file:env_file",
+
+    "render-submit": "nexon_cli.commands.render_submit:submit_render_cmd",
+    "ci-run": "nexon_cli.commands.ci_run:ci_run_cmd",
 
-cli.command(name="build-package")(build_package_cmd)
-cli.command(name="build-docker")(build_docker_cmd)
-cli.command(name="wrap-tool")(wrap_tool)
+    "create-layer": "nexon_cli.commands.create_layer:create_layer",
+    "list-layers": "nexon_cli.commands.list_layers:list_layers",
+    "show-effective": "nexon_cli.commands.show_effective:show_effective",
 
-cli.command(name="create-package")(create_package_cmd)
-cli.command(name="install-package")(install_package)
-cli.command(name="uninstall-package")(uninstall_package)
+    "shell": "nexon_cli.commands.shell:shell_cmd",
+    "completion": "nexon_cli.commands.completion:completion",
 
-cli.command(name="list-envs")(list_envs)
-cli.command(name="list-packages")(list_packages)
+    "bump-version": "nexon_cli.commands.bump_version:bump_version",
+    "build-release": "nexon_cli.commands.build_release:build_release",
 
-cli.command(name="detect-hardware")(detect_hardware)
-# cli.command(name="launch-app")(launch_app)
+    "security-scan": "nexon_cli.commands.security_scan:security_scan",
 
-cli.command(name="workspace-create")(workspace_create)
-cli.command(name="workspace-link")(workspace_link)
-cli.command(name="workspace-list")(workspace_list)
+    "shot-context": "nexon_cli.commands.shot_context:shot_context_cmd",
+    "p4-sync": "nexon_cli.commands.p4_sync:p4_sync_cmd",
 
-cli.command(name="list-recipes")(list_recipes_cmd)
-cli.command(name="apply-recipe")(apply_recipe_cmd)
+    "cluster-deploy": "nexon_cli.commands.cluster_deploy:cluster_deploy",
+    "cluster-destroy": "nexon_cli.commands.cluster_destroy:cluster_destroy",
+    "cluster-list": "nexon_cli.commands.cluster_list:cluster_list",
+
+    "cluster-expose": "nexon_cli.commands.cluster_expose:cluster_expose",
+
+    "cluster-autoscale": "nexon_cli.commands.cluster_autoscale:cluster_autoscale",
+    "cluster-unautoscale": "nexon_cli.commands.cluster_unautoscale:cluster_unautoscale",
+
+    "policy-validate": "nexon_cli.commands.policy_validate:policy_validate",
+    "policy-report": "nexon_cli.commands.policy_report:policy_report",
+
+    "backup-all": "nexon_cli.commands.backup_all:backup_all_cmd",
+    "restore": "nexon_cli.commands.restore_backup:restore_cmd",
+    "backup-schedule": "nexon_cli.commands.backup_schedule:backup_schedule_cmd",
+    "launch-app": "nexon_cli.commands.launch_app:launch_app",
+
+    "run": "nexon_cli.commands.run:run_cmd",
+
+    "import-pypi": "nexon_cli.commands.import_pypi:import_pypi",
+    "import-wheel": "nexon_cli.commands.import_wheel:import_wheel",
+}
+
+# name -> ("module:typer_app", help)
+GROUPS: Dict[str, Tuple[str, str]] = {
+    "plugin": ("nexon_cli.commands.plugin:app", "Manage plugins"),
+    "token": ("nexon_cli.commands.token:app", "Manage API tokens"),
+    "notify": ("nexon_cli.commands.notify_send:app", "Broadcast real-time toasts"),
+    "license": ("nexon_cli.commands.license:app", "Studio licensing"),
+    "marketplace": ("nexon_cli.commands.marketplace:app", "Browse/install micro-tools"),
+    "pipeline": ("nexon_cli.commands.pipeline:app", "Pipeline template"),
+    "init": ("nexon_cli.commands.init:app", "Quickstart new project"),
+    "snapshot": ("nexon_cli.commands.snapshot:app", "Snapshots (create/list/restore)"),
+
+    "tutorial": ("nexon_cli.commands.tutorial:app", "Interactive in-terminal tutorial"),
+    "generate-sdk": ("nexon_cli.commands.generate_sdk:app", "Generate SDK client from OpenAPI"),
+}
+
+
+def _load_command(name: str) -> TyperCommand | TyperGroup:
+    """Import the module behind `name` and build its click command."""
+    if name in GROUPS:
+        target, help_text = GROUPS[name]
+    else:
+        target, help_text = COMMANDS[name], None
+    module, attr = target.split(":")
+    obj = getattr(importlib.import_module(module), attr)
+    if isinstance(obj, typer.Typer):
+        return typer.main.get_group_from_info(
+            TyperInfo(obj, name=name, help=help_text),
+            pretty_exceptions_short=obj.pretty_exceptions_short,
+            rich_markup_mode=obj.rich_markup_mode,
+            suggest_commands=obj.suggest_commands,
+        )
+    single = typer.Typer(add_completion=False)
+    single.command(name=name)(obj)
+    return typer.main.get_command(single)
 
-cli.command(name="lock-env")(lock_env)
-cli.command(name="env-file")(env_file)
 
-cli.command(name="render-submit")(submit_render_cmd)
-cli.command(name="ci-run")(ci_run_cmd)
+class LazyCommands(Mapping):
+    """Subcommand mapping that lists every registered name but builds commands on first lookup."""
 
-cli.command(name="create-layer")(create_layer)
-cli.command(name="list-layers")(list_layers)
-cli.command(name="show-effective")(show_effective)
+    def __init__(self, loaded: dict):
+        self._loaded = dict(loaded)
 
-cli.command(name="shell")(shell_cmd)
-cli.command(name="completion")(completion)
+    def __getitem__(self, name):
+        if name not in self._loaded:
+            if name not in COMMANDS and name not in GROUPS:
+                raise KeyError(name)
+            self._loaded[name] = _load_command(name)
+        return self._loaded[name]
 
-cli.command(name="bump-version")(bump_version)
-cli.command(name="build-release")(build_release)
+    def __setitem__(self, name, cmd):
+        self._loaded[name] = cmd
 
-cli.command(name="security-scan")(security_scan)
+    def __iter__(self):
+        yield from self._loaded
+        yield from (name for name in (*COMMANDS, *GROUPS) if name not in self._loaded)
 
-cli.command(name="shot-context")(shot_context_cmd)
-cli.command(name="p4-sync")(p4_sync_cmd)
+    def __len__(self):
+        return len(set(self._loaded) | set(COMMANDS) | set(GROUPS))
+
+
+class LazyGroup(TyperGroup):
+    def __init__(self, **attrs):
+        super().__init__(**attrs)
+        self.commands = LazyCommands(self.commands)
 
-cli.command(name="cluster-deploy")(cluster_deploy)
-cli.command(name="cluster-destroy")(cluster_destroy)
-cli.command(name="cluster-list")(cluster_list)
 
-cli.command(name="cluster-expose")(cluster_expose)
-
-cli.command(name="cluster-autoscale")(cluster_autoscale)
-cli.command(name="cluster-unautoscale")(cluster_unautoscale)
-
-cli.command(name="policy-validate")(policy_validate)
-cli.command(name="policy-report")(policy_report)
-
-cli.command(name="backup-all")(backup_all_cmd)
-cli.command(name="restore")(restore_cmd)
-cli.command(name="backup-schedule")(backup_schedule_cmd)
-cli.command(name="launch-app")(launch_app)
-
-cli.command(name="run")(run_cmd)
-
-cli.command(name="import-pypi")(import_pypi)
-cli.command(name="import-wheel")(import_wheel)
-
-cli.add_typer(plugin_cmds.app, name="plugin", help="Manage plugins")
-cli.add_typer(token_cmds.app, name="token", help="Manage API tokens")
-cli.add_typer(notify_cmds.app, name="notify", help="Broadcast real-time toasts")
-cli.add_typer(license_cmds.app, name="license", help="Studio licensing")
-cli.add_typer(marketplace_cmds.app, name="marketplace", help="Browse/install micro-tools")
-cli.add_typer(pipeline_cmds.app, name="pipeline", help="Pipeline template")
-cli.add_typer(init_cmds.app, name="init", help="Quickstart new project")
-cli.add_typer(snapshot_cmds.app, name="snapshot", help="Snapshots (create/list/restore)")
-
-cli.add_typer(tutorial_cmds.app, name="tutorial", help="Interactive in-terminal tutorial")
-cli.add_typer(generate_sdk_cmds.app, name="generate-sdk", help="Generate SDK client from OpenAPI")
+cli = typer.Typer(help="Nexon: Next-Gen Multimedia Environment Manager", cls=LazyGroup)
+
+
+@cli.callback()
+def main(
+        ctx: typer.Context,
+        profile: bool = typer.Option(False, "--profile", help="Print per-phase timings when the command finishes"),
+        profile_output: Path = typer.Option(
+            None, "--profile-output",
+            help="With --profile, also write a profile: *.json = speedscope, anything else = cProfile pstats"
+        )
+):
+    """
+    Nexon: Next-Gen Multimedia Environment Manager
+    """
+    # before any commands run (a no-op unless SENTRY_DSN_CLI is set)
+    init_sentry()
+    if profile or profile_output:
+        profiler.enable(cprofile=profile_output is not None and profile_output.suffix != ".json")
+        ctx.call_on_close(lambda: profiler.report(profile_output))
 
 
 # @cli.callback(invoke_without_command=True)
@@ -185,6 +180,7 @@ cli.add_typer(generate_sdk_cmds.app, name="generate-sdk", help="Generate SDK cli
 #     """
 #     Nexon Cli entrypoint. Must specify --tenant or set NEXON_TENANT.
 #     """
+#     from nexon_cli.core.tenant_manager import CLITenantManager
 #     if tenant:
 #         CLITenantManager.set_tenant(tenant)
 #     else:
@@ -194,6 +190,8 @@ cli.add_typer(generate_sdk_cmds.app, name="generate-sdk", help="Generate SDK cli
 
 # Entry point
 if __name__ == '__main__':
+    from nexon_cli.core.metrics_cli import record_cli_metrics, push_metrics
+
     start = time.time()
     try:
         cli()
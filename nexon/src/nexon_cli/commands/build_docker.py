@@ -4,13 +4,15 @@ from nexon_cli.core.docker_builder import build_docker_image, DockerBuildError
 
 def build_docker_cmd(
         env_name: str = typer.Argument(..., help="Name of the environment to containerize"),
-        tag: str = typer.Option(None, "--tag", "-t", help="Optional Docker image tag")
+        tag: str = typer.Option(None, "--tag", "-t", help="Optional Docker image tag"),
+        stream: bool = typer.Option(False, "--stream",
+                                    help="Stream the build context to 'docker build -' instead of staging it")
 ):
     """
     Build a Docker image for the specified environment.
     """
     try:
-        image = build_docker_image(env_name, tag)
+        image = build_docker_image(env_name, tag, stream=stream)
     except DockerBuildError as e:
         typer.secho(f"Docker build failed: {e}", fg="red")
         raise typer.Exit(1)
@@ -1,5 +1,6 @@
 import typer
-# from nexon_cli.core.build_manager import BuildManager, BuildError
+from nexon_cli.core.build_manager import BuildManager, BuildError
+from nexon_cli.core.dependency_solver import DependencyError
 from nexon_cli.core.tasks import build_package_task
 
 
@@ -7,15 +8,41 @@ from nexon_cli.core.tasks import build_package_task
 
 def build_package_cmd(
         package: str = typer.Argument(..., help="Package name (e.g. mytool)"),
-        version: str = typer.Argument(..., help="Package version (e.g. 1.0.0)")
+        version: str = typer.Argument(..., help="Package version (e.g. 1.0.0)"),
+        with_deps: bool = typer.Option(False, "--with-deps",
+                                       help="Build the whole dependency closure locally, dependencies first"),
+        jobs: int = typer.Option(None, "--jobs", "-j", help="Parallel builds with --with-deps (default: CPU count)"),
+        no_cache: bool = typer.Option(False, "--no-cache", help="Always run the build commands; don't use the build cache")
 ):
     """
     Build a specific package version using its build spec.
 
     Example: nexon build-package mytool 1.2.3
+             nexon build-package mytool 1.2.3 --with-deps --jobs 8
     """
-    result = build_package_task.delay(package, version)
-    typer.secho(f"Enqueued build: {result.id}", fg="cyan")
+    if not with_deps:
+        result = build_package_task.delay(package, version, use_cache=not no_cache)
+        typer.secho(f"Enqueued build: {result.id}", fg="cyan")
+        return
+
+    try:
+        status = BuildManager(use_cache=not no_cache).build_closure([f"{package}=={version}"], jobs=jobs)
+    except (BuildError, DependencyError) as e:
+        typer.secho(str(e), fg="red")
+        raise typer.Exit(1)
+
+    failed = [pkgver for pkgver, state in status.items() if state == "failed"]
+    skipped = [pkgver for pkgver, state in status.items() if state == "skipped"]
+    no_build = [pkgver for pkgver, state in status.items() if state == "no-build"]
+    built = len(status) - len(failed) - len(skipped) - len(no_build)
+    typer.secho(f"Built {built}/{len(status) - len(no_build)} packages", fg="red" if failed else "green")
+    if no_build:
+        typer.secho(f"Nothing to build (no build commands): {', '.join(sorted(no_build))}")
+    if failed:
+        typer.secho(f"Failed: {', '.join(sorted(failed))}", fg="red")
+        if skipped:
+            typer.secho(f"Skipped: {', '.join(sorted(skipped))}", fg="yellow")
+        raise typer.Exit(1)
     # try:
     #     bm.build_package(package, version)
     # except BuildError as e:
@@ -6,14 +6,20 @@ def env_file(
     env_name: str = typer.Argument(..., help="Environment name to export"),
     output: str = typer.Option(
         None, "--output", "-o", help="Path to write to .env file (default: stdout)"
+    ),
+    shell: str = typer.Option(
+        None, "--shell", "-s", help="Emit an activation script for bash, zsh, fish or powershell instead"
     )
 ):
     """
     Export environment variables for a Nexon env into dotenv format.
+
+    Example: nexon env-file myenv -o .env
+             source <(nexon env-file myenv --shell bash)
     """
     em = EnvironmentManager()
     try:
-        result = em.export_env_file(env_name, output_path=output)
+        result = em.export_env_file(env_name, output_path=output, shell=shell)
     except Exception as e:
         typer.secho(f"Error exporting env file: {e}", fg="red")
         raise typer.Exit(1)
@@ -8,14 +8,21 @@ def import_wheel(
         include_deps: bool = typer.Option(
             False, "--include-deps", "-d",
             help="Also import Requires-Dist dependencies recursively"
-        )
+        ),
+        jobs: int = typer.Option(None, "--jobs", "-j",
+                                 help="Parallel downloads with --include-deps (default: NEXON_IMPORT_JOBS or 8)"),
+        offline: bool = typer.Option(None, "--offline/--online",
+                                     help="Only use the download cache and --find-links (default: NEXON_OFFLINE)"),
+        find_links: Path = typer.Option(None, "--find-links", file_okay=False,
+                                        help="Local directory of wheels/sdists to use before PyPI "
+                                             "(default: NEXON_FIND_LINKS)")
 ):
     """
     Register a local wheel/sdist and (optionally) its dependencies.
     """
-    imp = PythonPackageImporter()
+    imp = PythonPackageImporter(offline=offline, find_links=str(find_links) if find_links else None)
     try:
-        imported = imp.import_from_file(wheel_path, include_deps=include_deps)
+        imported = imp.import_from_file(wheel_path, include_deps=include_deps, jobs=jobs)
         for pkgver in imported:
             typer.secho(f"Imported {pkgver}", fg="green")
     except PythonImporterError as e:
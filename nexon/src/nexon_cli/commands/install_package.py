@@ -1,21 +1,32 @@
 import typer
+from pathlib import Path
+from typing import List
 from nexon_cli.core.package_manager import PackageManager
 
 
 def install_package(
         env_name: str = typer.Argument(..., help="Environment to modify"),
-        requirement: str = typer.Argument(..., help="Package or range (e.g. mypkg>=1.2,<2.0"),
+        requirements: List[str] = typer.Argument(None, help="Packages or ranges (e.g. mypkg>=1.2,<2.0 other-1.0.0)"),
+        requirements_file: Path = typer.Option(None, "--requirements", "-r", exists=True, dir_okay=False,
+                                               help="File with one requirement per line ('#' comments)"),
         dry_run: bool = typer.Option(False, "--dry-run", "-n",
                                      help="Show what would be installed without changing the environment")
 ):
     """
-    Install a package (and its deps) into an environment
+    Install packages (and their deps) into an environment in one solve
     """
     pm = PackageManager()
+    requirements = list(requirements or [])
+    if requirements_file:
+        requirements += pm.read_requirements(requirements_file)
+    if not requirements:
+        typer.secho("Give at least one requirement or --requirements FILE.", fg="red")
+        raise typer.Exit(1)
+
     try:
-        added = pm.install_package(env_name, requirement, dry_run=dry_run)
+        added = pm.install_packages(env_name, requirements, dry_run=dry_run)
     except Exception as e:
-        typer.secho(f"Error installing {requirement} -> {e}", fg="red")
+        typer.secho(f"Error installing {', '.join(requirements)} -> {e}", fg="red")
         raise typer.Exit(1)
 
     if not added:
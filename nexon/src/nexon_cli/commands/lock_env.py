@@ -2,11 +2,16 @@ import typer
 from nexon_cli.core.env_manager import EnvironmentManager
 
 
-def lock_env(env_name: str):
+def lock_env(
+        env_name: str,
+        view: bool = typer.Option(None, "--view/--no-view",
+                                  help="Also build the merged environment view (default: NEXON_ENV_VIEWS)")
+):
     """
     Generate a lockfile for the environment (for reproducibility).
     :param env_name:
+    :param view:
     :return:
     """
     em = EnvironmentManager()
-    em.lock_environment(env_name)
+    em.lock_environment(env_name, view=view)
@@ -0,0 +1,12 @@
+import typer
+from nexon_cli.core.blob_store import BlobStore
+
+
+def prune_blobs():
+    """
+    Delete blobs from the content-addressed store that no package version links to any more.
+
+    Example: nexon prune-blobs
+    """
+    removed = BlobStore().prune()
+    typer.secho(f"Removed {removed} unreferenced blobs", fg="green")
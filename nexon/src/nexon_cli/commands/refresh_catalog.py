@@ -0,0 +1,24 @@
+import typer
+from nexon_cli.core.package_catalog import PackageCatalog
+
+
+def refresh_catalog(
+        jobs: int = typer.Option(None, "--jobs", "-j",
+                                 help="Parser workers (default: NEXON_CATALOG_JOBS, 0 = auto, 1 = serial)"),
+        processes: bool = typer.Option(False, "--processes", help="Parse in worker processes instead of threads"),
+        rebuild: bool = typer.Option(False, "--rebuild", help="Discard the index and re-parse every package.yaml")
+):
+    """
+    Refresh the package catalog index from the packages directory.
+
+    Example: nexon refresh-catalog --rebuild --jobs 16
+    """
+    catalog = PackageCatalog(jobs=jobs, processes=processes)
+    if rebuild:
+        catalog.clear()
+    stats = catalog.refresh()
+    typer.secho(
+        f"Indexed {stats['scanned']} package files ({stats['parsed']} parsed, {stats['changed']} changed) "
+        f"in {stats['elapsed']:.2f}s - {stats['files_per_sec']:.0f} files/sec",
+        fg="green"
+    )
@@ -4,6 +4,7 @@ import os
 import shlex
 import subprocess
 import typer
+from typing import List
 from nexon_cli.core.env_manager import EnvironmentManager
 from nexon_cli.core.package_manager import PackageManager
 
@@ -13,7 +14,7 @@ app = typer.Typer()
 def run_cmd(
     env: str = typer.Argument(..., help="Environment to activate"),
     name: str = typer.Argument(..., help="Command name from package recipes"),
-    *extra: str  # collects any additional args
+    extra: List[str] = typer.Argument(None, help="Extra arguments appended to the command")
 ):
     """
     Activate <env>, look up the '<name>' entry under each package's `commands:`,
@@ -0,0 +1,210 @@
+import hashlib
+import json
+import os
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from nexon_cli.core.configs import config
+from nexon_cli.core.env_view import view_steps
+from nexon_cli.core.lockfile import check_lock, lock_path
+from nexon_cli.core.module_index import SITE_DIR, write_index
+from nexon_cli.core.package_manager import PackageManager
+from nexon_cli.utils.file_ops import parse_yaml
+from nexon_cli.utils.logger import logger
+from nexon_cli.utils.paths import ACTIVATION_CACHE_DIR
+from nexon_cli.utils.profiler import phase
+
+# Bump when the layout of a compiled context changes
+FORMAT_VERSION = 2
+
+# Manifests modified this close to compilation are re-hashed on the next load:
+# a rewrite within the same mtime tick would otherwise go unnoticed
+_RACY_WINDOW_NS = 2_000_000_000
+
+
+class ActivationCache:
+    """
+    Precompiled activation contexts, one per environment.
+
+    A context holds the environment's package list and the env-var steps from
+    PackageManager.compile_package_env(), so activating is one read of a small
+    JSON file instead of parsing every package.yaml. When the environment has
+    a valid lockfile the package list is the lock's resolved closure and the
+    interpreter is the locked one. It lives in <cache>/<env_name>/<key>.json
+    where key hashes the environment file's and lockfile's content and the
+    packages directory; each package.yaml is recorded with its stat and
+    sha256. A load checks the stats and only re-hashes manifests whose stat
+    changed; any content change recompiles the context.
+    """
+
+    def __init__(self, packages_dir: Path = None, cache_dir: Path = None):
+        self.pm = PackageManager()
+        if packages_dir is not None:
+            self.pm.pkg_dir = Path(packages_dir)
+        self.cache_dir = Path(cache_dir or ACTIVATION_CACHE_DIR)
+
+    def load(self, env_name: str, env_file: Path) -> Dict[str, Any]:
+        """
+        Return the compiled context for `env_file`:
+        {'packages': [...], 'steps': {VAR: [[kind, template], ...]}, 'locked': bool, ...}
+        """
+        raw, lock_raw = read_inputs(env_file)
+        key = hashlib.sha256(f"{self.pm.pkg_dir}\0{config.import_index:d}\0".encode("utf-8")
+                             + raw + b"\0" + lock_raw).hexdigest()
+        path = self.cache_dir / env_name / f"{key}.json"
+
+        with phase("activation_cache.load"):
+            context = _read(path)
+        if context is not None:
+            fresh, restat = self._check(context)
+            if fresh:
+                if restat:
+                    self._write(path, context)
+                return context
+
+        with phase("activation_cache.compile"):
+            context = self.compile(raw, lock_raw)
+        if config.import_index:
+            with phase("activation_cache.module_index"):
+                self._add_module_index(path.with_suffix(".modules"), context)
+        self._write(path, context)
+        return context
+
+    def compile(self, raw: bytes, lock_raw: bytes = b"") -> Dict[str, Any]:
+        """
+        Build a context from the environment file's content, using the
+        lockfile's closure, interpreter and environment view when `lock_raw`
+        passes check_lock().
+        A stale lock is listed under 'lock_problems' and otherwise ignored.
+        """
+        data = parse_yaml(raw) or {}
+        # list(): older uninstalls saved the package list as a YAML set
+        packages = list(data.get("packages", []))
+        interpreter, problems = None, []
+        if lock_raw:
+            lock = parse_yaml(lock_raw) or {}
+            problems = check_lock(lock, raw, self.pm.pkg_dir)
+            if not problems:
+                packages = list(lock["packages"])
+                interpreter = lock["lock"].get("interpreter")
+        steps, manifests = self.pm.compile_package_env(packages)
+        if lock_raw and not problems:
+            steps = view_steps(steps, lock["lock"].get("view"))
+        return {
+            "version": FORMAT_VERSION,
+            "packages": packages,
+            "steps": steps,
+            "manifests": [_fingerprint(p) for p in manifests],
+            "locked": bool(lock_raw) and not problems,
+            "interpreter": interpreter,
+            "lock_problems": problems,
+        }
+
+    def env_vars(self, env_name: str, env_file: Path, environ: Dict[str, str] = None) -> Dict[str, str]:
+        """Package env-vars for the environment, evaluated against `environ` (default: os.environ)."""
+        return self.pm.apply_package_env(self.load(env_name, env_file)["steps"], environ)
+
+    def _check(self, context: Dict[str, Any]):
+        """(still valid, stats need rewriting) for a cached context."""
+        restat = False
+        for entry in context["manifests"]:
+            path, mtime_ns, size, digest = entry
+            try:
+                st = os.stat(path)
+            except OSError:
+                if digest is None:
+                    continue
+                return False, False
+            if digest is None:
+                return False, False
+            if st.st_mtime_ns == mtime_ns and st.st_size == size:
+                continue
+            if _digest(Path(path)) != digest:
+                return False, False
+            # Touched but unchanged: remember the new stat so it isn't hashed again
+            entry[:] = _fingerprint(Path(path))
+            restat = True
+        return True, restat
+
+    @staticmethod
+    def _add_module_index(index_path: Path, context: Dict[str, Any]):
+        """
+        Index the modules on the packages' PYTHONPATH into `index_path` and add
+        the steps that let the sitecustomize finder use it (NEXON_IMPORT_INDEX).
+        """
+        steps = context["steps"]
+        if "PYTHONPATH" not in steps:
+            return
+        pythonpath = PackageManager.apply_package_env({"PYTHONPATH": steps["PYTHONPATH"]}, {})["PYTHONPATH"]
+        try:
+            write_index(index_path, pythonpath)
+        except OSError as e:
+            logger.warning(f"Could not write module index {index_path}: {e}")
+            return
+        steps["PYTHONPATH"] = steps["PYTHONPATH"] + [["prepend", str(SITE_DIR)]]
+        steps["NEXON_MODULE_INDEX"] = [["set", str(index_path)]]
+
+    def _write(self, path: Path, context: Dict[str, Any]):
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_name(f".tmp-{uuid.uuid4().hex}")
+            tmp.write_text(json.dumps(context), encoding="utf-8")
+            os.replace(tmp, path)
+            # Contexts (and module indexes) for earlier revisions of the environment file are dead weight
+            for old in path.parent.iterdir():
+                if old.suffix in (".json", ".modules") and old.stem != path.stem:
+                    old.unlink(missing_ok=True)
+        except OSError as e:
+            # Activation still works, it just isn't cached
+            logger.warning(f"Could not write activation cache {path}: {e}")
+
+    def clear(self, env_name: Optional[str] = None):
+        """Drop cached contexts for one environment, or for all of them."""
+        dirs = [self.cache_dir / env_name] if env_name else \
+            [d for d in self.cache_dir.glob("*") if d.is_dir()] if self.cache_dir.exists() else []
+        for d in dirs:
+            for f in d.glob("*"):
+                if f.suffix in (".json", ".modules"):
+                    f.unlink(missing_ok=True)
+
+
+def activation_cache() -> Optional[ActivationCache]:
+    """The cache used by activation, or None when NEXON_ACTIVATION_CACHE is off."""
+    return ActivationCache() if config.activation_cache else None
+
+
+def read_inputs(env_file: Path):
+    """(environment file bytes, lockfile bytes or b'' when there is no lock)"""
+    raw = Path(env_file).read_bytes()
+    try:
+        lock_raw = lock_path(env_file).read_bytes()
+    except FileNotFoundError:
+        lock_raw = b""
+    return raw, lock_raw
+
+
+def _read(path: Path) -> Optional[Dict[str, Any]]:
+    try:
+        context = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+    return context if context.get("version") == FORMAT_VERSION else None
+
+
+def _digest(path: Path) -> str:
+    return hashlib.sha256(path.read_bytes()).hexdigest()
+
+
+def _fingerprint(path: Path) -> List[Any]:
+    """[path, mtime_ns, size, sha256]; a missing file is recorded with None fields."""
+    try:
+        st = os.stat(path)
+        digest = _digest(path)
+    except OSError:
+        return [str(path), None, None, None]
+    mtime_ns = st.st_mtime_ns
+    if time.time_ns() - mtime_ns < _RACY_WINDOW_NS:
+        mtime_ns = -1
+    return [str(path), mtime_ns, st.st_size, digest]
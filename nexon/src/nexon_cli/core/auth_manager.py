@@ -1,8 +1,8 @@
 import getpass
 from pathlib import Path
-import yaml
 
 from nexon_cli.utils.paths import *
+from nexon_cli.utils.file_ops import load_yaml
 from nexon_cli.utils.logger import logger
 
 
@@ -38,8 +38,7 @@ class AuthManager:
         if not self.roles_file.exists():
             logger.warning(f"No roles file at {self.roles_file}; defaulting everyone to 'dev'")
             return {}
-        with open(self.roles_file, "r", encoding="utf-8") as f:
-            data = yaml.safe_load(f) or {}
+        data = load_yaml(self.roles_file) or {}
         return data.get("users", {})
 
     def current_user(self) -> str:
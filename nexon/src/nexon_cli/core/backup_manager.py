@@ -18,6 +18,7 @@ class BackupManager:
     """
 
     def __init__(self):
+        config.ensure_directories()
         # Where to store local backups
         self.backup_dir = Path(config.base_dir) / "backups"
         self.backup_dir.mkdir(parents=True, exist_ok=True)
@@ -0,0 +1,194 @@
+import hashlib
+import os
+import shutil
+import stat
+import sys
+import uuid
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+from nexon_cli.core.configs import config
+from nexon_cli.utils.logger import logger
+from nexon_cli.utils.paths import BLOB_STORE_DIR
+
+LINK_MODES = ("auto", "hardlink", "reflink", "copy")
+
+# ioctl(dest_fd, FICLONE, src_fd): copy-on-write clone on btrfs, XFS, bcachefs...
+_FICLONE = 0x40049409
+
+
+class BlobStoreError(Exception):
+    """Raised for an unknown link mode or a corrupt blob"""
+
+
+class BlobStore:
+    """
+    Content-addressed store of package payload files.
+
+    Each distinct file content is kept once in <store>/<sha[:2]>/<sha>
+    (<sha>-x for executables, so hard links carry the right mode). Package
+    version directories are materialized from it with hard links or
+    reflinks, so identical files across versions take no extra space and
+    creating a new version writes only the bytes that are new.
+
+    Blobs are read-only: a hard-linked file is shared by every package
+    version holding that content, so editing one in place (or as root,
+    which ignores the mode) would change all of them. Only the explicit
+    hardlink mode shares inodes; the others give each version its own file:
+      - auto:     reflink when the filesystem supports it, else copy
+      - hardlink: hard link, falling back to copy (across devices or at the link limit)
+      - reflink:  copy-on-write clone, falling back to copy
+      - copy:     plain copy
+    Copies save nothing, so once reflinks turn out to be unsupported (and
+    always in copy mode) files are copied straight to the version directory
+    without going through the store; hardlink is the mode that deduplicates
+    on filesystems without reflinks (NFS, ext4).
+    """
+
+    def __init__(self, store_dir: Path = None, link_mode: str = None):
+        self.store_dir = Path(store_dir or BLOB_STORE_DIR)
+        self.link_mode = link_mode or config.blob_link_mode
+        if self.link_mode not in LINK_MODES:
+            raise BlobStoreError(f"Unknown link mode '{self.link_mode}'; expected one of {', '.join(LINK_MODES)}")
+        self._reflink_ok: Optional[bool] = None
+
+    def blob_path(self, digest: str, executable: bool = False) -> Path:
+        return self.store_dir / digest[:2] / (f"{digest}-x" if executable else digest)
+
+    def add(self, src: Path) -> Tuple[Path, bool]:
+        """Ingest one file; returns (blob path, whether its content was new to the store)."""
+        src = Path(src)
+        executable = bool(src.stat().st_mode & 0o111)
+        digest = _file_digest(src)
+        blob = self.blob_path(digest, executable)
+        if blob.exists():
+            return blob, False
+
+        blob.parent.mkdir(parents=True, exist_ok=True)
+        tmp = blob.with_name(f".{blob.name}.{uuid.uuid4().hex}.tmp")
+        try:
+            # The temp copy is re-hashed: the source may have changed since it was hashed
+            shutil.copyfile(src, tmp)
+            if _file_digest(tmp) != digest:
+                raise BlobStoreError(f"{src} changed while it was being stored")
+            os.chmod(tmp, 0o555 if executable else 0o444)
+            os.replace(tmp, blob)
+        finally:
+            tmp.unlink(missing_ok=True)
+        return blob, True
+
+    def materialize(self, blob: Path, dest: Path) -> str:
+        """Place `blob` at `dest` (replacing it); returns how: 'hardlink', 'reflink' or 'copy'."""
+        dest = Path(dest)
+        dest.parent.mkdir(parents=True, exist_ok=True)
+        if dest.exists() or dest.is_symlink():
+            dest.unlink()
+
+        if self.link_mode in ("auto", "reflink") and self._reflink(blob, dest):
+            return "reflink"
+        if self.link_mode == "hardlink":
+            try:
+                os.link(blob, dest)
+                return "hardlink"
+            except OSError:
+                pass  # different device, link limit, or no hard links on this filesystem
+        _copy(blob, dest, blob.name.endswith("-x"))
+        return "copy"
+
+    def import_file(self, src: Path, dest: Path) -> Dict[str, int]:
+        """Store `src` and materialize it at `dest`, or just copy it there when nothing can be linked."""
+        st = Path(src).stat()
+        size = st.st_size
+        if self.link_mode == "copy" or (self.link_mode != "hardlink" and self._reflink_ok is False):
+            _copy(src, dest, bool(st.st_mode & 0o111))
+            return {"files": 1, "new_bytes": size, "linked_bytes": 0}
+        blob, new = self.add(src)
+        how = self.materialize(blob, dest)
+        return {"files": 1, "new_bytes": size if new else 0, "linked_bytes": size if how != "copy" else 0}
+
+    def import_tree(self, src_dir: Path, dest_dir: Path) -> Dict[str, int]:
+        """
+        Store every file under `src_dir` and recreate the tree at `dest_dir`
+        from the store (symlinks and empty directories are recreated as-is).
+        Returns counts: files, new_bytes (content not already stored) and
+        linked_bytes (materialized without copying).
+        """
+        src_dir, dest_dir = Path(src_dir), Path(dest_dir)
+        stats = {"files": 0, "new_bytes": 0, "linked_bytes": 0}
+        for dirpath, dirnames, filenames in os.walk(src_dir):
+            rel = Path(dirpath).relative_to(src_dir)
+            target_dir = dest_dir / rel
+            target_dir.mkdir(parents=True, exist_ok=True)
+            for name in list(dirnames):
+                # os.walk doesn't descend into symlinked directories; recreate the link
+                if (Path(dirpath) / name).is_symlink():
+                    os.symlink(os.readlink(Path(dirpath) / name), target_dir / name)
+            for name in filenames:
+                src = Path(dirpath) / name
+                if src.is_symlink():
+                    os.symlink(os.readlink(src), target_dir / name)
+                    continue
+                for key, value in self.import_file(src, target_dir / name).items():
+                    stats[key] += value
+        return stats
+
+    def prune(self) -> int:
+        """
+        Delete blobs no package version hard-links to any more (link count 1).
+        Reflinked and copied versions never reference a blob, so pruning only
+        costs future deduplication against them. Returns the number removed.
+        """
+        removed = 0
+        if not self.store_dir.exists():
+            return removed
+        for blob in self.store_dir.glob("*/*"):
+            if blob.name.startswith("."):
+                continue
+            if blob.stat().st_nlink == 1:
+                blob.unlink()
+                removed += 1
+        return removed
+
+    def _reflink(self, blob: Path, dest: Path) -> bool:
+        if self._reflink_ok is False or not sys.platform.startswith("linux"):
+            return False
+        import fcntl
+
+        with open(blob, "rb") as s, open(dest, "wb") as d:
+            try:
+                fcntl.ioctl(d.fileno(), _FICLONE, s.fileno())
+                ok = True
+            except OSError:
+                ok = False
+        if ok:
+            os.chmod(dest, stat.S_IMODE(blob.stat().st_mode) | stat.S_IWUSR)
+        else:
+            dest.unlink()
+        # Probe once per store: the filesystem answers the same for every file
+        if not ok and self._reflink_ok is None:
+            logger.warning(f"{dest.parent} does not support reflinks: NEXON_BLOB_LINK={self.link_mode} copies "
+                           f"files without deduplicating them (use hardlink to share identical files)")
+        self._reflink_ok = ok
+        return ok
+
+
+def blob_store() -> Optional[BlobStore]:
+    """The store used by wrap_tool and the Python importer, or None unless NEXON_BLOB_STORE is on."""
+    return BlobStore() if config.blob_store else None
+
+
+def _copy(src: Path, dest: Path, executable: bool):
+    dest = Path(dest)
+    dest.parent.mkdir(parents=True, exist_ok=True)
+    if dest.exists() or dest.is_symlink():
+        dest.unlink()
+    shutil.copyfile(src, dest)
+    os.chmod(dest, 0o755 if executable else 0o644)
+
+
+def _file_digest(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
@@ -0,0 +1,170 @@
+import hashlib
+import json
+import os
+import platform
+import shutil
+import sys
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Iterable, List, Optional
+
+from nexon_cli.core.configs import config
+from nexon_cli.utils.logger import logger
+from nexon_cli.utils.paths import BUILD_CACHE_DIR
+
+# Build outputs cached when package.yaml has no 'build.outputs'
+DEFAULT_OUTPUTS = ["build"]
+
+_log_lock = threading.Lock()
+
+
+def input_hash(pkg_root: Path, build_cfg: dict, dep_hashes: Iterable[str], outputs: List[str]) -> str:
+    """
+    Hash of everything a build depends on: the package source tree (minus its
+    outputs), the 'build' section of package.yaml, the platform, and the input
+    hashes of the dependencies it was resolved against.
+    """
+    h = hashlib.sha256()
+    h.update(json.dumps({
+        "build": build_cfg,
+        "deps": sorted(dep_hashes),
+        "platform": [sys.platform, platform.machine()],
+    }, sort_keys=True, default=str).encode("utf-8"))
+
+    excluded = {Path(out).as_posix().strip("/") for out in outputs}
+    for dirpath, dirnames, filenames in os.walk(pkg_root):
+        rel_dir = Path(dirpath).relative_to(pkg_root).as_posix()
+        prefix = "" if rel_dir == "." else f"{rel_dir}/"
+        dirnames[:] = sorted(d for d in dirnames if f"{prefix}{d}" not in excluded)
+        for filename in sorted(filenames):
+            rel = f"{prefix}{filename}"
+            if rel in excluded:
+                continue
+            path = Path(dirpath) / filename
+            h.update(rel.encode("utf-8") + b"\0")
+            if path.is_symlink():
+                h.update(b"link:" + os.readlink(path).encode("utf-8"))
+            else:
+                h.update(_file_digest(path))
+    return h.hexdigest()
+
+
+def _file_digest(path: Path) -> bytes:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.digest()
+
+
+class BuildCache:
+    """
+    Content-addressed store of build outputs, keyed by input_hash().
+
+    Entries live in <cache>/<key[:2]>/<key>/ as a manifest plus a copy of the
+    outputs. The local cache (~/.nexon/build_cache) is consulted first, then
+    the optional shared cache (NEXON_SHARED_BUILD_CACHE); shared hits are
+    copied into the local cache. Hits, misses and stores are appended to
+    <cache>/build.log.
+    """
+
+    def __init__(self, cache_dir: Path = None, shared_dir: Path = None):
+        self.cache_dir = Path(cache_dir or BUILD_CACHE_DIR)
+        shared = shared_dir if shared_dir is not None else config.shared_build_cache
+        self.shared_dir = Path(shared) if shared else None
+        self.log_path = self.cache_dir / "build.log"
+
+    @staticmethod
+    def _entry(root: Path, key: str) -> Path:
+        return root / key[:2] / key
+
+    def restore(self, key: str, pkg_root: Path) -> Optional[str]:
+        """
+        Restore the cached outputs for `key` into `pkg_root`.
+        Returns 'local' or 'shared' for the cache that had them, or None on a miss.
+        """
+        entry, source = self._entry(self.cache_dir, key), "local"
+        if not (entry / "manifest.json").exists():
+            if self.shared_dir is None or not (self._entry(self.shared_dir, key) / "manifest.json").exists():
+                return None
+            entry, source = self._entry(self.shared_dir, key), "shared"
+
+        manifest = json.loads((entry / "manifest.json").read_text(encoding="utf-8"))
+        if not manifest["outputs"]:
+            # Written before empty entries were skipped: nothing to restore, so build
+            return None
+        for out in manifest["outputs"]:
+            dest = pkg_root / out
+            _remove(dest)
+            dest.parent.mkdir(parents=True, exist_ok=True)
+            _copy(entry / "outputs" / out, dest)
+        if source == "shared":
+            self._store_into(self.cache_dir, key, entry / "outputs", manifest)
+        return source
+
+    def store(self, key: str, pkg_root: Path, outputs: List[str], pkgver: str) -> bool:
+        """
+        Save the outputs of a successful build in the local (and shared) cache.
+        Returns False, storing nothing, when none of `outputs` exists: a build
+        that writes elsewhere can't be restored, so it must not become a hit.
+        """
+        present = [out for out in outputs if (pkg_root / out).exists()]
+        if not present:
+            return False
+        manifest = {"package": pkgver, "outputs": present, "created": time.strftime("%Y-%m-%dT%H:%M:%S")}
+        for root in filter(None, (self.cache_dir, self.shared_dir)):
+            try:
+                self._store_into(root, key, pkg_root, manifest)
+            except OSError as e:
+                # A read-only or unreachable shared cache must not fail the build
+                logger.warning(f"Could not store {pkgver} in build cache {root}: {e}")
+        return True
+
+    def _store_into(self, root: Path, key: str, src_root: Path, manifest: dict):
+        entry = self._entry(root, key)
+        if (entry / "manifest.json").exists():
+            return
+        # Assemble next to the final location, then rename: readers never see partial entries
+        tmp = root / f".tmp-{uuid.uuid4().hex}"
+        try:
+            for out in manifest["outputs"]:
+                dest = tmp / "outputs" / out
+                dest.parent.mkdir(parents=True, exist_ok=True)
+                _copy(src_root / out, dest)
+            tmp.mkdir(parents=True, exist_ok=True)
+            (tmp / "manifest.json").write_text(json.dumps(manifest, indent=2), encoding="utf-8")
+            entry.parent.mkdir(parents=True, exist_ok=True)
+            try:
+                os.rename(tmp, entry)
+            except OSError:
+                # Another build stored the same key first
+                if not (entry / "manifest.json").exists():
+                    raise
+        finally:
+            shutil.rmtree(tmp, ignore_errors=True)
+
+    def record(self, pkgver: str, event: str, key: str, detail: str = ""):
+        """Append one line to the build log: TIMESTAMP | PACKAGE | EVENT | KEY | DETAIL."""
+        line = f"{time.strftime('%Y-%m-%dT%H:%M:%S')} | {pkgver} | {event} | {key}"
+        if detail:
+            line += f" | {detail}"
+        with _log_lock:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            with open(self.log_path, "a", encoding="utf-8") as f:
+                f.write(line + "\n")
+
+
+def _remove(path: Path):
+    if path.is_dir() and not path.is_symlink():
+        shutil.rmtree(path)
+    elif path.exists() or path.is_symlink():
+        path.unlink()
+
+
+def _copy(src: Path, dest: Path):
+    if src.is_dir() and not src.is_symlink():
+        shutil.copytree(src, dest, symlinks=True)
+    else:
+        shutil.copy2(src, dest, follow_symlinks=False)
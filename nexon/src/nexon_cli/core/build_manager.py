@@ -1,11 +1,19 @@
+import os
 import subprocess
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from pathlib import Path
-from typing import List, Dict
+from typing import List, Dict, Optional
 
 from nexon_cli.utils.file_ops import load_yaml
 from nexon_cli.utils.logger import logger
-from nexon_cli.utils.shell_ops import set_environment_variables, reset_environment_variables
 from nexon_cli.utils.paths import PACKAGES_DIR
+from nexon_cli.core.dependency_solver import DependencySolver, DependencyError
+from nexon_cli.core.build_cache import BuildCache, DEFAULT_OUTPUTS, input_hash
+
+# Serializes prefixed build output from concurrent builds
+_output_lock = threading.Lock()
 
 
 class BuildError(Exception):
@@ -16,15 +24,24 @@ class BuildManager:
     """
     Builds Nexon packages according to their 'build' section in package.yaml.
     Supports any command-line build system (CMake, Makefile, pip, custom scripts).
+    Outputs ('build.outputs', default ['build']) are cached by input hash, so an
+    unchanged package is restored instead of rebuilt.
     """
-    def __init__(self):
-        self.pkg_dir: Path = Path(PACKAGES_DIR)
+    def __init__(self, packages_dir: Path = None, cache: BuildCache = None, use_cache: bool = True):
+        self.pkg_dir: Path = Path(packages_dir or PACKAGES_DIR)
+        self.cache: Optional[BuildCache] = (cache or BuildCache()) if use_cache else None
+        # Input hash per 'pkg-ver', filled dependencies first
+        self._input_hashes: Dict[str, str] = {}
 
         self.pkg_dir.mkdir(parents=True, exist_ok=True)
 
-    def build_package(self, name: str, version: str) -> None:
+    def build_package(self, name: str, version: str, prefix: str = None, key: str = None) -> bool:
         """
         Build a package (e.g., C++ plugin via CMake/SCons) based on its build definition.
+        With `prefix`, command output is captured and streamed line by line as
+        '[prefix] line', so that concurrent builds stay readable.
+        `key` is the package's input hash when the caller already computed it.
+        Returns False if the package defines no build commands (runtime-only: nothing to do).
         """
         pkg_root = self.pkg_dir / name / version
         pkg_file = pkg_root / "package.yaml"
@@ -43,28 +60,170 @@ class BuildManager:
             key: val.replace("{root}", str(pkg_root))
             for key, val in env_overrides.items()
         }
-        set_environment_variables(resolved_env)
+        # Passed to each command rather than set on os.environ, so concurrent builds don't clash
+        build_env = {**os.environ, **resolved_env}
 
         # Determine commands
         commands: List[str] = build_cfg.get("commands", [])
         if not commands:
-            logger.error(f"No build commands defined for '{name}-{version}'. Skipping build")
-            reset_environment_variables()
-            return
+            logger.info(f"No build commands defined for '{name}-{version}'; nothing to build")
+            return False
+
+        pkgver = f"{name}-{version}"
+        outputs = build_cfg.get("outputs") or DEFAULT_OUTPUTS
+        if self.cache is not None:
+            key = key or self._standalone_key(name, version)
+        if self.cache is not None and key:
+            start = time.perf_counter()
+            source = self.cache.restore(key, pkg_root)
+            if source:
+                elapsed = (time.perf_counter() - start) * 1000
+                self.cache.record(pkgver, f"hit-{source}", key, f"{elapsed:.1f} ms")
+                logger.success(f"Restored {pkgver} from {source} build cache ({key[:12]}, {elapsed:.1f} ms)")
+                return True
+            self.cache.record(pkgver, "miss", key)
 
+        start = time.perf_counter()
         logger.title(f"Building package: {name}-{version}")
+        for cmd in commands:
+            # Substitute {root} placeholder in each command
+            cmd_str = cmd.replace("{root}", str(pkg_root))
+            logger.info(f"-> {cmd_str}")
+            returncode = _run_command(cmd_str, build_env, prefix)
+            if returncode != 0:
+                msg = f"Command failed (exit {returncode}): {cmd_str}"
+                logger.error(f"[{prefix}] {msg}" if prefix else msg)
+                raise BuildError(msg)
+        if self.cache is not None and key:
+            if self.cache.store(key, pkg_root, outputs, pkgver):
+                self.cache.record(pkgver, "store", key, f"built in {time.perf_counter() - start:.1f} s")
+            else:
+                self.cache.record(pkgver, "no-outputs", key, f"none of {', '.join(outputs)} exists")
+                logger.info(f"Not caching {pkgver}: none of its outputs ({', '.join(outputs)}) exists")
+        logger.success(f"Built package: {name}-{version}")
+        return True
+
+    def input_hashes(self, graph: Dict[str, List[str]]) -> Dict[str, str]:
+        """Input hash of every package of a build_graph(), each including its dependencies' hashes."""
+        for level in build_levels(graph):
+            for pkgver in level:
+                if pkgver in self._input_hashes:
+                    continue
+                name, version = pkgver.rsplit("-", 1)
+                pkg_root = self.pkg_dir / name / version
+                pkg_file = pkg_root / "package.yaml"
+                build_cfg = ((load_yaml(pkg_file) or {}).get("build") or {}) if pkg_file.exists() else {}
+                self._input_hashes[pkgver] = input_hash(
+                    pkg_root, build_cfg,
+                    [self._input_hashes[dep] for dep in graph[pkgver]],
+                    build_cfg.get("outputs") or DEFAULT_OUTPUTS,
+                )
+        return self._input_hashes
+
+    def _standalone_key(self, name: str, version: str) -> Optional[str]:
+        """Input hash of a package built on its own; None (no caching) if its deps don't resolve."""
         try:
-            for cmd in commands:
-                # Substitute {root} placeholder in each command
-                cmd_str = cmd.replace("{root}", str(pkg_root))
-                logger.info(f"-> {cmd_str}")
-                # Run the command in shell; capture output
-                completed = subprocess.run(cmd_str, shell=True)
-                if completed.returncode != 0:
-                    msg = f"Command failed (exit {completed.returncode}): {cmd_str}"
-                    logger.error(msg)
-                    raise BuildError(msg)
-            logger.success(f"Built package: {name}-{version}")
-        finally:
-            # Always reset environment, even on error
-            reset_environment_variables()
+            graph = DependencySolver(self.pkg_dir).build_graph([f"{name}=={version}"])
+        except DependencyError as e:
+            logger.warning(f"Build cache disabled for {name}-{version}: {e}")
+            return None
+        hashes = self.input_hashes(graph)
+        return next(hashes[pkgver] for pkgver in graph if pkgver.rsplit("-", 1)[0] == name)
+
+    def build_closure(self, requirements: List[str], jobs: int = None) -> Dict[str, str]:
+        """
+        Build every package of the resolved closure of `requirements`, dependencies first.
+
+        A package starts as soon as all of its dependencies are built, with at
+        most `jobs` builds running at once, so independent branches of the graph
+        build concurrently. When a build fails, the packages depending on it
+        (directly or not) are skipped; unrelated builds carry on. Packages
+        without build commands (runtime-only) are 'no-build' and don't block
+        their dependants.
+        Returns {'pkg-ver': 'built' | 'no-build' | 'failed' | 'skipped'}.
+        """
+        graph = DependencySolver(self.pkg_dir).build_graph(requirements)
+        levels = build_levels(graph)
+        keys = self.input_hashes(graph) if self.cache is not None else {}
+        jobs = jobs or os.cpu_count() or 1
+        logger.title(f"Build plan: {len(graph)} packages in {len(levels)} levels, {jobs} parallel jobs")
+        for depth, level in enumerate(levels):
+            logger.info(f"  level {depth}: {', '.join(level)}")
+
+        dependants: Dict[str, List[str]] = {pkgver: [] for pkgver in graph}
+        waiting = {pkgver: len(set(deps)) for pkgver, deps in graph.items()}
+        for pkgver, deps in graph.items():
+            for dep in set(deps):
+                dependants[dep].append(pkgver)
+
+        status: Dict[str, str] = {}
+        ready = [pkgver for level in levels for pkgver in level if not waiting[pkgver]]
+        running = {}
+        with ThreadPoolExecutor(max_workers=jobs) as pool:
+            while ready or running:
+                for pkgver in ready:
+                    name, version = pkgver.rsplit("-", 1)
+                    running[pool.submit(self.build_package, name, version, pkgver, keys.get(pkgver))] = pkgver
+                ready = []
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    pkgver = running.pop(future)
+                    try:
+                        status[pkgver] = "built" if future.result() else "no-build"
+                    except Exception as e:
+                        status[pkgver] = "failed"
+                        if not isinstance(e, BuildError):
+                            logger.error(f"[{pkgver}] {e}")
+                        self._skip_dependants(pkgver, dependants, status)
+                    for dependant in dependants[pkgver]:
+                        waiting[dependant] -= 1
+                        if not waiting[dependant] and dependant not in status:
+                            ready.append(dependant)
+        return status
+
+    @staticmethod
+    def _skip_dependants(failed: str, dependants: Dict[str, List[str]], status: Dict[str, str]):
+        """Mark everything downstream of a failed build as skipped."""
+        todo = list(dependants[failed])
+        while todo:
+            pkgver = todo.pop()
+            if pkgver in status:
+                continue
+            status[pkgver] = "skipped"
+            logger.warning(f"Skipping {pkgver}: dependency {failed} failed to build")
+            todo.extend(dependants[pkgver])
+
+
+def build_levels(graph: Dict[str, List[str]]) -> List[List[str]]:
+    """
+    Layer a build_graph() result: level 0 holds packages without dependencies,
+    level n packages whose dependencies are all in lower levels.
+    """
+    remaining = {pkgver: set(deps) for pkgver, deps in graph.items()}
+    levels: List[List[str]] = []
+    done = set()
+    while remaining:
+        level = sorted(pkgver for pkgver, deps in remaining.items() if deps <= done)
+        if not level:
+            raise BuildError(f"Dependency cycle between: {', '.join(sorted(remaining))}")
+        levels.append(level)
+        done.update(level)
+        for pkgver in level:
+            del remaining[pkgver]
+    return levels
+
+
+def _run_command(cmd: str, env: Dict[str, str], prefix: str = None) -> int:
+    """Run a shell command; with a prefix, stream its combined output line by line."""
+    if prefix is None:
+        return subprocess.run(cmd, shell=True, env=env).returncode
+
+    proc = subprocess.Popen(
+        cmd, shell=True, env=env, stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+        text=True, errors="replace", bufsize=1
+    )
+    for line in proc.stdout:
+        with _output_lock:
+            print(f"[{prefix}] {line.rstrip()}", flush=True)
+    return proc.wait()
@@ -6,14 +6,19 @@ from pathlib import Path
 class NexonConfig:
     """
     Centralized configuration for Nexon directories and layers.
-    Ensures all required directories exist under the base_dir.
+    Directories are created by ensure_directories(), not on import: commands
+    that never write under base_dir shouldn't pay for it.
     """
     def __init__(self):
         # Base directory for all Nexon data
         self.base_dir: Path = Path(os.getenv("NEXON_BASE_DIR", Path.home() / ".nexon"))
-        self._ensure_directory(self.base_dir)
+        self._directories_ready = False
 
-        # Ensure core subdirectories
+    def ensure_directories(self):
+        """Create base_dir and its core subdirectories (once per process)."""
+        if self._directories_ready:
+            return
+        self._ensure_directory(self.base_dir)
         for subdir in (
             self.environments_dir,
             self.packages_dir,
@@ -26,6 +31,7 @@ class NexonConfig:
             self.user_layers,
         ):
             self._ensure_directory(subdir)
+        self._directories_ready = True
 
     def _ensure_directory(self, path: Path):
         """
@@ -119,6 +125,82 @@ class NexonConfig:
     def telemetry_enabled(self) -> bool:
         return os.environ.get("TELEMETRY_ENABLED", False)
 
+    @property
+    def lazy_solver(self) -> bool:
+        """Resolve from directory listings, parsing package.yaml only for visited versions."""
+        return os.environ.get("NEXON_LAZY_SOLVER", "").lower() in ("1", "true", "yes")
+
+    @property
+    def resolution_cache_size(self) -> int:
+        """Maximum number of cached resolve_all/build_graph results (0 disables the cache)."""
+        return int(os.environ.get("NEXON_RESOLUTION_CACHE_SIZE", 256))
+
+    @property
+    def catalog_jobs(self) -> int:
+        """Workers used to parse package.yaml files when refreshing the catalog (0 = auto)."""
+        return int(os.environ.get("NEXON_CATALOG_JOBS", 0))
+
+    @property
+    def shared_build_cache(self) -> str | None:
+        """Optional shared (e.g. NFS) build artifact cache, consulted after the local one."""
+        return os.environ.get("NEXON_SHARED_BUILD_CACHE")
+
+    @property
+    def activation_cache(self) -> bool:
+        """Reuse precompiled activation contexts instead of re-reading package.yaml files."""
+        return os.environ.get("NEXON_ACTIVATION_CACHE", "1").lower() not in ("0", "false", "no")
+
+    @property
+    def activation_scripts(self) -> list[str]:
+        """Shells whose activation scripts are regenerated when an environment changes (default: none)."""
+        value = os.environ.get("NEXON_ACTIVATION_SCRIPTS", "")
+        return [shell.strip() for shell in value.split(",") if shell.strip()]
+
+    @property
+    def env_views(self) -> bool:
+        """Build a merged environment view (one PATH/PYTHONPATH/LD_LIBRARY_PATH entry) on every lock-env."""
+        return os.environ.get("NEXON_ENV_VIEWS", "").lower() in ("1", "true", "yes")
+
+    @property
+    def import_index(self) -> bool:
+        """Index each environment's Python modules and resolve imports from it via a sitecustomize finder."""
+        return os.environ.get("NEXON_IMPORT_INDEX", "").lower() in ("1", "true", "yes")
+
+    @property
+    def import_jobs(self) -> int:
+        """Concurrent downloads + inspections for import-pypi/import-wheel --include-deps."""
+        return int(os.environ.get("NEXON_IMPORT_JOBS", 8))
+
+    @property
+    def download_cache_mb(self) -> int:
+        """Size bound of the import download cache in MB (0 disables the cache)."""
+        return int(os.environ.get("NEXON_DOWNLOAD_CACHE_MB", 10240))
+
+    @property
+    def offline(self) -> bool:
+        """Never run pip: imports are served from the download cache or NEXON_FIND_LINKS only."""
+        return os.environ.get("NEXON_OFFLINE", "").lower() in ("1", "true", "yes")
+
+    @property
+    def find_links(self) -> str | None:
+        """Local directory of wheels/sdists consulted by imports before PyPI (an offline mirror)."""
+        return os.environ.get("NEXON_FIND_LINKS") or None
+
+    @property
+    def docker_max_layers(self) -> int:
+        """Most package layers in a build-docker image; beyond it the most stable DAG levels share layers."""
+        return int(os.environ.get("NEXON_DOCKER_LAYERS", 64))
+
+    @property
+    def blob_store(self) -> bool:
+        """Materialize wrapped tools and imported distributions from the content-addressed blob store (opt-in)."""
+        return os.environ.get("NEXON_BLOB_STORE", "").lower() in ("1", "true", "yes")
+
+    @property
+    def blob_link_mode(self) -> str:
+        """How package files are materialized from the blob store: auto, hardlink, reflink or copy."""
+        return os.environ.get("NEXON_BLOB_LINK", "auto").lower()
+
     @property
     def server_url(self) -> str:
         return os.environ.get("NEXON_SERVER_URL", "")
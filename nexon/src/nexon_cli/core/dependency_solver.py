@@ -1,15 +1,26 @@
+import heapq
 import re
 from pathlib import Path
 from collections import defaultdict, deque
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
 
+import yaml
 from packaging.version import Version, InvalidVersion
 from packaging.specifiers import SpecifierSet, InvalidSpecifier
 from packaging.requirements import Requirement, InvalidRequirement
 
-from nexon_cli.utils.logger import logger
 from nexon_cli.utils.file_ops import load_yaml
+from nexon_cli.utils.logger import logger
 from nexon_cli.utils.paths import PACKAGES_DIR
+from nexon_cli.utils.profiler import phase, profiled
+from nexon_cli.core.configs import config
+from nexon_cli.core.package_catalog import PackageCatalog
+from nexon_cli.core.resolution_cache import ResolutionCache
+from nexon_cli.core.version_table import VersionTable
+
+
+_EXACT_RE = re.compile(r"^([A-Za-z0-9_.]+)-(\d+(?:\.\d+)*)$")
+_OPERATORS = ("==", ">=", "<=", "~=", "!=", ">", "<")
 
 
 class DependencyError(Exception):
@@ -21,36 +32,74 @@ class DependencySolver:
     """
     Resolve package dependencies, including semantic version ranges, and detect conflicts.
     """
-    def __init__(self):
-        self.packages_dir = PACKAGES_DIR
+    # Upper bound on candidate versions tried by one resolve_all/build_graph call
+    max_attempts = 200_000
+    # Learned conflicts involving more decisions than this are not kept
+    max_nogood_size = 3
+
+    def __init__(self, packages_dir: Path = None, lazy: bool = None):
+        self.packages_dir = Path(packages_dir or PACKAGES_DIR)
+        self.catalog = PackageCatalog(self.packages_dir)
+        # Lazy mode skips the catalog: versions come from directory names and a
+        # package.yaml is only read once the search visits that version
+        self.lazy = config.lazy_solver if lazy is None else lazy
+        # Solved graphs keyed by requirement set + catalog generation (needs the catalog, so not in lazy mode)
+        self.cache = ResolutionCache(self.catalog, 0 if self.lazy else config.resolution_cache_size)
         self._definitions: dict[str, dict[str, dict]] = {}
+        # Parsed, sorted versions per package (built once per catalog load, or per listing in lazy mode)
+        self._tables: Dict[str, Optional[VersionTable]] = {}
+        # Search caches (valid for the lifetime of this solver)
+        self._intersections: Dict[Tuple[str, int], Tuple[SpecifierSet, frozenset]] = {}
+        self._parsed_requires: Dict[Tuple[str, Version], List[Tuple[str, SpecifierSet]]] = {}
+        self._dead: set = set()
+        # Conflicts learned by one _solve(); they may hinge on its top-level requirements
+        self._nogoods: Dict[Tuple[str, Version], List[frozenset]] = {}
+        self._last_conflict = ""
+        self._attempts = 0
 
     def _load_definitions(self) -> dict[str, dict[str, dict]]:
-        """Load all package specs from PACKAGES_DIR."""
+        """Load all package specs from the incrementally refreshed catalog index."""
         if self._definitions:
             return self._definitions
 
-        defs: dict[str, dict[str, dict]] = {}
-        for pkg_dir in self.packages_dir.iterdir():
-            if not pkg_dir.is_dir():
-                continue
-            name = pkg_dir.name
-            defs[name] = {}
-            for ver_dir in pkg_dir.iterdir():
-                if not ver_dir.is_dir():
-                    continue
-                pkg_file = ver_dir / "package.yaml"
-                if not pkg_file.exists():
-                    continue
-                data = load_yaml(pkg_file)
-                vers = data.get("version")
-                if not vers:
-                    logger.warning(f"No version field in {pkg_file}, skipping.")
-                    continue
-                defs[name][vers] = data
+        with phase("solver.load_catalog"):
+            self._definitions = self.catalog.definitions()
+            self._tables = {
+                name: VersionTable.from_strings(name, vers) for name, vers in self._definitions.items()
+            }
+        return self._definitions
+
+    def _table(self, name: str) -> VersionTable:
+        """The VersionTable of a package; raises if the package is unknown."""
+        table = self._lookup_table(name)
+        if table is None:
+            raise DependencyError(f"Package '{name}' not found")
+        return table
+
+    def _lookup_table(self, name: str) -> Optional[VersionTable]:
+        """The VersionTable of a package, or None if there is no such package."""
+        if name in self._tables:
+            return self._tables[name]
+        if not self.lazy:
+            self._load_definitions()
+            return self._tables.get(name)
+
+        pkg_dir = self.packages_dir / name
+        if not name or pkg_dir.parent != self.packages_dir or not pkg_dir.is_dir():
+            self._tables[name] = None
+        else:
+            # Like the catalog, only version directories with a package.yaml count
+            self._tables[name] = VersionTable.from_strings(
+                name, [d.name for d in pkg_dir.iterdir() if (d / "package.yaml").is_file()]
+            )
+        return self._tables[name]
 
-        self._definitions = defs
-        return defs
+    def _metadata(self, name: str, version: Version) -> dict:
+        """The package.yaml data of one version."""
+        key = self._table(name).key_of(version)
+        if self.lazy:
+            return _load_spec(self.packages_dir / name / key / "package.yaml")
+        return self._load_definitions()[name].get(key, {})
 
     def parse_requirement(self, req: str):
         """
@@ -63,7 +112,7 @@ class DependencySolver:
         :param req:
         :return:
         """
-        exact = re.match(r"^([A-Za-z0-9_.]+)-(\d+(?:\.\d+)*)$", req)
+        exact = _EXACT_RE.match(req)
         if exact:
             # Exact version shorthand: foo-1.2.3
             name, vers = exact.group(1), exact.group(2)
@@ -81,9 +130,8 @@ class DependencySolver:
         # return requirement.name, requirement.specifier
 
         # 2) Range spec: find first operator position
-        ops = ["==", ">=", "<=", "~=", "!=", ">", "<"]
         pos = len(req)
-        for op in ops:
+        for op in _OPERATORS:
             idx = req.find(op)
             if idx != -1 and idx < pos:
                 pos = idx
@@ -105,17 +153,9 @@ class DependencySolver:
         :param name:
         :return:
         """
-        defs = self._load_definitions()
-        if name not in defs:
-            raise DependencyError(f"Package '{name}' not found")
-        versions = []
-        for ver_str in defs[name]:
-            try:
-                versions.append(Version(ver_str))
-            except InvalidVersion:
-                logger.warning(f"Ignoring invalid version '{ver_str}' for package '{name}'")
-        return sorted(versions, reverse=True)
+        return list(self._table(name).newest_first)
 
+    @profiled("solver.resolve")
     def resolve(self, req: str) -> str:
         """
         Resolve a list of requirements into exact versions, handling ranges.
@@ -130,55 +170,24 @@ class DependencySolver:
         #         return f"{name}-{v}"
         # # No match found
         # raise DependencyError(f"No version of '{name}' matches specifier '{spec}'")
-        defs = self._load_definitions()
-
-        if name not in defs:
-            raise DependencyError(f"Package '{name}' not found")
-
-        # Gather and sort all available versions
-        available = []
-        for vers_str in defs[name]:
-            try:
-                available.append(Version(vers_str))
-            except InvalidVersion:
-                logger.warning(f"Ignoring invalid version '{vers_str}' for '{name}'")
-        available.sort(reverse=True)
-
-        # Pick the first one that satisfies
-        for v in available:
-            if v in spec:
-                return f"{name}-{v}"
+        best = self._table(name).best(spec)
+        if best is not None:
+            return f"{name}-{best}"
         raise DependencyError(f"No version of '{name}' matches specifier '{spec}'")
 
+    @profiled("solver.resolve_all")
     def resolve_all(self, requirements: list[str]) -> list[str]:
         """
         Resolve multiple requirements (including transitive 'requires') into
-        a flat list of exact package-version strings.
+        a flat list of exact package-version strings, one version per package name.
+        Raises DependencyError when no consistent set of versions exists.
         :param requirements:
         :return:
         """
-        defs = self._load_definitions()
-        resolved = set()
-        to_process = list(requirements)
-
-        while to_process:
-            req = to_process.pop(0)
-            pkgver = self.resolve(req)
-            if pkgver in resolved:
-                continue
-            resolved.add(pkgver)
-
-            # Load that package's own requires
-            name, vers = pkgver.split("-", 1)
-            meta = defs[name].get(vers)
-            for dep in meta.get("requires", []):
-                # Only enqueue if we haven't already resolved it
-                if self.resolve(dep) not in resolved:
-                    to_process.append(dep)
-
         # Return sorted for consistency
-        return sorted(resolved)
+        return sorted(self._resolved_graph(requirements))
 
+    @profiled("solver.build_graph")
     def build_graph(self, requirements: List[str]) -> Dict[str, List[str]]:
         """
         Build a dependency DAG given top-level requirements. Each package spec may have 'requires'.
@@ -186,27 +195,377 @@ class DependencySolver:
         :param requirements:
         :return:
         """
-        defs = self._load_definitions()
+        return self._resolved_graph(requirements)
+
+    def _resolved_graph(self, requirements: List[str]) -> Dict[str, List[str]]:
+        """
+        Solve `requirements` into a {'pkg-ver': [deps]} graph, or reuse the
+        result of an earlier identical request if the catalog has not changed since.
+        """
+        key = None
+        if self.cache.enabled:
+            normalized = []
+            for req in requirements:
+                name, spec = self.parse_requirement(req)
+                normalized.append(f"{name}{spec}")
+            self.catalog.refresh()
+            key = self.cache.key(normalized, self.catalog.generation)
+            with phase("solver.cache_lookup"):
+                graph = self.cache.get(key)
+            if graph is not None:
+                return graph
+
+        decided = self._solve(requirements)
         graph: Dict[str, List[str]] = {}
-        queue = list(requirements)
+        for name, version in decided.items():
+            graph[f"{name}-{version}"] = [
+                f"{dep}-{decided[dep]}" for dep, _ in self._requires(name, version)
+            ]
+        if key is not None:
+            self.cache.put(key, graph)
+        return graph
+
+    # ------------------------------------------------------------------ #
+    # Backtracking solver
+    # ------------------------------------------------------------------ #
+    @profiled("solver.search")
+    def _solve(self, requirements: List[str]) -> Dict[str, Version]:
+        """
+        Pick exactly one version per package name so that every requirement
+        (top-level and transitive) is satisfied.
+
+        Depth-first search over package decisions, newest candidate first.
+        Pending packages are decided in topological order of the static
+        package graph (every version's requires), so that in an acyclic
+        repository all constraints on a package are known before it is
+        decided. The search is pruned by:
+          - caching, per package, the versions matching each specifier and the
+            running intersection of all constraints placed on it,
+          - forward checking: a version is only chosen if each of its
+            dependencies still has at least one admissible candidate,
+          - learned conflicts: a version whose requirement can never be met is
+            discarded for good, and small combinations of decisions found to
+            leave some package without candidates are recorded as nogoods,
+          - conflict-directed backjumping: when a package runs out of
+            candidates, the search jumps straight back to the most recent
+            decision that actually constrained it.
+        """
+        roots = []
+        for req in requirements:
+            name, spec = self.parse_requirement(req)
+            if self._lookup_table(name) is None:
+                raise DependencyError(f"Package '{name}' not found")
+            roots.append((name, spec))
+
+        state = _SearchState(self._static_ranks([name for name, _ in roots]))
+        for name, spec in roots:
+            self._push(state, name, spec, "<root>", -1)
+        stack = state.stack
+        # Root constraints sit at level -1 and never appear in a nogood, so a
+        # nogood learned under other requirements may not hold for these
+        self._nogoods = {}
+        self._last_conflict = ""
+        self._attempts = 0
+
+        while True:
+            name = state.next_pending()
+            if name is None:
+                break
+            stack.append(_Frame(name, state.constraints[name][-1].candidates))
+            if not stack[-1].candidates:
+                self._last_conflict = self._describe(name, state.constraints[name])
+
+            while not self._advance(state):
+                exhausted = stack.pop()
+                state.pending(exhausted.name)
+                culprits = exhausted.conflicts | {c.level for c in state.constraints[exhausted.name]}
+                culprits = {lvl for lvl in culprits if 0 <= lvl < len(stack)}
+                if not culprits:
+                    raise DependencyError(self._last_conflict or f"Unable to resolve {requirements}")
+                self._learn({(stack[lvl].name, state.decided[stack[lvl].name]) for lvl in culprits})
+                # Backjump: decisions above the culprit cannot fix this conflict
+                target = max(culprits)
+                while len(stack) - 1 > target:
+                    self._undo(state, stack.pop())
+                stack[target].conflicts |= culprits - {target}
+
+        return state.decided
+
+    def _static_ranks(self, roots: List[str]) -> Dict[str, int]:
+        """
+        Topological rank (dependants first) of every package reachable from
+        `roots` through the requires of *any* of their versions.
+        In lazy mode only the newest version of each package is read: the
+        order is then a heuristic, which affects speed but not correctness.
+        """
+        deps_of: Dict[str, List[str]] = {}
+        for name in roots:
+            if name in deps_of:
+                continue
+            deps_of[name] = []
+            todo = [name]
+            while todo:
+                current = todo.pop()
+                names = []
+                for data in self._rank_specs(current):
+                    for req in data.get("requires", []) or []:
+                        dep = _requirement_name(req)
+                        names.append(dep)
+                        if dep not in deps_of:
+                            deps_of[dep] = []
+                            todo.append(dep)
+                deps_of[current] = list(dict.fromkeys(names))
 
-        while queue:
-            req = queue.pop(0)
-            pkgver = self.resolve(req)
-            if pkgver in graph:
+        # Iterative DFS post-order; reversed, it lists dependants before dependencies
+        order: List[str] = []
+        visited = set()
+        for root in deps_of:
+            if root in visited:
                 continue
+            visited.add(root)
+            walk = [(root, iter(deps_of[root]))]
+            while walk:
+                node, children = walk[-1]
+                child = next(children, None)
+                if child is None:
+                    walk.pop()
+                    order.append(node)
+                elif child not in visited:
+                    visited.add(child)
+                    walk.append((child, iter(deps_of[child])))
+        return {name: rank for rank, name in enumerate(reversed(order))}
 
-            name, vers = pkgver.split("-", 1)
-            meta = defs[name][vers]
-            direct = meta.get("requires", [])
+    def _rank_specs(self, name: str) -> Iterable[dict]:
+        """The package.yaml data _static_ranks() follows for one package."""
+        if not self.lazy:
+            return self._load_definitions().get(name, {}).values()
+        table = self._lookup_table(name)
+        return [self._metadata(name, table.newest_first[0])] if table and len(table) else []
+
+    def _advance(self, state: "_SearchState") -> bool:
+        """
+        Undo the top frame's current choice (if any) and commit its next viable candidate.
+        Returns False once the frame's candidates are exhausted.
+        """
+        frame = state.stack[-1]
+        level = len(state.stack) - 1
+        name = frame.name
+        if frame.active:
+            self._undo(state, frame)
 
-            # Resolve direct dependencies to exact versions
-            resolved_direct = []
-            for dep in direct:
-                dep_pkgver = self.resolve(dep)
-                resolved_direct.append(dep_pkgver)
-                queue.append(dep)  # ensure we process dependencies of dependencies
+        while frame.index < len(frame.candidates):
+            version = frame.candidates[frame.index]
+            frame.index += 1
+            self._attempts += 1
+            if self._attempts > self.max_attempts:
+                raise DependencyError(
+                    f"Resolution too complex: gave up after {self.max_attempts} attempts ({self._last_conflict})"
+                )
+            if (name, version) in self._dead:
+                continue
+            clash = self._violated_nogood(name, version, state)
+            if clash is not None:
+                frame.conflicts |= clash
+                continue
 
-            graph[pkgver] = resolved_direct
+            deps = self._requires(name, version)
+            culprits = self._check(name, version, deps, state)
+            if culprits is not None:
+                frame.conflicts |= culprits
+                continue
 
-        return graph
+            state.decided[name] = version
+            state.levels[name] = level
+            origin = f"{name}-{version}"
+            for dep, spec in deps:
+                self._push(state, dep, spec, origin, level)
+            frame.pushed = [dep for dep, _ in deps]
+            frame.active = True
+            return True
+        return False
+
+    def _check(self, name: str, version: Version, deps: List[Tuple[str, SpecifierSet]],
+               state: "_SearchState") -> Optional[set]:
+        """
+        Check (and learn from) the dependencies of a tentative decision.
+        Returns None if it is viable, otherwise the levels of the decisions it clashes with.
+        """
+        decided = state.decided
+        for dep, spec in deps:
+            if dep in decided:
+                if decided[dep] in self._matching(dep, spec):
+                    continue
+                self._learn({(name, version), (dep, decided[dep])})
+                self._last_conflict = (
+                    f"{name}-{version} requires {dep}{spec}, but {dep}-{decided[dep]} was selected"
+                )
+                return {state.levels[dep]}
+
+            matching = self._matching(dep, spec)
+            entries = state.constraints.get(dep)
+            current = entries[-1].candidates if entries else self._available(dep)
+            if any(v in matching for v in current):
+                continue
+            if not matching:
+                # No version of `dep` can ever satisfy this version's requirement
+                self._dead.add((name, version))
+            pending = (entries or []) + [_Constraint(spec, f"{name}-{version}", -1, ())]
+            self._last_conflict = self._describe(dep, pending)
+            return {c.level for c in entries or []}
+        return None
+
+    def _learn(self, nogood: set):
+        """Remember a (small) set of (name, version) decisions that can never appear together."""
+        if len(nogood) > self.max_nogood_size:
+            # Large nogoods rarely match again and only slow every check down
+            return
+        nogood = frozenset(nogood)
+        for member in nogood:
+            self._nogoods.setdefault(member, []).append(nogood)
+
+    def _violated_nogood(self, name: str, version: Version, state: "_SearchState") -> Optional[set]:
+        """Levels of the decisions that, together with name-version, complete a learned nogood."""
+        for nogood in self._nogoods.get((name, version), ()):
+            others = [(n, v) for n, v in nogood if n != name]
+            if all(state.decided.get(n) == v for n, v in others):
+                return {state.levels[n] for n, _ in others}
+        return None
+
+    def _push(self, state: "_SearchState", name: str, spec: SpecifierSet, origin: str, level: int):
+        """Add a constraint on `name`, narrowing its running candidate intersection."""
+        entries = state.constraints.get(name)
+        if entries is None:
+            entries = state.constraints[name] = []
+            state.pending(name)
+        previous = entries[-1].candidates if entries else self._available(name)
+        matching = self._matching(name, spec)
+        entries.append(_Constraint(spec, origin, level, tuple(v for v in previous if v in matching)))
+
+    @staticmethod
+    def _undo(state: "_SearchState", frame: "_Frame"):
+        """Retract a frame's decision and the constraints it introduced."""
+        if not frame.active:
+            return
+        del state.decided[frame.name]
+        del state.levels[frame.name]
+        state.pending(frame.name)
+        for dep in reversed(frame.pushed):
+            entries = state.constraints[dep]
+            entries.pop()
+            if not entries:
+                del state.constraints[dep]
+        frame.pushed = []
+        frame.active = False
+
+    def _matching(self, name: str, spec: SpecifierSet) -> frozenset:
+        """All available versions of `name` inside `spec`; cached per (name, specifier object)."""
+        # Keyed by identity: hashing a SpecifierSet re-normalizes every version in it.
+        # The parsed requires are memoized, so the same objects come back; the entry
+        # holds on to `spec` so that its id cannot be reused.
+        key = (name, id(spec))
+        entry = self._intersections.get(key)
+        if entry is None:
+            table = self._lookup_table(name)
+            entry = self._intersections[key] = (spec, frozenset(table.match(spec) if table else ()))
+        return entry[1]
+
+    def _available(self, name: str) -> Tuple[Version, ...]:
+        """All versions of `name`, newest first; unknown packages have no versions."""
+        table = self._lookup_table(name)
+        return table.newest_first if table else ()
+
+    def _requires(self, name: str, version: Version) -> List[Tuple[str, SpecifierSet]]:
+        """Parsed 'requires' of one package version, memoized."""
+        key = (name, version)
+        if key not in self._parsed_requires:
+            meta = self._metadata(name, version)
+            self._parsed_requires[key] = [
+                self.parse_requirement(dep) for dep in meta.get("requires", []) or []
+            ]
+        return self._parsed_requires[key]
+
+    @staticmethod
+    def _describe(name: str, constraints: List["_Constraint"]) -> str:
+        merged = SpecifierSet()
+        for c in constraints:
+            merged &= c.spec
+        origins = ", ".join(f"{c.spec or '*'} (from {c.origin})" for c in constraints)
+        return f"No version of '{name}' matches specifier '{merged}': {origins}"
+
+
+class _Constraint(NamedTuple):
+    """A requirement placed on a package, and the candidates left once it is applied."""
+    spec: SpecifierSet
+    origin: str
+    level: int
+    candidates: Tuple[Version, ...]
+
+
+class _Frame:
+    """One decision point of the backtracking search."""
+    __slots__ = ("name", "candidates", "index", "active", "pushed", "conflicts")
+
+    def __init__(self, name: str, candidates: Tuple[Version, ...]):
+        self.name = name
+        self.candidates = candidates
+        self.index = 0
+        self.active = False
+        self.pushed: List[str] = []
+        self.conflicts: set = set()
+
+
+class _SearchState:
+    """Mutable state of one _solve() run."""
+
+    def __init__(self, ranks: Dict[str, int]):
+        self.ranks = ranks
+        self.constraints: Dict[str, List[_Constraint]] = {}
+        self.decided: Dict[str, Version] = {}
+        self.levels: Dict[str, int] = {}
+        self.stack: List[_Frame] = []
+        self._heap: List[Tuple[int, str]] = []
+
+    def pending(self, name: str):
+        """(Re-)queue a package that has constraints but may not be decided."""
+        heapq.heappush(self._heap, (self.ranks.get(name, len(self.ranks)), name))
+
+    def next_pending(self) -> Optional[str]:
+        """The undecided, constrained package that comes first in topological order."""
+        while self._heap:
+            _, name = self._heap[0]
+            if name in self.constraints and name not in self.decided:
+                return name
+            heapq.heappop(self._heap)
+        return None
+
+
+def _requirement_name(req: str) -> str:
+    """The package name of a requirement, as parse_requirement() would return it."""
+    exact = _EXACT_RE.match(req)
+    if exact:
+        return exact.group(1)
+    pos = min((idx for idx in (req.find(op) for op in _OPERATORS) if idx != -1), default=len(req))
+    return req[:pos]
+
+
+# package.yaml contents read by lazy solvers, shared by every solver in the process
+_spec_cache: Dict[Path, Tuple[int, int, dict]] = {}
+
+
+def _load_spec(pkg_file: Path) -> dict:
+    """Parse a package.yaml once per process; re-read only if its mtime or size changes."""
+    try:
+        st = pkg_file.stat()
+    except OSError:
+        return {}
+    cached = _spec_cache.get(pkg_file)
+    if cached and cached[:2] == (st.st_mtime_ns, st.st_size):
+        return cached[2]
+    try:
+        with phase("solver.parse_yaml"):
+            data = load_yaml(pkg_file) or {}
+    except yaml.YAMLError as e:
+        logger.warning(f"Invalid YAML in {pkg_file}, skipping: {e}")
+        data = {}
+    _spec_cache[pkg_file] = (st.st_mtime_ns, st.st_size, data)
+    return data
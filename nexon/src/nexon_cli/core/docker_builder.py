@@ -1,20 +1,38 @@
+import hashlib
+import io
+import os
 import subprocess
+import tarfile
 import tempfile
 import shutil
 from pathlib import Path
+from typing import Dict, List, Tuple
 
 from nexon_cli.utils.paths import DOCKERFILES_DIR, ENVIRONMENTS_DIR, PACKAGES_DIR
+from nexon_cli.utils.file_ops import load_yaml
 from nexon_cli.utils.logger import logger
+from nexon_cli.core.build_manager import BuildError, build_levels
+from nexon_cli.core.configs import config
+from nexon_cli.core.dependency_solver import DependencySolver, DependencyError
+from nexon_cli.core.lockfile import LockError, lock_path, resolve_closure, trusted_lock
 
 
 class DockerBuildError(Exception):
     """Raised when a Docker build fails."""
 
 
-def build_docker_image(env_name: str, tag: str = None) -> str:
+def build_docker_image(env_name: str, tag: str = None, stream: bool = False) -> str:
     """
     Build a Docker image for a given Nexon environment.
-    - Copies all Nexon packages and the environment spec into the build context
+    - Puts only the packages of the environment's resolved closure (the locked
+      one when the lock is trusted) and its spec into the build context, plus
+      its lockfile when every locked manifest and payload hash still matches
+      (activation inside the image then uses the locked closure without resolving)
+    - The context is hard-linked from the packages directory (copied across
+      filesystems), or with `stream` sent as a tar straight to `docker build -`
+    - Each package gets its own independent `COPY --link` layer, ordered by
+      the dependency DAG from the foundations to the environment's own packages
+      (see docker_layers), so changing one package only rebuilds its layer
     - Installs Nexon via pip
     - Activates the environment inside the container so all deps are installed
     Returns the resulting image tag.
@@ -34,29 +52,117 @@ def build_docker_image(env_name: str, tag: str = None) -> str:
 
     logger.title(f"Building Docker image '{tag}' for environment '{env_name}'")
 
+    # A stale lock is reported by trusted_lock() and left out of the image
+    lock = trusted_lock(env_name, env_file, pkg_dir, payload=True)
+    if lock is not None:
+        logger.info(f"Using lockfile: {len(lock['packages'])} locked packages")
+        closure = lock["packages"]
+    else:
+        try:
+            closure = resolve_closure(env_name, load_yaml(env_file), pkg_dir)
+        except LockError as e:
+            logger.error(str(e))
+            raise DockerBuildError(str(e))
+
+    try:
+        pins = [f"{name}=={version}" for name, version in (pkgver.rsplit("-", 1) for pkgver in closure)]
+        graph = DependencySolver(pkg_dir).build_graph(pins)
+        layers = docker_layers(graph, config.docker_max_layers)
+    except (DependencyError, BuildError) as e:
+        msg = f"Cannot order the packages of '{env_name}' into layers: {e}"
+        logger.error(msg)
+        raise DockerBuildError(msg)
+
+    files = _context_files(pkg_dir, layers)
+    files.append((f"environments/{env_name}.yaml", env_file))
+    if lock is not None:
+        files.append((f"environments/{lock_path(env_file).name}", lock_path(env_file)))
+    dockerfile = _dockerfile(env_name, [layer for layer, _ in layers])
+    logger.info(f"Build context: {len(closure)} packages in {len(layers)} layers")
+
     try:
-        with tempfile.TemporaryDirectory() as tmp:
-            ctx = Path(tmp)
+        if stream:
+            cmd = ["docker", "build", "-t", tag, "-"]
+            logger.info(f"Running: {' '.join(cmd)} (streamed context)")
+            proc = subprocess.Popen(cmd, stdin=subprocess.PIPE)
+            try:
+                _write_tar(proc.stdin, files, dockerfile)
+            finally:
+                proc.stdin.close()
+                returncode = proc.wait()
+            if returncode:
+                raise subprocess.CalledProcessError(returncode, cmd)
+        else:
+            # Under the Nexon base dir, so the context can hard-link package files
+            DOCKERFILES_DIR.mkdir(parents=True, exist_ok=True)
+            with tempfile.TemporaryDirectory(dir=DOCKERFILES_DIR) as tmp:
+                ctx = Path(tmp)
+                _link_context(ctx, files)
+                (ctx / "Dockerfile").write_text(dockerfile)
+
+                # Build the Docker image
+                cmd = ["docker", "build", "-t", tag, str(ctx)]
+                logger.info(f"Running: {' '.join(cmd)}")
+                subprocess.run(cmd, check=True)
+    except subprocess.CalledProcessError as e:
+        msg = f"Docker build failed (exit code {e.returncode})"
+        logger.error(msg)
+        raise DockerBuildError(msg)
+    except Exception as e:
+        msg = f"Docker build error: {e}"
+        logger.error(msg)
+        raise DockerBuildError(msg)
 
-            # Copy the entire packages directory
-            pkg_ctx = ctx / "packages"
-            shutil.copytree(pkg_dir, pkg_ctx)
+    logger.success(f"Docker image build successfully: {tag}")
+    return tag
 
-            # Copy only the one environment spec
-            env_ctx = ctx / "environments"
-            env_ctx.mkdir()
-            shutil.copy(env_file, env_ctx / f"{env_name}.yaml")
 
-            # Write Dockerfile
-            dockerfile = ctx / "Dockerfile"
-            dockerfile.write_text(f"""
+def docker_layers(graph: Dict[str, List[str]], max_layers: int) -> List[Tuple[str, List[str]]]:
+    """
+    Split a build_graph() closure into image layers, [(layer name, [pkgver, ...])],
+    ordered from least to most frequently changing: dependencies before their
+    dependants (build_levels), so base libraries come first and the
+    environment's own packages last. Every package is a layer of its own
+    unless that exceeds `max_layers`; then whole DAG levels, lowest first,
+    become one layer each, and those are merged from the bottom if needed.
+    Layer names only depend on their packages, so they stay stable between builds.
+    """
+    levels = build_levels(graph)
+    max_layers = max(max_layers, 1)
+    count = sum(len(level) for level in levels)
+    collapsed = 0
+    while collapsed < len(levels) and count > max_layers:
+        count -= len(levels[collapsed]) - 1
+        collapsed += 1
+
+    groups = [list(level) for level in levels[:collapsed]]
+    groups += [[pkgver] for level in levels[collapsed:] for pkgver in level]
+    while len(groups) > max_layers:
+        groups[:2] = [groups[0] + groups[1]]
+    return [(_layer_name(group), group) for group in groups]
+
+
+def _layer_name(group: List[str]) -> str:
+    if len(group) == 1:
+        return group[0]
+    return "group-" + hashlib.sha256(" ".join(sorted(group)).encode("utf-8")).hexdigest()[:12]
+
+
+def _dockerfile(env_name: str, layers: List[str]) -> str:
+    # --link layers don't depend on the ones before them: a changed package
+    # rebuilds only its own layer (plus the environment and activation steps)
+    copies = "\n".join(f"COPY --link layers/{layer} /root/.nexon/packages" for layer in layers)
+    return f"""
+# syntax=docker/dockerfile:1
 FROM python:3.12-slim
 
 # Install NEXON CLI
 RUN pip install nexon
 
-# Copy Nexon data
-COPY packages /root/.nexon/packages
+# Copy Nexon packages, one layer each, least frequently changing first
+{copies}
+
+# Copy the environment spec (and lockfile)
 COPY environments /root/.nexon/environments
 
 # Activate the environment to install its dependencies
@@ -64,20 +170,56 @@ RUN nexon activate-env {env_name}
 
 # Default to an interactive shell
 CMD ["bash"]
-""".strip())
+""".strip()
 
-            # Build the Docker image
-            cmd = ["docker", "build", "-t", tag, str(ctx)]
-            logger.info(f"Running: {' '.join(cmd)}")
-            subprocess.run(cmd, check=True)
-    except subprocess.CalledProcessError as e:
-        msg = f"Docker build failed (exit code {e.returncode})"
-        logger.error(msg)
-        raise DockerBuildError(msg)
-    except Exception as e:
-        msg = f"Docker build error: {e}"
-        logger.error(msg)
-        raise DockerBuildError(msg)
 
-    logger.success(f"Docker image build successfully: {tag}")
-    return tag
+def _context_files(pkg_dir: Path, layers: List[Tuple[str, List[str]]]) -> List[Tuple[str, Path]]:
+    """
+    (context path, source) for every directory, file and symlink of the layers'
+    package versions; layer X's packages go under layers/X/<name>/<version>.
+    """
+    files = []
+    for layer, pkgvers in layers:
+        for pkgver in pkgvers:
+            name, version = pkgver.rsplit("-", 1)
+            root = pkg_dir / name / version
+            if not root.is_dir():
+                raise DockerBuildError(f"Package {pkgver} is not installed in {pkg_dir}")
+            for dirpath, dirnames, filenames in os.walk(root):
+                dirnames.sort()
+                base = Path(dirpath)
+                rel = Path("layers", layer, name, version, base.relative_to(root))
+                files.append((rel.as_posix(), base))
+                # os.walk lists symlinked directories but doesn't descend into them
+                for entry in [d for d in dirnames if (base / d).is_symlink()] + sorted(filenames):
+                    files.append(((rel / entry).as_posix(), base / entry))
+    return files
+
+
+def _link_context(ctx: Path, files: List[Tuple[str, Path]]):
+    """Materialize the context under `ctx`: hard links where possible, copies otherwise."""
+    for arcname, src in files:
+        dest = ctx / arcname
+        if src.is_symlink():
+            dest.parent.mkdir(parents=True, exist_ok=True)
+            os.symlink(os.readlink(src), dest)
+        elif src.is_dir():
+            dest.mkdir(parents=True, exist_ok=True)
+        else:
+            dest.parent.mkdir(parents=True, exist_ok=True)
+            try:
+                os.link(src, dest)
+            except OSError:
+                # Different filesystem (or no hard links there)
+                shutil.copy2(src, dest)
+
+
+def _write_tar(fileobj, files: List[Tuple[str, Path]], dockerfile: str):
+    """Stream the context as an uncompressed tar to `fileobj` (docker's stdin)."""
+    with tarfile.open(fileobj=fileobj, mode="w|") as tar:
+        data = dockerfile.encode("utf-8")
+        info = tarfile.TarInfo("Dockerfile")
+        info.size = len(data)
+        tar.addfile(info, io.BytesIO(data))
+        for arcname, src in files:
+            tar.add(src, arcname=arcname, recursive=False)
@@ -0,0 +1,185 @@
+import hashlib
+import os
+import shutil
+import uuid
+from pathlib import Path
+from typing import Iterable, List, Optional, Tuple
+
+from packaging.requirements import InvalidRequirement, Requirement
+from packaging.tags import sys_tags
+from packaging.utils import (
+    InvalidSdistFilename,
+    InvalidWheelFilename,
+    canonicalize_name,
+    parse_sdist_filename,
+    parse_wheel_filename,
+)
+from packaging.version import Version
+
+from nexon_cli.core.configs import config
+from nexon_cli.utils.logger import logger
+from nexon_cli.utils.paths import DOWNLOAD_CACHE_DIR
+
+_SUPPORTED_TAGS = None
+
+
+class DownloadCache:
+    """
+    Persistent store of downloaded wheels and sdists for the PyPI importer.
+
+    Files live in <cache>/<project>/<sha256>/<filename>: the directory name
+    is the content hash, checked again whenever a file is served, so a
+    corrupt or tampered file is dropped instead of imported. The cache is
+    bounded to `max_bytes`; the least recently used entries (a hit touches
+    the entry) are evicted after each store, never the one just stored.
+    Files larger than the whole cache are not stored.
+    """
+
+    def __init__(self, cache_dir: Path = None, max_bytes: int = None):
+        self.cache_dir = Path(cache_dir or DOWNLOAD_CACHE_DIR)
+        self.max_bytes = config.download_cache_mb * 1024 * 1024 if max_bytes is None else max_bytes
+
+    def find(self, requirement: str) -> Optional[Path]:
+        """Best cached distribution satisfying `requirement` (hash-verified), or None."""
+        parsed = _parse(requirement)
+        if parsed is None:
+            return None
+        project_dir = self.cache_dir / canonicalize_name(parsed.name)
+        try:
+            entries = [(d, f) for d in project_dir.iterdir() if d.is_dir() and not d.name.startswith(".")
+                       for f in d.iterdir()]
+        except OSError:
+            return None
+
+        for entry, dist in best_matches(parsed, entries):
+            if _sha256(dist) != entry.name:
+                logger.warning(f"Dropping corrupt cached download {dist.name}")
+                shutil.rmtree(entry, ignore_errors=True)
+                continue
+            os.utime(entry)
+            return dist
+        return None
+
+    def add(self, dist_path: Path) -> Optional[Path]:
+        """Store a downloaded distribution; returns its path in the cache, or None if it wasn't stored."""
+        dist_path = Path(dist_path)
+        name = _project(dist_path.name)
+        if name is None or dist_path.stat().st_size > self.max_bytes:
+            return None
+        digest = _sha256(dist_path)
+        entry = self.cache_dir / name / digest
+        if not entry.exists():
+            tmp = entry.with_name(f".{digest}.{uuid.uuid4().hex}")
+            tmp.mkdir(parents=True)
+            shutil.copyfile(dist_path, tmp / dist_path.name)
+            try:
+                os.replace(tmp, entry)
+            except OSError:
+                # Another worker stored the same file first
+                shutil.rmtree(tmp, ignore_errors=True)
+        self.evict(keep=entry)
+        return entry / dist_path.name
+
+    def evict(self, keep: Path = None):
+        """Drop least recently used entries (except `keep`) until the cache fits in max_bytes."""
+        entries = []
+        for entry in self.cache_dir.glob("*/*"):
+            if entry.name.startswith("."):
+                continue
+            try:
+                size = sum(f.stat().st_size for f in entry.iterdir())
+                entries.append((entry.stat().st_mtime, size, entry))
+            except OSError:
+                continue
+        total = sum(size for _, size, _ in entries)
+        for _, size, entry in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            if entry == keep:
+                continue
+            shutil.rmtree(entry, ignore_errors=True)
+            total -= size
+
+
+def download_cache() -> Optional[DownloadCache]:
+    """The importer's cache, or None when NEXON_DOWNLOAD_CACHE_MB is 0."""
+    return DownloadCache() if config.download_cache_mb > 0 else None
+
+
+def find_local(requirement: str, directory: Path) -> Optional[Path]:
+    """Best distribution satisfying `requirement` in a flat directory of wheels/sdists (a local mirror), or None."""
+    parsed = _parse(requirement)
+    if parsed is None:
+        return None
+    try:
+        files = [(Path(directory), f) for f in Path(directory).iterdir()]
+    except OSError:
+        return None
+    for _, dist in best_matches(parsed, files):
+        return dist
+    return None
+
+
+def best_matches(requirement: Requirement, candidates: Iterable[Tuple[Path, Path]]) -> List[Tuple[Path, Path]]:
+    """
+    (entry, file) candidates for `requirement`, best first: highest version
+    allowed by its specifier, wheels installable on this interpreter before sdists.
+    """
+    name = canonicalize_name(requirement.name)
+    versions = {}
+    for entry, dist in candidates:
+        info = _dist_info(dist.name)
+        if info is None or info[0] != name:
+            continue
+        _, version, is_wheel = info
+        versions.setdefault(version, []).append((not is_wheel, entry, dist))
+    allowed = set(requirement.specifier.filter(versions))
+    ranked = []
+    for version in sorted(allowed, reverse=True):
+        ranked += [(entry, dist) for _, entry, dist in sorted(versions[version], key=lambda c: c[0])]
+    return ranked
+
+
+def _dist_info(filename: str) -> Optional[Tuple[str, Version, bool]]:
+    """(project, version, is wheel) for an installable distribution file name, else None."""
+    global _SUPPORTED_TAGS
+    try:
+        if filename.endswith(".whl"):
+            name, version, _, tags = parse_wheel_filename(filename)
+            if _SUPPORTED_TAGS is None:
+                _SUPPORTED_TAGS = set(sys_tags())
+            if _SUPPORTED_TAGS.isdisjoint(tags):
+                return None
+            return name, version, True
+        if filename.endswith(".tar.gz"):
+            name, version = parse_sdist_filename(filename)
+            return name, version, False
+    except (InvalidWheelFilename, InvalidSdistFilename):
+        return None
+    return None
+
+
+def _project(filename: str) -> Optional[str]:
+    try:
+        if filename.endswith(".whl"):
+            return parse_wheel_filename(filename)[0]
+        return parse_sdist_filename(filename)[0]
+    except (InvalidWheelFilename, InvalidSdistFilename):
+        return None
+
+
+def _parse(requirement: str) -> Optional[Requirement]:
+    """A plain 'name[spec]' requirement; URLs and unparsable strings can't be served from a cache."""
+    try:
+        parsed = Requirement(requirement)
+    except InvalidRequirement:
+        return None
+    return None if parsed.url else parsed
+
+
+def _sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
@@ -8,11 +8,14 @@ from nexon_cli.utils.file_ops import save_yaml, load_yaml
 from nexon_cli.utils.shell_ops import set_environment_variables, reset_environment_variables
 from nexon_cli.core.interpreter_manager import InterpreterManager
 from nexon_cli.core.auth_manager import AuthManager, AuthError
-from nexon_cli.models.environment_model import EnvironmentModel
 from nexon_cli.core.package_manager import PackageManager
+from nexon_cli.core.activation_cache import ActivationCache, activation_cache, read_inputs
+from nexon_cli.core.lockfile import LockError, create_lock, lock_path, warn_stale
+from nexon_cli.core.shell_scripts import render_script, refresh_activation_scripts, write_activation_scripts
 from nexon_cli.core.plugin_manager import plugin_manager
 from nexon_cli.core.configs import config
 from nexon_cli.utils.audit import log
+from nexon_cli.utils.profiler import phase, profiled
 
 
 # Main Environment Manager
@@ -41,6 +44,7 @@ class EnvironmentManager:
         if env_path.exists():
             logger.warning(f"Environment '{env_name}' already exists. Overwriting...")
 
+        from nexon_cli.models.environment_model import EnvironmentModel
         env_data = EnvironmentModel(
             name=env_name,
             created_at=datetime.utcnow().isoformat(),
@@ -51,12 +55,14 @@ class EnvironmentManager:
 
         save_yaml(env_path, env_data.model_dump())
         logger.success(f"Environment '{env_name}' created successfully!")
+        refresh_activation_scripts(env_name, env_path)
 
         # Audit log it
         log("create_env", self.auth.current_user(), env_name, details=f"role={role}")
 
         plugin_manager.trigger("post_create_env", env_name=env_name, role=role)
 
+    @profiled("activate_env")
     def activate_environment(self, env_name: str):
         """
         Activate the environment by setting up required variables.
@@ -71,14 +77,19 @@ class EnvironmentManager:
             logger.error(f"Environment '{env_name}' does not exist.")
             return
 
-        env_data = load_yaml(env_file)
-        package_list = env_data.get("packages", [])
+        with phase("activate_env.load_env"):
+            context = self._activation_context(env_name, env_file)
+        package_list = context["packages"]
 
         if not package_list:
             logger.warning(f"No packages defined for environment '{env_name}'. Proceeding without packages.")
 
         # Resolve the correct Python interpreter
-        interpreter_path = self.interpreter_manager.resolve_interpreter(package_list)
+        with phase("activate_env.interpreter"):
+            # A locked interpreter is used as-is while it still exists on this machine
+            interpreter_path = context.get("interpreter")
+            if not interpreter_path or not Path(interpreter_path).exists():
+                interpreter_path = self.interpreter_manager.resolve_interpreter(package_list)
 
         # Infor about Python interpreter being used
         if interpreter_path != sys.executable:
@@ -90,14 +101,13 @@ class EnvironmentManager:
             "NEXON_ENV": env_name,
         }
 
-        pm = PackageManager()
-
         # Resolve PYTHONPATH and other variables from installed packages
-        resolved_vars = pm.resolve_package_env_vars(package_list)
+        resolved_vars = PackageManager.apply_package_env(context["steps"])
         env_vars.update(resolved_vars)
 
         # Apply the environment variables to the current shell session
-        set_environment_variables(env_vars)
+        with phase("activate_env.apply"):
+            set_environment_variables(env_vars)
 
         logger.success(f"Environment '{env_name}' activated successfully!")
         logger.info(f"Packages Loaded: {', '.join(package_list) if package_list else 'None'}")
@@ -106,6 +116,21 @@ class EnvironmentManager:
         # Audit log
         log("activate_env", self.auth.current_user(), env_name)
 
+    @staticmethod
+    def _activation_context(env_name: str, env_file: Path) -> Dict[str, Any]:
+        """
+        Package list and compiled env-var steps (the lockfile's closure when it
+        is valid), from the activation cache when enabled.
+        """
+        cache = activation_cache()
+        if cache is not None:
+            context = cache.load(env_name, env_file)
+        else:
+            context = ActivationCache().compile(*read_inputs(env_file))
+        if context.get("lock_problems"):
+            warn_stale(env_name, context["lock_problems"])
+        return context
+
     def deactivate_environment(self):
         """
         Deactivate the currently active environment
@@ -156,10 +181,15 @@ class EnvironmentManager:
             raise FileNotFoundError(f"Environment '{env_name}' not found.")
         return load_yaml(env_file)
 
-    def lock_environment(self, env_name: str):
+    def lock_environment(self, env_name: str, view: bool = None):
         """
-        Create a lockfile (nexon.lock.yaml) for reproducibility
+        Create a lockfile (<env>.lock.yaml) holding the resolved closure,
+        per-package manifest/payload hashes and the interpreter choice.
+        Activation and Docker builds use it instead of resolving while it is valid.
+        With `view` (default: NEXON_ENV_VIEWS) also build the merged environment
+        view, so activation exports one directory per search-path variable.
         :param env_name:
+        :param view:
         :return:
         """
 
@@ -168,11 +198,29 @@ class EnvironmentManager:
             logger.error(f"Environment '{env_name}' does not exist.")
             return
 
-        env_data = load_yaml(env_file)
-        lockfile_path = self.envs_dir / f"{env_name}.lock.yaml"
+        try:
+            lock = create_lock(env_name, env_file)
+        except LockError as e:
+            logger.error(str(e))
+            return
+        lockfile_path = lock_path(env_file)
+
+        if config.env_views if view is None else view:
+            from nexon_cli.core.env_view import build_view
+            with phase("lock_env.view"):
+                lock["lock"]["view"] = build_view(env_name, lock)
+            logger.info(f"Environment view: {lock['lock']['view']['path']}")
 
-        save_yaml(lockfile_path, env_data)
-        logger.success(f"Lockfile created: {lockfile_path}")
+        save_yaml(lockfile_path, lock)
+        logger.success(f"Lockfile created: {lockfile_path} ({len(lock['packages'])} packages)")
+
+        try:
+            scripts = write_activation_scripts(env_name, env_file)
+        except OSError as e:
+            logger.warning(f"Could not write activation scripts: {e}")
+        else:
+            for shell, path in scripts.items():
+                logger.info(f"Activation script ({shell}): {path}")
 
     def diff_environments(self, env_a: str, env_b: str) -> None:
         """
@@ -223,9 +271,10 @@ class EnvironmentManager:
         else:
             logger.info(f"Role unchanged: {role_a }")
 
-    def export_env_file(self, env_name: str, output_path: Optional[str] = None) -> str:
+    def export_env_file(self, env_name: str, output_path: Optional[str] = None, shell: Optional[str] = None) -> str:
         """
-        Export the activation environment variables for `env_name` into a dotenv file.
+        Export the activation environment variables for `env_name` into a dotenv file,
+        or, with `shell`, as an activation script for that shell (see shell_scripts.SHELLS).
         If `output_path` is provided, writes to the file; otherwise returns the content.
         """
         # Ensure environment exists and load base data
@@ -234,25 +283,24 @@ class EnvironmentManager:
             raise FileNotFoundError(f"Environment '{env_name}' not found.")
 
         # Merge package env-vars
-        data = load_yaml(env_file)
-        pkg_vars = []
-        # Compose package_env_vars
-        pm = PackageManager()
-        pkg_list = data.get("packages", [])
-        pkg_vars_dict = pm.resolve_package_env_vars(pkg_list)
-
-        # Also include NEXON_ENV
-        pkg_vars_dict["NEXON_ENV"] = env_name
-
-        # Generate dotenv content
-        lines = []
-        for key, val in pkg_vars_dict.items():
-            # quote values containing spaces or path separators
-            if " " in val:
-                val = f'"{val}"'
-            lines.append(f"{key}={val}")
-
-        content = "\n".join(lines) + "\n"
+        context = self._activation_context(env_name, env_file)
+        if shell:
+            content = render_script(shell, env_name, context)
+        else:
+            pkg_vars_dict = PackageManager.apply_package_env(context["steps"])
+
+            # Also include NEXON_ENV
+            pkg_vars_dict["NEXON_ENV"] = env_name
+
+            # Generate dotenv content
+            lines = []
+            for key, val in pkg_vars_dict.items():
+                # quote values containing spaces or path separators
+                if " " in val:
+                    val = f'"{val}"'
+                lines.append(f"{key}={val}")
+
+            content = "\n".join(lines) + "\n"
 
         if output_path:
             with open(output_path, "w", encoding="utf-8") as f:
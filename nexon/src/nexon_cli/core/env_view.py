@@ -0,0 +1,121 @@
+import hashlib
+import json
+import os
+import shutil
+from pathlib import Path
+from typing import Any, Dict, List
+
+from nexon_cli.core.package_manager import PackageManager
+from nexon_cli.utils.logger import logger
+from nexon_cli.utils.paths import VIEWS_DIR
+
+# Variable -> subdirectory of the view that replaces its package entries
+VIEW_DIRS = {
+    "PATH": "bin",
+    "PYTHONPATH": "src",
+    "LD_LIBRARY_PATH": "lib",
+}
+
+# Stand-in for the variable's value before activation while working out where packages put it
+_SENTINEL = "\0nexon-existing\0"
+
+
+def view_key(lock: Dict[str, Any]) -> str:
+    """A view is built once per lock: it is named after the locked closure and hashes."""
+    meta = lock["lock"]
+    return hashlib.sha256(json.dumps(
+        [lock["packages"], meta.get("hashes", {}), sorted(VIEW_DIRS.items())], sort_keys=True
+    ).encode("utf-8")).hexdigest()[:16]
+
+
+def build_view(env_name: str, lock: Dict[str, Any], packages_dir: Path = None,
+               views_dir: Path = None) -> Dict[str, Any]:
+    """
+    Materialize the environment view for a lock: for each variable in
+    VIEW_DIRS, one directory of symlinks merging the contents of every
+    package directory the variable lists, in lookup order (the first entry
+    providing a name wins, as it would on the search path; directories
+    without an __init__.py, such as namespace packages, are merged).
+    Entries outside the packages directory are kept after the view.
+
+    Returns the 'view' section recorded in the lock:
+    {'path': view dir, 'vars': {VAR: [[kind, template]]}}, the steps that
+    replace each collapsed variable's package steps at activation.
+    """
+    pm = PackageManager()
+    if packages_dir is not None:
+        pm.pkg_dir = Path(packages_dir)
+    root = Path(views_dir or VIEWS_DIR) / env_name
+    view = root / view_key(lock)
+    tmp = root / f".{view.name}.tmp"
+
+    steps, _ = pm.compile_package_env(lock["packages"])
+    pkg_prefix = str(pm.pkg_dir.resolve()) + os.sep
+    collapsed: Dict[str, List[List[str]]] = {}
+
+    _remove(tmp)
+    tmp.mkdir(parents=True)
+    for var, subdir in VIEW_DIRS.items():
+        if var not in steps:
+            continue
+        value = pm.apply_package_env({var: steps[var]}, {var: _SENTINEL})[var]
+        # Only variables whose packages all prepend can be collapsed without reordering
+        if not value.endswith(_SENTINEL) or _SENTINEL in value[:-len(_SENTINEL)]:
+            logger.warning(f"{var} is not a plain prepend chain; leaving it out of the view.")
+            continue
+        entries = [e for e in value[:-len(_SENTINEL)].split(os.pathsep) if e]
+        merged, kept = [], []
+        for entry in entries:
+            path = Path(entry)
+            if path.is_dir() and str(path.resolve()).startswith(pkg_prefix):
+                merged.append(path)
+            elif entry not in kept:
+                kept.append(entry)
+        if not merged:
+            continue
+        target = tmp / subdir
+        target.mkdir()
+        for path in merged:
+            _merge(path, target)
+        collapsed[var] = [["prepend", os.pathsep.join([str(view / subdir), *kept])]]
+        logger.info(f"View {var}: {len(entries)} entries -> {1 + len(kept)}")
+
+    _remove(view)
+    os.replace(tmp, view)
+    # Views of earlier locks are no longer referenced
+    for old in root.iterdir():
+        if old != view:
+            _remove(old)
+    return {"path": str(view), "vars": collapsed}
+
+
+def view_steps(steps: Dict[str, List[List[str]]], view: Dict[str, Any]) -> Dict[str, List[List[str]]]:
+    """`steps` with the view's variables collapsed, when the view directory still exists."""
+    if not view or not Path(view["path"]).is_dir():
+        return steps
+    return {**steps, **view["vars"]}
+
+
+def _merge(src: Path, dest: Path):
+    """Symlink src's children into dest; first one wins, plain directories merge recursively."""
+    for child in sorted(src.iterdir()):
+        link = dest / child.name
+        if not link.exists() and not link.is_symlink():
+            os.symlink(child.resolve(), link)
+            continue
+        if not (child.is_dir() and link.is_dir()) or (link / "__init__.py").exists():
+            continue
+        if link.is_symlink():
+            # Turn the earlier entry's link into a real directory of links before merging this one
+            first = link.resolve()
+            link.unlink()
+            link.mkdir()
+            _merge(first, link)
+        _merge(child, link)
+
+
+def _remove(path: Path):
+    if path.is_symlink() or path.is_file():
+        path.unlink()
+    elif path.exists():
+        shutil.rmtree(path)
@@ -0,0 +1,153 @@
+import hashlib
+import os
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from nexon_cli.core.configs import config
+from nexon_cli.core.interpreter_manager import InterpreterManager
+from nexon_cli.utils.file_ops import load_yaml, parse_yaml
+from nexon_cli.utils.logger import logger
+
+# Bump when the 'lock' section changes shape
+LOCK_VERSION = 1
+MANIFEST = "package.yaml"
+
+
+class LockError(Exception):
+    """Raised when an environment cannot be locked"""
+
+
+def lock_path(env_file: Path) -> Path:
+    """<env>.yaml -> <env>.lock.yaml"""
+    env_file = Path(env_file)
+    return env_file.with_name(f"{env_file.stem}.lock.yaml")
+
+
+def _sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def payload_hash(pkg_root: Path) -> str:
+    """Hash of every file under a package version directory except its manifest (paths, symlinks, contents)."""
+    h = hashlib.sha256()
+    for dirpath, dirnames, filenames in os.walk(pkg_root):
+        dirnames.sort()
+        rel_dir = Path(dirpath).relative_to(pkg_root).as_posix()
+        prefix = "" if rel_dir == "." else f"{rel_dir}/"
+        for filename in sorted(filenames):
+            rel = f"{prefix}{filename}"
+            if rel == MANIFEST:
+                continue
+            path = Path(dirpath) / filename
+            h.update(rel.encode("utf-8") + b"\0")
+            if path.is_symlink():
+                h.update(b"link:" + os.readlink(path).encode("utf-8"))
+            else:
+                h.update(bytes.fromhex(_sha256(path)))
+    return h.hexdigest()
+
+
+def _split(pkgver: str):
+    name, version = pkgver.rsplit("-", 1)
+    return name, version
+
+
+def resolve_closure(env_name: str, env_data: Dict[str, Any], packages_dir: Path = None) -> List[str]:
+    """The environment's packages plus everything they require, as 'name-version' strings."""
+    from nexon_cli.core.dependency_solver import DependencySolver, DependencyError
+
+    pinned = []
+    for pkgver in env_data.get("packages", []):
+        try:
+            name, version = _split(pkgver)
+        except ValueError:
+            raise LockError(f"Malformed package entry '{pkgver}' in environment '{env_name}'")
+        pinned.append(f"{name}=={version}")
+
+    try:
+        return DependencySolver(Path(packages_dir or config.packages_dir)).resolve_all(pinned)
+    except DependencyError as e:
+        raise LockError(f"Cannot resolve '{env_name}': {e}")
+
+
+def create_lock(env_name: str, env_file: Path, packages_dir: Path = None) -> Dict[str, Any]:
+    """
+    Resolve the environment's packages to their full transitive closure and
+    return the lock document: the environment's own keys with 'packages'
+    replaced by the closure, plus a 'lock' section holding the environment
+    file hash, the interpreter choice and a manifest/payload hash per package.
+    """
+    packages_dir = Path(packages_dir or config.packages_dir)
+    raw = Path(env_file).read_bytes()
+    env_data = parse_yaml(raw) or {}
+    closure = resolve_closure(env_name, env_data, packages_dir)
+
+    hashes = {}
+    for pkgver in closure:
+        pkg_root = packages_dir.joinpath(*_split(pkgver))
+        hashes[pkgver] = {"manifest": _sha256(pkg_root / MANIFEST), "payload": payload_hash(pkg_root)}
+
+    lock = dict(env_data)
+    lock["packages"] = closure
+    lock["lock"] = {
+        "version": LOCK_VERSION,
+        "created_at": datetime.utcnow().isoformat(),
+        "env_hash": hashlib.sha256(raw).hexdigest(),
+        "interpreter": InterpreterManager().resolve_interpreter(closure),
+        "hashes": hashes,
+    }
+    return lock
+
+
+def check_lock(lock: Dict[str, Any], env_raw: bytes, packages_dir: Path = None, payload: bool = False) -> List[str]:
+    """
+    One pass of hash checks: the environment file content `env_raw` and every
+    locked manifest (and, with `payload`, every package's files) must be
+    unchanged. Returns the reasons the lock is stale; empty means it can be trusted.
+    """
+    meta = lock.get("lock") or {}
+    if meta.get("version") != LOCK_VERSION:
+        return ["lockfile has no resolved closure (created by an older Nexon)"]
+    if hashlib.sha256(env_raw).hexdigest() != meta.get("env_hash"):
+        return ["environment file changed since it was locked"]
+
+    packages_dir = Path(packages_dir or config.packages_dir)
+    problems = []
+    for pkgver in lock.get("packages", []):
+        expected = meta.get("hashes", {}).get(pkgver)
+        pkg_root = packages_dir.joinpath(*_split(pkgver))
+        if expected is None or not (pkg_root / MANIFEST).exists():
+            problems.append(f"{pkgver} is missing")
+        elif _sha256(pkg_root / MANIFEST) != expected["manifest"]:
+            problems.append(f"{pkgver} manifest changed")
+        elif payload and payload_hash(pkg_root) != expected["payload"]:
+            problems.append(f"{pkgver} payload changed")
+    return problems
+
+
+def load_lock(env_file: Path) -> Optional[Dict[str, Any]]:
+    path = lock_path(env_file)
+    return load_yaml(path) if path.exists() else None
+
+
+def trusted_lock(env_name: str, env_file: Path, packages_dir: Path = None,
+                 payload: bool = False) -> Optional[Dict[str, Any]]:
+    """The environment's lock if it exists and passes check_lock(); a stale lock is reported and ignored."""
+    lock = load_lock(env_file)
+    if lock is None:
+        return None
+    problems = check_lock(lock, Path(env_file).read_bytes(), packages_dir, payload=payload)
+    if problems:
+        warn_stale(env_name, problems)
+        return None
+    return lock
+
+
+def warn_stale(env_name: str, problems: List[str]):
+    logger.warning(f"Lockfile for '{env_name}' is stale ({'; '.join(problems)}); "
+                   f"ignoring it. Run 'nexon lock-env {env_name}' to refresh it.")
@@ -0,0 +1,68 @@
+import json
+import os
+import uuid
+from pathlib import Path
+from typing import Dict, List
+
+# Directory holding the sitecustomize.py that installs the index finder; activation puts it on PYTHONPATH
+SITE_DIR = Path(__file__).resolve().parent.parent / "site_hooks"
+
+# Bump when the index layout changes (the finder ignores other versions)
+INDEX_VERSION = 1
+
+_MODULE_SUFFIXES = (".py", ".pyc")
+_RANK = {"package": 0, "extension": 1, "module": 2, "namespace": 3}
+
+
+def build_index(entries: List[str]) -> Dict[str, object]:
+    """
+    Map every top-level module name importable from `entries` (PYTHONPATH
+    order) to its candidates, in the order the import system would try them:
+    [kind, path] with kind 'package' (directory with __init__), 'module'
+    (.py/.pyc), 'extension' (any .so/.pyd; the finder checks the ABI tag) or
+    'namespace' (plain directory, a namespace package portion).
+    Submodules aren't indexed: they are found through their package's __path__.
+    """
+    modules: Dict[str, List[List[str]]] = {}
+    for entry in entries:
+        try:
+            names = os.listdir(entry)
+        except OSError:
+            continue
+        found: Dict[str, List[List[str]]] = {}
+        for name in names:
+            path = os.path.join(entry, name)
+            for module, kind in _candidates(name, path):
+                found.setdefault(module, []).append([kind, path])
+        for module, candidates in found.items():
+            # Within one directory a package beats an extension beats a module
+            modules.setdefault(module, []).extend(sorted(candidates, key=lambda c: (_RANK[c[0]], c[1])))
+    return {"version": INDEX_VERSION, "entries": list(entries), "modules": modules}
+
+
+def _candidates(name: str, path: str):
+    if os.path.isdir(path):
+        if not name.isidentifier():
+            return []
+        if any(os.path.exists(os.path.join(path, f"__init__{s}")) for s in _MODULE_SUFFIXES):
+            return [(name, "package")]
+        return [(name, "namespace")]
+    module, _, suffix = name.partition(".")
+    if not module.isidentifier():
+        return []
+    if "." + suffix in _MODULE_SUFFIXES:
+        return [(module, "module")]
+    if suffix.endswith(("so", "pyd")):
+        return [(module, "extension")]
+    return []
+
+
+def write_index(index_path: Path, pythonpath: str):
+    """Index the entries of a PYTHONPATH value into `index_path` (replaced atomically)."""
+    entries = [e for e in pythonpath.split(os.pathsep) if e and e != str(SITE_DIR)]
+    index_path = Path(index_path)
+    index_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = index_path.with_name(f".{index_path.name}.{uuid.uuid4().hex}.tmp")
+    tmp.write_text(json.dumps(build_index(entries)), encoding="utf-8")
+    os.replace(tmp, index_path)
+
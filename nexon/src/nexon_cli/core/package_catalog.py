@@ -0,0 +1,289 @@
+import hashlib
+import json
+import sqlite3
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import yaml
+
+from nexon_cli.core.configs import config
+from nexon_cli.utils.file_ops import parse_yaml
+from nexon_cli.utils.logger import logger
+from nexon_cli.utils.paths import PACKAGES_DIR, CATALOG_PATH
+from nexon_cli.utils.profiler import profiled
+
+
+class PackageCatalog:
+    """
+    Persistent index of every PACKAGES_DIR/<name>/<version>/package.yaml.
+
+    The index lives in a single SQLite file (~/.nexon/catalog.db by default) and
+    is refreshed incrementally: package directories whose mtime is unchanged are
+    not re-listed, and a package.yaml is only re-parsed when its stat changed
+    *and* its content hash differs from the indexed one.
+
+    The files that do need a look are hashed and parsed on a worker pool:
+    threads by default (the work is mostly I/O latency on network shares),
+    or processes when `processes` is set and parsing is CPU bound.
+    """
+    SCHEMA_VERSION = 1
+    # Stats younger than this are not trusted (coarse mtime granularity on NFS/FAT)
+    RACY_WINDOW_NS = 2_000_000_000
+
+    def __init__(self, packages_dir: Path = None, index_path: Path = None,
+                 jobs: int = None, processes: bool = False):
+        self.packages_dir = Path(packages_dir or PACKAGES_DIR)
+        self.index_path = Path(index_path or CATALOG_PATH)
+        # Worker count for scanning package.yaml files (0 = executor default, 1 = serial)
+        self.jobs = config.catalog_jobs if jobs is None else jobs
+        self.processes = processes
+        self._conn: Optional[sqlite3.Connection] = None
+        self._refreshed = False
+
+    # ------------------------------------------------------------------ #
+    # Storage
+    # ------------------------------------------------------------------ #
+    def connect(self) -> sqlite3.Connection:
+        """Open (once) the index database; shared with caches derived from the catalog."""
+        if self._conn is not None:
+            return self._conn
+        try:
+            self.index_path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self.index_path), timeout=30)
+            self._init_schema(conn)
+        except (OSError, sqlite3.Error) as e:
+            # Read-only or broken index location: keep working from memory
+            logger.warning(f"Package catalog unavailable at {self.index_path} ({e}); using in-memory index.")
+            conn = sqlite3.connect(":memory:")
+            self._init_schema(conn)
+        self._conn = conn
+        return conn
+
+    def _init_schema(self, conn: sqlite3.Connection):
+        with conn:
+            conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+            row = conn.execute("SELECT value FROM meta WHERE key = 'schema'").fetchone()
+            if row and int(row[0]) != self.SCHEMA_VERSION:
+                conn.execute("DROP TABLE IF EXISTS packages")
+                conn.execute("DROP TABLE IF EXISTS versions")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS packages (name TEXT PRIMARY KEY, mtime_ns INTEGER NOT NULL)"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS versions ("
+                " name TEXT NOT NULL, dir_version TEXT NOT NULL,"
+                " mtime_ns INTEGER, size INTEGER, sha256 TEXT, data TEXT,"
+                " PRIMARY KEY (name, dir_version))"
+            )
+            conn.execute(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES ('schema', ?)",
+                (str(self.SCHEMA_VERSION),)
+            )
+
+    def clear(self):
+        """Drop every indexed package so that the next refresh re-parses the whole tree."""
+        with self.connect() as conn:
+            conn.execute("DELETE FROM packages")
+            conn.execute("DELETE FROM versions")
+        self._refreshed = False
+
+    def close(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    @property
+    def generation(self) -> int:
+        """Monotonic stamp bumped every time a refresh changes the index."""
+        row = self.connect().execute("SELECT value FROM meta WHERE key = 'generation'").fetchone()
+        return int(row[0]) if row else 0
+
+    # ------------------------------------------------------------------ #
+    # Incremental refresh
+    # ------------------------------------------------------------------ #
+    @profiled("catalog.refresh")
+    def refresh(self, force: bool = False) -> Dict[str, float]:
+        """
+        Bring the index in line with PACKAGES_DIR.
+        Only runs once per catalog instance unless `force` is set.
+        Returns counters: {'scanned': ..., 'parsed': ..., 'changed': ...,
+        'elapsed': seconds, 'files_per_sec': ...}.
+        """
+        stats = {"scanned": 0, "parsed": 0, "changed": 0, "elapsed": 0.0, "files_per_sec": 0.0}
+        if self._refreshed and not force:
+            return stats
+
+        start = time.perf_counter()
+        conn = self.connect()
+        root = str(self.packages_dir)
+        row = conn.execute("SELECT value FROM meta WHERE key = 'root'").fetchone()
+        if row is None or row[0] != root:
+            # Index was built for another packages directory: start over
+            with conn:
+                conn.execute("DELETE FROM packages")
+                conn.execute("DELETE FROM versions")
+                conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('root', ?)", (root,))
+                if row is not None:
+                    # Resolutions cached against the old root must not be served,
+                    # even when the new one turns out to be empty
+                    conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('generation', ?)",
+                                 (str(self.generation + 1),))
+
+        known_pkgs = dict(conn.execute("SELECT name, mtime_ns FROM packages"))
+        known_vers: Dict[str, Dict[str, tuple]] = {}
+        for name, dir_version, mtime, size, sha in conn.execute(
+                "SELECT name, dir_version, mtime_ns, size, sha256 FROM versions"):
+            known_vers.setdefault(name, {})[dir_version] = (mtime, size, sha)
+
+        racy_after = time.time_ns() - self.RACY_WINDOW_NS
+        pkg_rows, ver_rows, removed, tasks = [], [], [], []
+        seen_pkgs = set()
+        pkg_dirs = self.packages_dir.iterdir() if self.packages_dir.is_dir() else []
+        for pkg_dir in pkg_dirs:
+            if not pkg_dir.is_dir():
+                continue
+            name = pkg_dir.name
+            seen_pkgs.add(name)
+            indexed = known_vers.get(name, {})
+            mtime_ns = pkg_dir.stat().st_mtime_ns
+
+            if known_pkgs.get(name) == mtime_ns and mtime_ns < racy_after:
+                # Directory listing unchanged: reuse the indexed version dirs
+                ver_names = list(indexed)
+            else:
+                ver_names = [v.name for v in pkg_dir.iterdir() if v.is_dir()]
+                pkg_rows.append((name, mtime_ns))
+                removed += [(name, v) for v in indexed if v not in ver_names]
+
+            for dir_version in ver_names:
+                tasks.append((name, dir_version, pkg_dir / dir_version / "package.yaml", indexed.get(dir_version)))
+
+        stats["scanned"] = len(tasks)
+        for (name, dir_version, _, _), tail in zip(tasks, self._scan_all(tasks, racy_after)):
+            if tail is None:
+                continue
+            if tail[3] is not None and tail[2] is not None:
+                stats["parsed"] += 1
+            ver_rows.append((name, dir_version) + tail)
+
+        removed_pkgs = [name for name in set(known_pkgs) | set(known_vers) if name not in seen_pkgs]
+
+        # Stat-only updates do not count as changes: the content is identical
+        content_rows = [r for r in ver_rows if r[5] is not None]
+        new_pkgs = [r for r in pkg_rows if r[0] not in known_pkgs]
+        stats["changed"] = len(content_rows) + len(removed) + len(removed_pkgs) + len(new_pkgs)
+        with conn:
+            conn.executemany("INSERT OR REPLACE INTO packages (name, mtime_ns) VALUES (?, ?)", pkg_rows)
+            conn.executemany("DELETE FROM versions WHERE name = ? AND dir_version = ?", removed)
+            for name in removed_pkgs:
+                conn.execute("DELETE FROM packages WHERE name = ?", (name,))
+                conn.execute("DELETE FROM versions WHERE name = ?", (name,))
+            for name, dir_version, mtime, size, sha, data in ver_rows:
+                if data is None:
+                    # stat changed but content identical: only refresh the stat
+                    conn.execute(
+                        "UPDATE versions SET mtime_ns = ?, size = ? WHERE name = ? AND dir_version = ?",
+                        (mtime, size, name, dir_version)
+                    )
+                else:
+                    conn.execute(
+                        "INSERT OR REPLACE INTO versions (name, dir_version, mtime_ns, size, sha256, data)"
+                        " VALUES (?, ?, ?, ?, ?, ?)", (name, dir_version, mtime, size, sha, data)
+                    )
+            if stats["changed"]:
+                conn.execute(
+                    "INSERT OR REPLACE INTO meta (key, value) VALUES ('generation', ?)",
+                    (str(self.generation + 1),)
+                )
+
+        self._refreshed = True
+        stats["elapsed"] = time.perf_counter() - start
+        if stats["elapsed"]:
+            stats["files_per_sec"] = stats["scanned"] / stats["elapsed"]
+        return stats
+
+    def _scan_all(self, tasks: List[tuple], racy_after: int) -> List[Optional[tuple]]:
+        """Run _scan_version() for every (name, dir_version, path, indexed) task, in order."""
+        paths = [task[2] for task in tasks]
+        indexed = [task[3] for task in tasks]
+        racy = [racy_after] * len(tasks)
+        if self.jobs == 1 or len(tasks) < 2:
+            return list(map(_scan_version, paths, indexed, racy))
+
+        executor = ProcessPoolExecutor if self.processes else ThreadPoolExecutor
+        with executor(max_workers=self.jobs or None) as pool:
+            # Batch work items for processes: one round-trip per file would dominate
+            chunksize = max(1, len(tasks) // ((self.jobs or 8) * 4)) if self.processes else 1
+            return list(pool.map(_scan_version, paths, indexed, racy, chunksize=chunksize))
+
+    # ------------------------------------------------------------------ #
+    # Queries
+    # ------------------------------------------------------------------ #
+    def versions(self) -> Dict[str, List[str]]:
+        """Return {name: [version directory names]} for every indexed package."""
+        self.refresh()
+        result: Dict[str, List[str]] = {}
+        for name, in self.connect().execute("SELECT name FROM packages ORDER BY name"):
+            result[name] = []
+        for name, dir_version in self.connect().execute(
+                "SELECT name, dir_version FROM versions ORDER BY name"):
+            result.setdefault(name, []).append(dir_version)
+        return result
+
+    def definitions(self) -> Dict[str, Dict[str, dict]]:
+        """
+        Return {name: {version: package.yaml data}}, keyed by each spec's own
+        'version' field, exactly like DependencySolver used to build by walking the tree.
+        """
+        self.refresh()
+        defs: Dict[str, Dict[str, dict]] = {}
+        for name, in self.connect().execute("SELECT name FROM packages ORDER BY name"):
+            defs[name] = {}
+        for name, dir_version, data in self.connect().execute(
+                "SELECT name, dir_version, data FROM versions ORDER BY name"):
+            meta = json.loads(data) if data else None
+            if meta is None:
+                continue
+            vers = meta.get("version")
+            if not vers:
+                logger.warning(f"No version field in {self.packages_dir / name / dir_version / 'package.yaml'}, skipping.")
+                continue
+            defs.setdefault(name, {})[str(vers)] = meta
+        return defs
+
+
+def _scan_version(pkg_file: Path, indexed: Optional[tuple], racy_after: int) -> Optional[tuple]:
+    """
+    Compare one package.yaml against its index entry.
+    Returns None when the entry is up to date, otherwise a row tail of
+    (mtime_ns, size, sha256, data_json) where data_json is None if only
+    the stat changed.
+    Module-level so that it can run in worker processes.
+    """
+    try:
+        st = pkg_file.stat()
+    except OSError:
+        # Version directory without a spec: keep it listed, with no data
+        if indexed == (None, None, None):
+            return None
+        return None, None, None, "null"
+
+    if indexed and indexed[0] == st.st_mtime_ns and indexed[1] == st.st_size:
+        return None
+
+    # A just-written file may change again within the same mtime tick:
+    # leave its mtime unrecorded so the next refresh re-hashes it.
+    mtime_ns = st.st_mtime_ns if st.st_mtime_ns < racy_after else -1
+    raw = pkg_file.read_bytes()
+    sha = hashlib.sha256(raw).hexdigest()
+    if indexed and indexed[2] == sha:
+        return mtime_ns, st.st_size, sha, None
+
+    try:
+        data = parse_yaml(raw) or {}
+    except yaml.YAMLError as e:
+        logger.warning(f"Invalid YAML in {pkg_file}, skipping: {e}")
+        data = None
+    return mtime_ns, st.st_size, sha, json.dumps(data, default=str)
@@ -1,14 +1,15 @@
 import os
 import shutil
-import yaml
 from pathlib import Path
-from typing import List, Dict
+from typing import List, Dict, Tuple
 
 from packaging.version import Version, InvalidVersion
-from nexon_cli.utils.file_ops import save_yaml, load_yaml
+from nexon_cli.utils.file_ops import save_yaml, load_yaml, parse_yaml, update_yaml
 from nexon_cli.utils.logger import logger
+from nexon_cli.utils.profiler import phase, profiled
+from nexon_cli.utils.audit import log
+from nexon_cli.core.auth_manager import AuthManager
 from nexon_cli.core.configs import config
-from nexon_cli.core.dependency_solver import DependencySolver, DependencyError
 from nexon_cli.core.plugin_manager import plugin_manager
 
 
@@ -23,11 +24,19 @@ class PackageManager:
         """
         self.env_dir = Path(config.environments_dir)
         self.pkg_dir = Path(config.packages_dir)
-        self.solver = DependencySolver()
+        self._solver = None
 
         self.env_dir.mkdir(parents=True, exist_ok=True)
         self.pkg_dir.mkdir(parents=True, exist_ok=True)
 
+    @property
+    def solver(self):
+        """The dependency solver, created on first use (activation never needs it)."""
+        if self._solver is None:
+            from nexon_cli.core.dependency_solver import DependencySolver
+            self._solver = DependencySolver(self.pkg_dir)
+        return self._solver
+
     def load_recipes(self, pkg_versions: list[str]) -> dict[str, dict[str, str]]:
         """
         Given a list of strings like ["foo-1.0.0", "bar-2.1.3"], load each
@@ -47,7 +56,7 @@ class PackageManager:
                 continue
 
             try:
-                data = yaml.safe_load(pkg_yaml.read_text(encoding="utf-8")) or {}
+                data = parse_yaml(pkg_yaml.read_text(encoding="utf-8")) or {}
             except Exception:
                 # invalid YAML? skip
                 continue
@@ -87,24 +96,19 @@ class PackageManager:
 
     def list_packages(self) -> Dict[str, List[str]]:
         """
-        List all package specs in PACKAGES_DIR.
+        List all package specs in PACKAGES_DIR, as recorded in the catalog index.
         :return:
         """
         result: Dict[str, List[str]] = {}
-        for pkg_path in self.pkg_dir.iterdir():
-            if not pkg_path.is_dir():
-                continue
-            name = pkg_path.name
+        for name, dir_versions in self.solver.catalog.versions().items():
             versions = []
-            for ver_path in pkg_path.iterdir():
-                if not ver_path.is_dir():
-                    continue
+            for ver in dir_versions:
                 try:
                     # Validate version string
-                    _ = Version(ver_path.name)
-                    versions.append(ver_path.name)
+                    _ = Version(ver)
+                    versions.append(ver)
                 except InvalidVersion:
-                    logger.warning(f"Ignoring invalid version '{ver_path.name}' for package '{name}'")
+                    logger.warning(f"Ignoring invalid version '{ver}' for package '{name}'")
             # Sort descending semantic versions
             versions.sort(key=lambda v: Version(v), reverse=True)
             result[name] = versions
@@ -115,42 +119,114 @@ class PackageManager:
         Install a package and its dependencies into an environment.
         requirement can be 'name', 'name-version', or 'name>=x,<y'.
         """
-        plugin_manager.trigger("pre_create_env", env_name=env_name, requirement=requirement)
-        env_file = self.env_dir / f"{env_name}.yaml"
+        return self.install_packages(env_name, [requirement], dry_run=dry_run)
+
+    def install_packages(self, env_name: str, requirements: List[str], dry_run: bool = False) -> List[str]:
+        """
+        Install several requirements into an environment at once: one joint
+        solve against the installed set, one write of the environment file,
+        a pre_install_package hook per requirement, then one audit entry and one
+        post_install_package hook for the whole delta.
+        An installed package named by a requirement may be replaced by the
+        version the solve picks; every other installed package is kept as pinned.
+        Returns the package-versions added.
+        """
+        from nexon_cli.core.dependency_solver import DependencyError
 
+        requirements = [r.strip() for r in requirements if r and r.strip()]
+        if not requirements:
+            logger.warning("No requirements given.")
+            return []
+
+        env_file = self.env_dir / f"{env_name}.yaml"
         if not env_file.exists():
             msg = f"Environment '{env_name}' not found."
             logger.error(msg)
             raise DependencyError(msg)
 
-        env_data = load_yaml(env_file)
-        current = set(env_data.get("packages", []))
+        for requirement in requirements:
+            # Once per requirement, as single installs always did
+            plugin_manager.trigger("pre_install_package", env_name=env_name, requirement=requirement,
+                                   requirements=requirements)
 
         try:
-            resolved = self.solver.resolve_all([requirement])
+            requested = {self.solver.parse_requirement(r)[0] for r in requirements}
+        except DependencyError as e:
+            logger.error(str(e))
+            raise
+
+        def plan(env_data):
+            """Solve against the installed set in `env_data` and apply the delta to it."""
+            current = set(env_data.get("packages", []))
+            with phase("install.solve"):
+                resolved = self.solver.resolve_all(requirements + self._installed_pins(current, requested))
+            resolved_names = {pv.rsplit("-", 1)[0] for pv in resolved}
+            to_add = [pv for pv in resolved if pv not in current]
+            replaced = sorted(pv for pv in current
+                              if pv not in resolved and pv.rsplit("-", 1)[0] in resolved_names)
+            if to_add and not dry_run:
+                env_data["packages"] = sorted(current.difference(replaced).union(to_add))
+            return to_add, replaced
+
+        try:
+            if dry_run:
+                to_add, replaced = plan(load_yaml(env_file))
+            else:
+                # Re-solved if another writer changes the environment meanwhile
+                to_add, replaced = update_yaml(env_file, plan)
         except DependencyError as e:
             logger.error(str(e))
             raise
 
-        to_add = [pv for pv in resolved if pv not in current]
         if not to_add:
-            logger.info(f"No new packages to install for requirements '{requirement}'.")
+            logger.info(f"No new packages to install for requirements '{', '.join(requirements)}'.")
             return []
 
         if dry_run:
             logger.title(f"[Dry-Run] Would install into '{env_name}':")
             for pkg in to_add:
                 logger.info(f"    + {pkg}")
+            for pkg in replaced:
+                logger.info(f"    - {pkg}")
             return to_add
 
-        # Actually save
-        env_data["packages"] = sorted(current.union(to_add))
-        save_yaml(env_file, env_data)
         logger.success(f"Installed into '{env_name}': {', '.join(to_add)}")
-
-        plugin_manager.trigger("post_create_env", env_name=env_name, requirement=requirement)
+        if replaced:
+            logger.info(f"Replaced: {', '.join(replaced)}")
+        self._refresh_scripts(env_name, env_file)
+
+        log("install_package", AuthManager().current_user(), env_name,
+            details=f"requirement={', '.join(requirements)}")
+        plugin_manager.trigger("post_install_package", env_name=env_name, added=to_add,
+                               removed=replaced, requirements=requirements)
         return to_add
 
+    def _installed_pins(self, current: set, requested: set) -> List[str]:
+        """
+        '==' requirements holding the installed packages the solve must keep:
+        everything not named by a new requirement and still present on disk
+        (anything else cannot be solved for and is left as it is).
+        """
+        by_name: Dict[str, List[str]] = {}
+        for pkgver in current:
+            try:
+                name, version = pkgver.rsplit("-", 1)
+            except ValueError:
+                continue
+            by_name.setdefault(name, []).append(version)
+        return [
+            f"{name}=={versions[0]}"
+            for name, versions in sorted(by_name.items())
+            if name not in requested and len(versions) == 1
+            and (self.pkg_dir / name / versions[0] / "package.yaml").exists()
+        ]
+
+    @staticmethod
+    def read_requirements(path: Path) -> List[str]:
+        """Requirements from a file: one per line, '#' starts a comment."""
+        lines = Path(path).read_text(encoding="utf-8").splitlines()
+        return [line.split("#", 1)[0].strip() for line in lines if line.split("#", 1)[0].strip()]
+
     def uninstall_package(self, env_name: str, pkgver: str) -> List[str]:
         """
         Remove a specific package-version from an environment
@@ -163,23 +239,46 @@ class PackageManager:
             logger.error(f"Environment '{env_name}' not found.")
             return []
 
-        env_data = load_yaml(env_file)
-        current = set(env_data.get("packages", []))
-        if pkgver not in current:
+        def remove(env_data):
+            current = set(env_data.get("packages", []))
+            if pkgver not in current:
+                return False
+            current.remove(pkgver)
+            env_data["packages"] = sorted(current)
+            return True
+
+        if not update_yaml(env_file, remove):
             logger.warning(f"Package '{pkgver}' is not installed in '{env_name}'.")
             return []
 
-        current.remove(pkgver)
-        env_data["packages"] = current
-        save_yaml(env_file, env_data)
         logger.success(f"Uninstalled package '{pkgver}' from environment '{env_name}'.")
+        self._refresh_scripts(env_name, env_file)
         return [pkgver]
 
+    @staticmethod
+    def _refresh_scripts(env_name: str, env_file: Path):
+        # Imported here: shell_scripts -> activation_cache imports this module
+        from nexon_cli.core.shell_scripts import refresh_activation_scripts
+        refresh_activation_scripts(env_name, env_file)
+
+    @profiled("env_vars.compose")
     def resolve_package_env_vars(self, package_list: List[str]) -> Dict[str, str]:
         """
         Aggregate all 'env' blocks from each package version into a single dict
         """
-        merged: Dict[str, str] = {}
+        steps, _ = self.compile_package_env(package_list)
+        return self.apply_package_env(steps)
+
+    def compile_package_env(self, package_list: List[str]) -> Tuple[Dict[str, List[List[str]]], List[Path]]:
+        """
+        Read the 'env' block of each package version once and turn it into
+        per-variable steps that apply_package_env() replays against the current
+        environment: ['sub', template] replaces {PATH} with the value so far,
+        ['prepend', value] puts the value in front of it.
+        Returns (steps, package.yaml paths consulted, including missing ones).
+        """
+        steps: Dict[str, List[List[str]]] = {}
+        manifests: List[Path] = []
         for pv in package_list:
             try:
                 name, ver = pv.rsplit('-', 1)
@@ -188,19 +287,38 @@ class PackageManager:
                 continue
 
             pkg_file = self.pkg_dir / name / ver / "package.yaml"
+            manifests.append(pkg_file)
             if not pkg_file.exists():
                 logger.warning(f"Metadata not found for '{pv}', skipping env-vars.")
                 continue
 
-            meta = load_yaml(pkg_file)
+            with phase("env_vars.load_yaml"):
+                meta = load_yaml(pkg_file)
             for key, val in meta.get("env", {}).items():
                 # Expand placeholders: {root} -> package root path, {PATH} -> existing path
                 root = str(self.pkg_dir / name / ver)
                 template = val.replace("{root}", root)
                 # Support appending to existing variables
-                existing = merged.get(key, os.environ.get(key, ""))
-                merged[key] = template.replace("{PATH}", existing) if "{PATH}" in template else \
-                    f"{template}{os.pathsep if existing else ""}{existing}"
+                steps.setdefault(key, []).append(["sub" if "{PATH}" in template else "prepend", template])
+        return steps, manifests
+
+    @staticmethod
+    def apply_package_env(steps: Dict[str, List[List[str]]], environ: Dict[str, str] = None) -> Dict[str, str]:
+        """
+        Evaluate compile_package_env() steps against `environ` (default: os.environ).
+        A ['set', value] step (added by activation, e.g. NEXON_MODULE_INDEX) replaces the value.
+        """
+        environ = os.environ if environ is None else environ
+        merged: Dict[str, str] = {}
+        for key, key_steps in steps.items():
+            existing = environ.get(key, "")
+            for kind, template in key_steps:
+                if kind == "set":
+                    existing = template
+                else:
+                    existing = template.replace("{PATH}", existing) if kind == "sub" else \
+                        f"{template}{os.pathsep if existing else ""}{existing}"
+            merged[key] = existing
         return merged
 
     def wrap_tool(
@@ -227,17 +345,25 @@ class PackageManager:
         except InvalidVersion:
             raise ValueError(f"Invalid version: {version}")
 
-        pkg_root = Path(PACKAGES_DIR) / pkg_name / version
+        pkg_root = self.pkg_dir / pkg_name / version
         pkg_src = pkg_root / "src"
-        pkg_root.mkdir(parents=True, exist_ok=True)
         # Ensure clean slate
         if pkg_root.exists():
             logger.warning(f"Overwriting existing package '{pkg_name}-{version}'")
             shutil.rmtree(pkg_root)
         pkg_src.mkdir(parents=True, exist_ok=True)
 
-        # Copy user tool into src/
-        shutil.copytree(src, pkg_src, dirs_exist_ok=True)
+        # Link user tool into src/ from the blob store (files already stored cost no I/O)
+        from nexon_cli.core.blob_store import blob_store
+
+        store = blob_store()
+        if store is not None:
+            with phase("wrap_tool.store"):
+                stats = store.import_tree(src, pkg_src)
+            logger.info(f"Stored {stats['files']} files: {stats['new_bytes'] / 1e6:.1f} MB new, "
+                        f"{stats['linked_bytes'] / 1e6:.1f} MB linked")
+        else:
+            shutil.copytree(src, pkg_src, dirs_exist_ok=True)
 
         # Generate package.yaml
         pkg_file = pkg_root / "package.yaml"
@@ -282,3 +408,4 @@ class PackageManager:
         save_yaml(pkg_file, spec)
         logger.success(f"Wrapped tool as package: {pkg_name}-{version}")
         return f"{pkg_name}-{version}"
+
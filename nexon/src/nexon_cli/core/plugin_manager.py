@@ -1,10 +1,11 @@
 import importlib
-import yaml
 from pathlib import Path
 from typing import Dict, List, Callable
 
 from nexon_cli.core.configs import config
+from nexon_cli.utils.file_ops import load_yaml
 from nexon_cli.utils.logger import logger
+from nexon_cli.utils.profiler import phase
 
 HOOK_POINTS = [
     "pre_create_env",
@@ -24,13 +25,15 @@ class PluginManager:
         self.plugins_dir = Path(config.base_dir) / "plugins"
         self.plugins_file = Path(config.base_dir) / "plugins.yaml"
         self._hooks: Dict[str, List[Callable]] = {h: [] for h in HOOK_POINTS}
-        self._load_enabled_plugins()
+        # Plugins are discovered on the first trigger(), not when this module is imported
+        self._loaded = False
 
     def _load_enabled_plugins(self):
+        self._loaded = True
         if not self.plugins_file.exists():
             logger.info("No plugins.yaml found - skipping plugin load.")
             return
-        data = yaml.safe_load(open(self.plugins_file)) or {}
+        data = load_yaml(self.plugins_file) or {}
         for name in data.get("plugins", []):
             try:
                 mod_path = f"nexon_cli.plugins.{name}.hooks"
@@ -45,14 +48,33 @@ class PluginManager:
 
     def trigger(self, hook: str, **kwargs):
         """
-        Call all registered hook functions for the given hook point,
-        passing kwargs through.
+        Call all registered hook functions for the given hook point.
+        Each one gets only the kwargs it declares (all of them if it takes
+        **kwargs), so hooks keep working when a hook point gains new fields.
         """
-        for fn in self._hooks.get(hook, []):
-            try:
-                fn(**kwargs)
-            except Exception as e:
-                logger.error(f"Plugin hook error in {fn.__module__}.{fn.__name__}: {e}")
+        with phase(f"plugins.{hook}"):
+            if not self._loaded:
+                self._load_enabled_plugins()
+            for fn in self._hooks.get(hook, []):
+                try:
+                    fn(**_accepted(fn, kwargs))
+                except Exception as e:
+                    logger.error(f"Plugin hook error in {fn.__module__}.{fn.__name__}: {e}")
+
+
+def _accepted(fn: Callable, kwargs: dict) -> dict:
+    """The subset of `kwargs` that `fn` can be called with."""
+    import inspect
+
+    try:
+        params = inspect.signature(fn).parameters.values()
+    except (TypeError, ValueError):
+        return kwargs
+    if any(p.kind is inspect.Parameter.VAR_KEYWORD for p in params):
+        return kwargs
+    names = {p.name for p in params if p.kind in (inspect.Parameter.POSITIONAL_OR_KEYWORD,
+                                                   inspect.Parameter.KEYWORD_ONLY)}
+    return {k: v for k, v in kwargs.items() if k in names}
 
 
 # expose a singleton
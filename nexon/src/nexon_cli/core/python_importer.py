@@ -1,13 +1,21 @@
 import subprocess
 import tempfile
+import time
 import shutil
-import wheel_inspect
 import yaml
 import tarfile
+import zipfile
+from email.parser import BytesHeaderParser
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from pathlib import Path
 
+from packaging.requirements import InvalidRequirement, Requirement
+from packaging.utils import canonicalize_name
+
 from nexon_cli.utils.logger import logger
+from nexon_cli.core.blob_store import blob_store
 from nexon_cli.core.configs import config
+from nexon_cli.core.download_cache import download_cache, find_local
 
 
 class PythonImporterError(Exception):
@@ -19,152 +27,257 @@ class PythonPackageImporter:
     Download a package (wheel or sdist) from PyPI or local path,
     inspect metadata (including Required-Dict), scaffold Nexon packages,
     and optionally import dependencies as Nexon packages too.
+
+    Downloads are kept in the download cache and a requirement it (or the
+    `find_links` directory) can satisfy never reaches pip; `offline` makes
+    anything else an error instead of a download.
     """
 
+    def __init__(self, offline: bool | None = None, find_links: str | None = None):
+        self.offline = config.offline if offline is None else offline
+        self.find_links = find_links or config.find_links
+        self.cache = download_cache()
+
     def import_from_pypi(self,
                          requirement: str,
                          index_url: str | None = None,
                          extra_index_url: str | None = None,
-                         include_deps: bool = False
+                         include_deps: bool = False,
+                         jobs: int | None = None
                          ) -> list[str]:
         """
         Download & import a PyPI package and (optionally) its Requires-Dist dependencies.
         Returns a list of all imported 'name-version' strings.
         """
-        imported = []
+        return self.import_requirements([requirement], index_url, extra_index_url, include_deps, jobs)
 
-        def _rec_import(req: str):
-            if req in seen:
+    def import_requirements(self,
+                            requirements: list[str],
+                            index_url: str | None = None,
+                            extra_index_url: str | None = None,
+                            include_deps: bool = False,
+                            jobs: int | None = None
+                            ) -> list[str]:
+        """
+        Import `requirements` (and, with include_deps, their dependency closure)
+        on a pool of at most `jobs` workers (default NEXON_IMPORT_JOBS). Each
+        download + inspection is one task; dependencies are queued as soon as
+        their dependant is inspected, so the whole frontier is fetched at once.
+        Every project is fetched once, whatever specifiers ask for it (the
+        first one seen wins); dependencies whose markers don't apply are skipped.
+        """
+        jobs = jobs or config.import_jobs
+        seen: set[str] = set()
+        imported: list[str] = []
+        total_bytes = 0
+        start = time.perf_counter()
+
+        def schedule(req: str, pool, running):
+            key = _project_key(req)
+            if key in seen:
                 return
-            seen.add(req)
-
-            # 1) Download without deps
-            with tempfile.TemporaryDirectory() as td:
-                cmd = ["pip", "download", "--no-deps", "--dest", td, req]
-                if index_url:
-                    cmd += ["--index-url", index_url]
-                if extra_index_url:
-                    cmd += ["--extra-index-url", extra_index_url]
-                try:
-                    subprocess.run(cmd, check=True, capture_output=True)
-                except subprocess.CalledProcessError as e:
-                    raise PythonImporterError(f"pip download failed for {req}: {e.stderr.decode()}")
-
-                # 2) Find the wheel or sdist
-                files = list(Path(td).glob("*.whl")) or list(Path(td).glob("*.tar.gz"))
-                if not files:
-                    raise PythonImporterError(f"No wheel or sdist found for {req}")
-                dist_path = files[0]
-
-                # 3) Inspect metadata
-                name, version, requires = self._inspect_metadata(dist_path)
-
-                pkgver = f"{name}-{version}"
-                if pkgver in imported:
-                    return
-                imported.append(pkgver)
-
-                # 4) Scaffold package directory
-                pkg_dir = Path(config.packages_dir) / name / version
-                pkg_dir.mkdir(parents=True, exist_ok=True)
-                shutil.copy(dist_path, pkg_dir / dist_path.name)
-
-                # 5) Write package.yaml with requires from metadata
-                pkg_yaml = {
-                    "name": name,
-                    "version": version,
-                    "requires": requires,
-                    "env": {},
-                    "build": {},
-                    "commands": {}
-                }
-                (pkg_dir / "package.yaml").write_text(
-                    yaml.safe_dump(pkg_yaml), encoding="utf-8"
-                )
-
-            # 6) Recurse into dependencies
-            if include_deps:
-                for dep in requires:
-                    _rec_import(dep)
-
-        seen = set()
-        _rec_import(requirement)
+            seen.add(key)
+            running[pool.submit(self._fetch, req, index_url, extra_index_url)] = req
+
+        with ThreadPoolExecutor(max_workers=jobs) as pool:
+            running = {}
+            for req in requirements:
+                schedule(req, pool, running)
+            while running:
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    req = running.pop(future)
+                    try:
+                        pkgver, requires, size, elapsed = future.result()
+                    except Exception:
+                        # Don't let the pool shutdown keep fetching the rest of the frontier
+                        for other in running:
+                            other.cancel()
+                        raise
+                    total_bytes += size
+                    if pkgver not in imported:
+                        imported.append(pkgver)
+                    logger.info(f"[{len(imported)}/{len(seen)}] {pkgver} "
+                                f"({size / 1e6:.1f} MB in {elapsed:.1f}s)")
+                    if include_deps:
+                        for dep in requires:
+                            if _applies(dep):
+                                schedule(dep, pool, running)
+
+        elapsed = max(time.perf_counter() - start, 1e-6)
+        logger.success(f"Imported {len(imported)} packages, {total_bytes / 1e6:.1f} MB in {elapsed:.1f}s "
+                       f"({total_bytes / 1e6 / elapsed:.1f} MB/s, {len(imported) / elapsed:.1f} packages/s, "
+                       f"{jobs} workers)")
         return imported
 
+    def _fetch(self, req: str, index_url: str | None, extra_index_url: str | None):
+        """Download one requirement without deps, inspect and scaffold it: (pkgver, requires, bytes, seconds)."""
+        start = time.perf_counter()
+        local = self._local(req)
+        if local is not None:
+            name, version, requires = self._inspect_metadata(local)
+            self._scaffold(local, name, version, requires)
+            return f"{name}-{version}", requires, 0, time.perf_counter() - start
+        if self.offline:
+            where = f"download cache or {self.find_links}" if self.find_links else "download cache"
+            raise PythonImporterError(f"{req} is not in the {where} (offline)")
+
+        with tempfile.TemporaryDirectory() as td:
+            cmd = ["pip", "download", "--no-deps", "--dest", td, req]
+            if index_url:
+                cmd += ["--index-url", index_url]
+            if extra_index_url:
+                cmd += ["--extra-index-url", extra_index_url]
+            try:
+                subprocess.run(cmd, check=True, capture_output=True)
+            except subprocess.CalledProcessError as e:
+                raise PythonImporterError(f"pip download failed for {req}: {e.stderr.decode()}")
+
+            # Find the wheel or sdist
+            files = list(Path(td).glob("*.whl")) or list(Path(td).glob("*.tar.gz"))
+            if not files:
+                raise PythonImporterError(f"No wheel or sdist found for {req}")
+            dist_path = files[0]
+            size = dist_path.stat().st_size
+            if self.cache is not None:
+                # Best effort: inspect and scaffold from the download itself, which
+                # another worker's eviction can't remove from under us
+                try:
+                    self.cache.add(dist_path)
+                except OSError as e:
+                    logger.warning(f"Could not store {dist_path.name} in the download cache: {e}")
+            name, version, requires = self._inspect_metadata(dist_path)
+            self._scaffold(dist_path, name, version, requires)
+        return f"{name}-{version}", requires, size, time.perf_counter() - start
+
+    def _local(self, req: str) -> Path | None:
+        """A distribution satisfying `req` already on this host: the download cache, then find_links."""
+        if self.cache is not None:
+            found = self.cache.find(req)
+            if found is not None:
+                return found
+        if self.find_links:
+            return find_local(req, Path(self.find_links))
+        return None
+
     def import_from_file(self,
                          dist_path: Path,
-                         include_deps: bool = False
+                         include_deps: bool = False,
+                         jobs: int | None = None
                          ) -> list[str]:
         """
         Inspect a local .whl or .tar.gz, scaffold the Nexon package,
         and optionally import Requires-Dist dependencies.
         """
-        imported = []
+        name, version, requires = self._inspect_metadata(dist_path)
+        self._scaffold(dist_path, name, version, requires)
+        logger.success(f"Imported {name}-{version} from file (requires: {requires})")
+        imported = [f"{name}-{version}"]
 
-        def _rec_file(path: Path):
-            name, version, requires = self._inspect_metadata(path)
-            pkgver = f"{name}-{version}"
-            if pkgver in imported:
-                return
-            imported.append(pkgver)
-
-            pkg_dir = Path(config.packages_dir) / name / version
-            pkg_dir.mkdir(parents=True, exist_ok=True)
-            shutil.copy(path, pkg_dir / path.name)
-            pkg_yaml = {
-                "name": name,
-                "version": version,
-                "requires": requires,
-                "env": {},
-                "build": {},
-                "commands": {}
-            }
-            (pkg_dir / "package.yaml").write_text(
-                yaml.safe_dump(pkg_yaml), encoding="utf-8"
-            )
-            logger.success(f"Imported {pkgver} from file (requires: {requires})")
-
-            if include_deps:
-                for dep in requires:
-                    # delegate to import_from_pypi for remote deps
-                    self.import_from_pypi(dep, include_deps=True)
-
-        _rec_file(dist_path)
+        if include_deps:
+            # Remote deps are fetched in parallel by the PyPI importer
+            deps = [dep for dep in requires if _applies(dep)]
+            if deps:
+                imported += [pv for pv in self.import_requirements(deps, include_deps=True, jobs=jobs)
+                             if pv not in imported]
         return imported
 
+    def _scaffold(self, dist_path: Path, name: str, version: str, requires: list[str]):
+        """Place the distribution in its version directory and write package.yaml."""
+        pkg_dir = Path(config.packages_dir) / name / version
+        pkg_dir.mkdir(parents=True, exist_ok=True)
+        self._place(dist_path, pkg_dir / dist_path.name)
+        pkg_yaml = {
+            "name": name,
+            "version": version,
+            "requires": requires,
+            "env": {},
+            "build": {},
+            "commands": {}
+        }
+        (pkg_dir / "package.yaml").write_text(
+            yaml.safe_dump(pkg_yaml), encoding="utf-8"
+        )
+
+    @staticmethod
+    def _place(dist_path: Path, dest: Path):
+        """Put a distribution into its version directory, via the blob store when enabled."""
+        store = blob_store()
+        if store is not None:
+            store.import_file(dist_path, dest)
+        else:
+            shutil.copy(dist_path, dest)
+
     def _inspect_metadata(self, dist_path: Path) -> tuple[str, str, list[str]]:
         """
-        Returns (name, version, requires_list) by inspecting wheel or PKG-INFO.
+        Returns (name, version, requires_list) from the wheel's METADATA or the sdist's PKG-INFO.
+        Only that member is read (from the zip central directory / the first tar entries),
+        so the cost doesn't grow with the archive.
         """
-        requires = []
+        dist_path = Path(dist_path)
         if dist_path.suffix == ".whl":
-            info = wheel_inspect.inspect_wheel(dist_path)
-            print("info", info['dist_info']["metadata"].keys())
-            name = info['dist_info']["metadata"]["name"]
-            version = info['dist_info']["metadata"]["version"]
-            requires = info['dist_info']["metadata"].get("requires_dist", []) or []
+            raw = _wheel_metadata(dist_path)
         else:
-            # sdist: extract PKG-INFO
-            with tarfile.open(dist_path) as tar:
-                members = [m for m in tar.getmembers() if m.name.endswith("PKG-INFO")]
-                if not members:
-                    raise PythonImporterError("No PKG-INFO in sdist")
-                f = tar.extractfile(members[0])
-                content = f.read().decode()
-            meta = {}
-            for line in content.splitlines():
-                if ":" in line:
-                    key, val = line.split(":", 1)
-                    key = key.strip()
-                    val = val.strip()
-                    if key == "Requires-Dist":
-                        requires.append(val)
-                    else:
-                        meta.setdefault(key, val)
-            name = meta.get("Name")
-            version = meta.get("Version")
-            if not name or not version:
-                raise PythonImporterError("Failed to parse Name/Version from PKG-INFO")
-
-        # Normalize requires strings (PEP 508)
-        return name, version, requires
+            raw = _sdist_pkg_info(dist_path)
+        meta = BytesHeaderParser().parsebytes(raw)
+        name, version = meta.get("Name"), meta.get("Version")
+        if not name or not version:
+            raise PythonImporterError(f"Failed to parse Name/Version from {dist_path.name}")
+        requires = [" ".join(r.split()) for r in meta.get_all("Requires-Dist") or []]
+        return name.strip(), version.strip(), requires
+
+
+def _wheel_metadata(dist_path: Path) -> bytes:
+    """
+    The .dist-info/METADATA member of a wheel. If there are several, the one
+    named after the wheel's 'name-version-...' file name wins; the file name
+    is only a hint, so renamed wheels still work.
+    """
+    prefix = "-".join(dist_path.name.split("-")[:2]).lower() + ".dist-info/"
+    try:
+        with zipfile.ZipFile(dist_path) as zf:
+            candidates = [n for n in zf.namelist()
+                          if n.count("/") == 1 and n.endswith(".dist-info/METADATA")]
+            if not candidates:
+                raise PythonImporterError(f"No .dist-info/METADATA in {dist_path.name}")
+            candidates.sort(key=lambda n: not n.lower().startswith(prefix))
+            return zf.read(candidates[0])
+    except zipfile.BadZipFile as e:
+        raise PythonImporterError(f"Invalid wheel {dist_path.name}: {e}")
+
+
+def _sdist_pkg_info(dist_path: Path) -> bytes:
+    """The top-level PKG-INFO of an sdist; the tar is only read up to it."""
+    fallback = None
+    try:
+        with tarfile.open(dist_path) as tar:
+            for member in tar:
+                if not member.isfile() or not member.name.endswith("PKG-INFO"):
+                    continue
+                if member.name.count("/") == 1:
+                    return tar.extractfile(member).read()
+                if fallback is None:
+                    # e.g. src/<name>.egg-info/PKG-INFO, only used if there's no top-level one
+                    fallback = tar.extractfile(member).read()
+    except tarfile.TarError as e:
+        raise PythonImporterError(f"Invalid sdist {dist_path.name}: {e}")
+    if fallback is None:
+        raise PythonImporterError("No PKG-INFO in sdist")
+    return fallback
+
+
+def _project_key(req: str) -> str:
+    """Canonical project name of a requirement (the raw string if it isn't PEP 508)."""
+    try:
+        return canonicalize_name(Requirement(req).name)
+    except InvalidRequirement:
+        return req.strip()
+
+
+def _applies(req: str) -> bool:
+    """False for Requires-Dist entries whose markers exclude this platform or need an extra."""
+    try:
+        marker = Requirement(req).marker
+    except InvalidRequirement:
+        return True
+    return marker is None or marker.evaluate({"extra": ""})
@@ -4,7 +4,7 @@ from pathlib import Path
 from typing import List
 
 from nexon_cli.utils.paths import RECIPES_DIR, ENVIRONMENTS_DIR
-from nexon_cli.utils.file_ops import save_yaml, load_yaml
+from nexon_cli.utils.file_ops import save_yaml, load_yaml, update_yaml
 from nexon_cli.utils.logger import logger
 
 
@@ -75,21 +75,24 @@ class RecipeManager:
             logger.error(f"Base environment '{base_env}' not found.")
             return
 
-        env_data = load_yaml(env_file)
-        pkgs = env_data.get("packages", [])
         overrides = data.get("overrides", [])
-        added_pkgs = [p for p in overrides if p not in pkgs]
-        pkgs.extend(added_pkgs)
-        env_data["packages"] = pkgs
-
         extra_env = data.get("env", {})
-        if extra_env:
-            existing_env = env_data.get("env", {})
-            existing_env.update(extra_env)
-            env_data["env"] = existing_env
 
-        save_yaml(env_file, env_data)
+        def merge(env_data):
+            pkgs = env_data.get("packages", [])
+            added = [p for p in overrides if p not in pkgs]
+            pkgs.extend(added)
+            env_data["packages"] = pkgs
+            if extra_env:
+                existing_env = env_data.get("env", {})
+                existing_env.update(extra_env)
+                env_data["env"] = existing_env
+            return added
+
+        added_pkgs = update_yaml(env_file, merge)
         logger.success(f"Applied recipe '{name}' to '{base_env}'.")
+        from nexon_cli.core.shell_scripts import refresh_activation_scripts
+        refresh_activation_scripts(base_env, env_file)
         if added_pkgs:
             logger.info(f"  Added packages: {', '.join(added_pkgs)}")
         if extra_env:
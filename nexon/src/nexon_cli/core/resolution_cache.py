@@ -0,0 +1,77 @@
+import hashlib
+import json
+import sqlite3
+from typing import Dict, Iterable, List, Optional
+
+from nexon_cli.core.package_catalog import PackageCatalog
+
+# Monotonic use counter (wall clocks can tie or step backwards)
+_NEXT_USE = "(SELECT COALESCE(MAX(last_used), 0) + 1 FROM resolutions)"
+
+
+class ResolutionCache:
+    """
+    LRU cache of solved dependency graphs, stored next to the package catalog.
+
+    Entries are keyed by the normalized requirement set and the catalog
+    generation, so any change to the package tree invalidates them without
+    an explicit purge (stale entries simply age out of the LRU).
+    """
+
+    def __init__(self, catalog: PackageCatalog, max_entries: int = 256):
+        self.catalog = catalog
+        self.max_entries = max_entries
+        self._ready = False
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = self.catalog.connect()
+        if not self._ready:
+            with conn:
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS resolutions ("
+                    " key TEXT PRIMARY KEY, graph TEXT NOT NULL, last_used INTEGER NOT NULL)"
+                )
+            self._ready = True
+        return conn
+
+    @staticmethod
+    def key(requirements: Iterable[str], generation: int) -> str:
+        """Cache key for a normalized requirement set at a given catalog generation."""
+        payload = json.dumps([generation, sorted(set(requirements))])
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[Dict[str, List[str]]]:
+        """Return the cached graph for `key` (marking it recently used), or None."""
+        if not self.enabled:
+            return None
+        conn = self._conn()
+        row = conn.execute("SELECT graph FROM resolutions WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        with conn:
+            conn.execute(f"UPDATE resolutions SET last_used = {_NEXT_USE} WHERE key = ?", (key,))
+        return json.loads(row[0])
+
+    def put(self, key: str, graph: Dict[str, List[str]]):
+        """Store a graph, evicting the least recently used entries beyond max_entries."""
+        if not self.enabled:
+            return
+        conn = self._conn()
+        with conn:
+            conn.execute(
+                f"INSERT OR REPLACE INTO resolutions (key, graph, last_used) VALUES (?, ?, {_NEXT_USE})",
+                (key, json.dumps(graph))
+            )
+            conn.execute(
+                "DELETE FROM resolutions WHERE key NOT IN"
+                " (SELECT key FROM resolutions ORDER BY last_used DESC LIMIT ?)",
+                (self.max_entries,)
+            )
+
+    def clear(self):
+        with self._conn() as conn:
+            conn.execute("DELETE FROM resolutions")
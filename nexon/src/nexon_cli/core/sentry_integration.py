@@ -1,13 +1,15 @@
 import logging
 import os
-import sentry_sdk
-from sentry_sdk.integrations.logging import LoggingIntegration
 
 
 def init_sentry():
     dsn = os.getenv("SENTRY_DSN_CLI")
     if not dsn:
         return
+    # Imported here: sentry_sdk is slow to import and most runs have no DSN
+    import sentry_sdk
+    from sentry_sdk.integrations.logging import LoggingIntegration
+
     sentry_sdk.init(
         dsn=dsn,
         traces_sample_rate=0.1,
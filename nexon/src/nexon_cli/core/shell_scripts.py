@@ -0,0 +1,204 @@
+import hashlib
+import json
+import os
+import re
+import uuid
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+from nexon_cli.core.activation_cache import ActivationCache
+from nexon_cli.core.configs import config
+from nexon_cli.utils.logger import logger
+
+# Shell flavour -> script file name (next to the activation context in ~/.nexon/activation/<env>/)
+SHELLS = {
+    "bash": "activate.bash",
+    "zsh": "activate.zsh",
+    "fish": "activate.fish",
+    "powershell": "activate.ps1",
+}
+
+_DIGEST_PREFIX = "nexon-inputs: "
+_VALID_NAME = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+
+
+class ShellScriptError(Exception):
+    """Raised for unknown shell flavours"""
+
+
+def inputs_digest(env_name: str, context: Dict[str, Any]) -> str:
+    """Hash of everything a generated script depends on."""
+    return hashlib.sha256(json.dumps(
+        [env_name, context["packages"], context["steps"], os.pathsep], sort_keys=True
+    ).encode("utf-8")).hexdigest()
+
+
+def render_script(shell: str, env_name: str, context: Dict[str, Any]) -> str:
+    """
+    Activation script for `shell` that replays the context's env-var steps
+    natively (against the shell's current values, like activate_environment
+    does against os.environ) and defines `nexon_deactivate` to undo them.
+    """
+    if shell not in SHELLS:
+        raise ShellScriptError(f"Unknown shell '{shell}'; expected one of {', '.join(SHELLS)}")
+
+    steps = {"NEXON_ENV": [["set", env_name]]}
+    for key, key_steps in context["steps"].items():
+        if not _VALID_NAME.match(key):
+            logger.warning(f"Skipping env-var '{key}' in {shell} script: not a valid variable name")
+            continue
+        steps.setdefault(key, []).extend(key_steps)
+
+    header = [
+        f"# Nexon activation script for environment '{env_name}' ({shell}). Generated - do not edit.",
+        f"# {_DIGEST_PREFIX}{inputs_digest(env_name, context)}",
+    ]
+    render = _render_powershell if shell == "powershell" else _render_fish if shell == "fish" else _render_posix
+    return "\n".join(header + render(steps)) + "\n"
+
+
+def script_path(env_name: str, shell: str, cache_dir: Path = None) -> Path:
+    if shell not in SHELLS:
+        raise ShellScriptError(f"Unknown shell '{shell}'; expected one of {', '.join(SHELLS)}")
+    return Path(cache_dir or ActivationCache().cache_dir) / env_name / SHELLS[shell]
+
+
+def write_activation_scripts(env_name: str, env_file: Path, shells: Iterable[str] = None,
+                             cache: ActivationCache = None) -> Dict[str, Path]:
+    """
+    (Re)generate the activation scripts of `env_name` for `shells` (default:
+    NEXON_ACTIVATION_SCRIPTS). A script whose recorded inputs digest still
+    matches is left untouched. Returns {shell: path}.
+    """
+    cache = cache or ActivationCache()
+    shells = list(config.activation_scripts if shells is None else shells)
+    if not shells:
+        return {}
+    context = cache.load(env_name, env_file)
+    digest = inputs_digest(env_name, context)
+
+    written = {}
+    for shell in shells:
+        path = script_path(env_name, shell, cache.cache_dir)
+        if _recorded_digest(path) != digest:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_name(f".tmp-{uuid.uuid4().hex}")
+            # newline="\n": the same bytes on every platform, so the digest check stays stable
+            with open(tmp, "w", encoding="utf-8", newline="\n") as f:
+                f.write(render_script(shell, env_name, context))
+            os.replace(tmp, path)
+        written[shell] = path
+    return written
+
+
+def refresh_activation_scripts(env_name: str, env_file: Path):
+    """write_activation_scripts() for callers that just changed an environment: failures only warn."""
+    try:
+        write_activation_scripts(env_name, env_file)
+    except OSError as e:
+        logger.warning(f"Could not update activation scripts for '{env_name}': {e}")
+
+
+def _recorded_digest(path: Path) -> Optional[str]:
+    try:
+        with open(path, encoding="utf-8") as f:
+            f.readline()
+            line = f.readline()
+    except OSError:
+        return None
+    _, _, digest = line.partition(_DIGEST_PREFIX)
+    return digest.strip() or None
+
+
+# ---------------------------------------------------------------------- #
+# Per-shell rendering. {PATH} in a 'sub' step is the variable's own value.
+# ---------------------------------------------------------------------- #
+def _posix_quote(text: str) -> str:
+    return '"' + re.sub(r'([\\"$`])', r"\\\1", text) + '"'
+
+
+def _render_posix(steps: Dict[str, List[List[str]]]) -> List[str]:
+    lines = ["command -v nexon_deactivate >/dev/null 2>&1 && nexon_deactivate"]
+    restore = []
+    for key in steps:
+        lines.append(f'_NEXON_HAD_{key}="${{{key}+1}}"; _NEXON_OLD_{key}="${{{key}-}}"')
+        restore += [
+            f'    if [ -n "$_NEXON_HAD_{key}" ]; then export {key}="$_NEXON_OLD_{key}"; else unset {key}; fi',
+            f"    unset _NEXON_HAD_{key} _NEXON_OLD_{key}",
+        ]
+    lines += ["nexon_deactivate() {", *restore, "    unset -f nexon_deactivate", "}"]
+    for key, key_steps in steps.items():
+        for kind, template in key_steps:
+            if kind == "prepend":
+                value = f'{_posix_quote(template)}"${{{key}:+{os.pathsep}${key}}}"'
+            elif kind == "sub":
+                value = f'"${key}"'.join(_posix_quote(part) for part in template.split("{PATH}"))
+            else:
+                value = _posix_quote(template)
+            lines.append(f"export {key}={value}")
+    return lines
+
+
+def _fish_quote(text: str) -> str:
+    return '"' + re.sub(r'([\\"$])', r"\\\1", text) + '"'
+
+
+def _render_fish(steps: Dict[str, List[List[str]]]) -> List[str]:
+    lines = ["functions -q nexon_deactivate; and nexon_deactivate"]
+    restore = []
+    for key in steps:
+        lines.append(f"if set -q {key}; set -g _nexon_had_{key} 1; set -g _nexon_old_{key} ${key}; end")
+        restore += [
+            f"    if set -q _nexon_had_{key}; set -gx {key} $_nexon_old_{key}; else; set -e {key}; end",
+            f"    set -e _nexon_had_{key} _nexon_old_{key}",
+        ]
+    lines += ["function nexon_deactivate", *restore, "    functions -e nexon_deactivate", "end"]
+    for key, key_steps in steps.items():
+        for kind, template in key_steps:
+            if kind == "prepend":
+                lines += [
+                    f'if test -n "${key}"',
+                    f'    set -gx {key} {_fish_quote(template + os.pathsep)}"${key}"',
+                    "else",
+                    f"    set -gx {key} {_fish_quote(template)}",
+                    "end",
+                ]
+                continue
+            if kind == "sub":
+                value = f'"${key}"'.join(_fish_quote(part) for part in template.split("{PATH}"))
+            else:
+                value = _fish_quote(template)
+            lines.append(f"set -gx {key} {value}")
+    return lines
+
+
+def _ps_quote(text: str) -> str:
+    return "'" + text.replace("'", "''") + "'"
+
+
+def _render_powershell(steps: Dict[str, List[List[str]]]) -> List[str]:
+    names = ", ".join(_ps_quote(key) for key in steps)
+    lines = [
+        "if (Get-Command nexon_deactivate -ErrorAction SilentlyContinue) { nexon_deactivate }",
+        "$global:_NexonBackup = @{}",
+        f"foreach ($name in @({names})) {{ $global:_NexonBackup[$name] = [Environment]::GetEnvironmentVariable($name) }}",
+        "function global:nexon_deactivate {",
+        "    foreach ($name in $global:_NexonBackup.Keys) "
+        "{ [Environment]::SetEnvironmentVariable($name, $global:_NexonBackup[$name]) }",
+        "    Remove-Variable -Name _NexonBackup -Scope Global",
+        "    Remove-Item -Path function:nexon_deactivate",
+        "}",
+    ]
+    for key, key_steps in steps.items():
+        for kind, template in key_steps:
+            if kind == "prepend":
+                lines.append(
+                    f"if ($env:{key}) {{ $env:{key} = {_ps_quote(template + os.pathsep)} + $env:{key} }} "
+                    f"else {{ $env:{key} = {_ps_quote(template)} }}"
+                )
+            elif kind == "sub":
+                lines.append(f"$env:{key} = " + f" + $env:{key} + ".join(
+                    _ps_quote(part) for part in template.split("{PATH}")))
+            else:
+                lines.append(f"$env:{key} = {_ps_quote(template)}")
+    return lines
@@ -8,6 +8,6 @@ celery_app = Celery(
 
 
 @celery_app.task
-def build_package_task(pkg_name, version):
+def build_package_task(pkg_name, version, use_cache=True):
     from nexon_cli.core.build_manager import BuildManager
-    return BuildManager().build_package(pkg_name, version)
+    return BuildManager(use_cache=use_cache).build_package(pkg_name, version)
@@ -0,0 +1,112 @@
+from bisect import bisect_left, bisect_right
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from packaging.specifiers import Specifier, SpecifierSet
+from packaging.version import Version, InvalidVersion
+
+from nexon_cli.utils.logger import logger
+
+# Operators answered by bisection; anything else ('!=', '===', wildcards) is checked per version
+_BISECT_OPERATORS = ("==", ">=", "<=", ">", "<", "~=")
+
+
+def _base_key(version: Version) -> Tuple[int, Tuple[int, ...]]:
+    """(epoch, release without trailing zeros): the primary sort key of a Version."""
+    release = list(version.release)
+    while len(release) > 1 and release[-1] == 0:
+        release.pop()
+    return version.epoch, tuple(release)
+
+
+class VersionTable:
+    """
+    All versions of one package, parsed once and kept sorted ascending.
+
+    Specifier matching bisects the table for '==', '>=', '<=', '>', '<' and '~='.
+    Versions whose release equals a specifier's own release (where PEP 440 has
+    special pre-/post-/local-release rules) are confirmed with the real
+    Specifier, as are pre-releases; every other version inside the interval is
+    accepted as is.
+    """
+
+    def __init__(self, versions: Dict[Version, str]):
+        self.versions: List[Version] = sorted(versions)
+        self._keys: Dict[Version, str] = versions
+        self._bases = [_base_key(v) for v in self.versions]
+        self._prerelease = [v.is_prerelease for v in self.versions]
+        self.newest_first: Tuple[Version, ...] = tuple(reversed(self.versions))
+
+    @classmethod
+    def from_strings(cls, name: str, version_strings: Iterable[str]) -> "VersionTable":
+        parsed: Dict[Version, str] = {}
+        for ver_str in version_strings:
+            try:
+                parsed[Version(str(ver_str))] = ver_str
+            except InvalidVersion:
+                logger.warning(f"Ignoring invalid version '{ver_str}' for package '{name}'")
+        return cls(parsed)
+
+    def __len__(self) -> int:
+        return len(self.versions)
+
+    def key_of(self, version: Version) -> Optional[str]:
+        """The original version string (as found in the catalog) for a parsed Version."""
+        return self._keys.get(version)
+
+    def match(self, spec: SpecifierSet) -> List[Version]:
+        """All versions contained in `spec`, newest first (same result as `v in spec`)."""
+        lo, hi = 0, len(self.versions)
+        exact: List[Tuple[Tuple, Specifier]] = []
+        residual: List[Specifier] = []
+
+        for s in spec:
+            op, raw = s.operator, s.version
+            if op not in _BISECT_OPERATORS or raw.endswith(".*") or "+" in raw:
+                residual.append(s)
+                continue
+            version = _parse(raw)
+            base = _base_key(version)
+            block_lo = bisect_left(self._bases, base)
+            block_hi = bisect_right(self._bases, base)
+            if op in (">=", ">"):
+                lo = max(lo, block_lo)
+            elif op in ("<=", "<"):
+                hi = min(hi, block_hi)
+            elif op == "==":
+                lo, hi = max(lo, block_lo), min(hi, block_hi)
+            else:  # '~=': >= version, == prefix.*
+                prefix = version.release[:-1]
+                upper = (version.epoch, prefix[:-1] + (prefix[-1] + 1,))
+                lo, hi = max(lo, block_lo), min(hi, bisect_left(self._bases, upper))
+            exact.append((base, s))
+
+        matches = []
+        for i in range(hi - 1, lo - 1, -1):
+            v = self.versions[i]
+            if self._prerelease[i]:
+                # Pre-release admission rules differ between packaging releases: defer to it
+                if v in spec:
+                    matches.append(v)
+                continue
+            if any(self._bases[i] == base and not s.contains(v, prereleases=True) for base, s in exact):
+                continue
+            if any(not s.contains(v, prereleases=True) for s in residual):
+                continue
+            matches.append(v)
+        return matches
+
+    def best(self, spec: SpecifierSet) -> Optional[Version]:
+        """The newest version contained in `spec`, or None."""
+        matches = self.match(spec)
+        return matches[0] if matches else None
+
+
+_parsed: Dict[str, Version] = {}
+
+
+def _parse(raw: str) -> Version:
+    """Version() with a per-process cache; specifier versions repeat a lot."""
+    version = _parsed.get(raw)
+    if version is None:
+        version = _parsed[raw] = Version(raw)
+    return version
@@ -1,5 +1,5 @@
 from pathlib import Path
-from nexon_cli.utils.file_ops import save_yaml, load_yaml
+from nexon_cli.utils.file_ops import save_yaml, load_yaml, update_yaml
 from nexon_cli.utils.logger import logger
 from nexon_cli.utils.paths import WORKSPACES_DIR
 
@@ -44,15 +44,18 @@ def link_environment_to_workspace(workspace_name: str, env_name: str):
         logger.error(f"Workspace '{workspace_name}' not found.")
         return
 
-    ws_data = load_yaml(ws_file)
-    envs = ws_data.get("environments", [])
-    if env_name in envs:
+    def link(ws_data):
+        envs = ws_data.get("environments", [])
+        if env_name in envs:
+            return False
+        envs.append(env_name)
+        ws_data["environments"] = envs
+        return True
+
+    if not update_yaml(ws_file, link):
         logger.warning(f"Environment '{env_name}' already linked to workspace '{workspace_name}'.")
         return
 
-    envs.append(env_name)
-    ws_data["environments"] = envs
-    save_yaml(ws_file, ws_data)
     logger.success(f"Environment '{env_name}' linked to workspace '{workspace_name}'.")
 
 
@@ -0,0 +1,128 @@
+"""
+Nexon import finder, put on PYTHONPATH by environment activation.
+
+Python imports `sitecustomize` at startup; this one reads the module index
+named by NEXON_MODULE_INDEX (written by nexon_cli.core.module_index) and
+puts a finder just before PathFinder on sys.meta_path (built-in and frozen
+modules still come first) that resolves top-level imports of the
+environment's packages straight from it, without probing every PYTHONPATH
+directory. Anything else is looked up on sys.path without the indexed
+directories (the index already knows what they hold); if it isn't there
+either the import fails right away instead of PathFinder probing the
+whole sys.path again. If the index is missing or unreadable nothing is
+installed.
+
+Runs inside whatever interpreter the environment launches (DCCs included),
+so it only uses the standard library and never imports nexon_cli.
+Any other sitecustomize further down sys.path is still run afterwards.
+"""
+import json
+import os
+import sys
+from importlib.machinery import (
+    EXTENSION_SUFFIXES,
+    ExtensionFileLoader,
+    ModuleSpec,
+    PathFinder,
+    SourceFileLoader,
+    SourcelessFileLoader,
+)
+from importlib.util import spec_from_file_location
+
+INDEX_VERSION = 1
+
+
+class NexonIndexFinder:
+    def __init__(self, index):
+        self.modules = index["modules"]
+        self.entries = set(index["entries"])
+
+    def find_spec(self, fullname, path=None, target=None):
+        if path is not None or "." in fullname:
+            # Submodules are found through their package's __path__
+            return None
+        candidates = self.modules.get(fullname)
+        if candidates is None:
+            spec = PathFinder.find_spec(fullname, self._others(), target)
+            if spec is None:
+                # The indexed directories don't have it either: don't let PathFinder rescan them
+                raise ModuleNotFoundError(f"No module named {fullname!r}", name=fullname)
+            return spec
+
+        portions = []
+        for kind, location in candidates:
+            if kind == "namespace":
+                portions.append(location)
+            elif kind == "package":
+                init = _init_file(location)
+                if init:
+                    return spec_from_file_location(fullname, init, loader=_loader(fullname, init),
+                                                   submodule_search_locations=[location])
+            elif not os.path.exists(location):
+                # Removed since the index was written
+                continue
+            elif kind == "extension":
+                if location.endswith(tuple(EXTENSION_SUFFIXES)):
+                    return spec_from_file_location(fullname, location,
+                                                   loader=ExtensionFileLoader(fullname, location))
+            else:
+                return spec_from_file_location(fullname, location, loader=_loader(fullname, location))
+        if portions:
+            # A namespace package only applies when no regular module of that name exists anywhere
+            spec = PathFinder.find_spec(fullname, self._others(), target)
+            if spec is not None and spec.loader is not None:
+                return spec
+            spec = ModuleSpec(fullname, None, is_package=True)
+            spec.submodule_search_locations = portions
+            return spec
+        return None
+
+    def invalidate_caches(self):
+        pass
+
+    def _others(self):
+        return [p for p in sys.path if p not in self.entries]
+
+
+def _init_file(package_dir):
+    for name in ("__init__.py", "__init__.pyc"):
+        path = os.path.join(package_dir, name)
+        if os.path.exists(path):
+            return path
+    return None
+
+
+def _loader(fullname, path):
+    if path.endswith(".pyc"):
+        return SourcelessFileLoader(fullname, path)
+    return SourceFileLoader(fullname, path)
+
+
+def _install():
+    index_path = os.environ.get("NEXON_MODULE_INDEX")
+    if not index_path:
+        return
+    try:
+        with open(index_path, encoding="utf-8") as f:
+            index = json.load(f)
+    except (OSError, ValueError):
+        return
+    if index.get("version") != INDEX_VERSION:
+        return
+    position = next((i for i, finder in enumerate(sys.meta_path) if finder is PathFinder), len(sys.meta_path))
+    sys.meta_path.insert(position, NexonIndexFinder(index))
+
+
+def _chain():
+    """Run the next sitecustomize on sys.path, which this module shadows."""
+    here = os.path.dirname(os.path.abspath(__file__))
+    others = [p for p in sys.path if os.path.abspath(p or os.curdir) != here]
+    spec = PathFinder.find_spec("sitecustomize", others)
+    if spec is None or spec.loader is None:
+        return
+    module = sys.modules[__name__]
+    spec.loader.exec_module(module)
+
+
+_install()
+_chain()
@@ -1,33 +1,44 @@
 import logging
-from logging.handlers import RotatingFileHandler
 from pathlib import Path
 from datetime import datetime
 
 from nexon_cli.utils.paths import *
+from nexon_cli.utils.profiler import profiled
 
-# Ensure audit directory exits
 audit_dir = Path(BASE_DIR)
-audit_dir.mkdir(parents=True, exist_ok=True)
 
-# Set up logger
+# Set up logger (the file handler is attached on the first entry, see _handler())
 audit_logger = logging.getLogger("nexon_audit")
 audit_logger.setLevel(logging.INFO)
-handler = RotatingFileHandler(
-    audit_dir / "audit.log",
-    maxBytes=5*1024*1024,
-    backupCount=3,
-    encoding="utf-8"
-)
-formatter = logging.Formatter("%(asctime)s | %(message)s", "%Y-%m-%dT%H:%M:%S")
-handler.setFormatter(formatter)
-audit_logger.addHandler(handler)
+handler = None
 
 
+def _handler() -> logging.Handler:
+    global handler
+    if handler is None:
+        from logging.handlers import RotatingFileHandler
+
+        # Ensure audit directory exits
+        audit_dir.mkdir(parents=True, exist_ok=True)
+        handler = RotatingFileHandler(
+            audit_dir / "audit.log",
+            maxBytes=5*1024*1024,
+            backupCount=3,
+            encoding="utf-8"
+        )
+        formatter = logging.Formatter("%(asctime)s | %(message)s", "%Y-%m-%dT%H:%M:%S")
+        handler.setFormatter(formatter)
+        audit_logger.addHandler(handler)
+    return handler
+
+
+@profiled("audit.log")
 def log(action: str, user: str, target: str, details: str = ""):
     """
     Write a single audit entry.
     Format: TIMESTAMP | USER | ACTION | TARGET | DETAILS
     """
+    _handler()
     entry = f"{user} | {action} | {target}"
     if details:
         entry += f" | {details}"
@@ -1,16 +1,55 @@
-import yaml
+import copy
+import os
+import time
+import uuid
+from contextlib import contextmanager
 from pathlib import Path
+from typing import Any, Callable
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+# PyYAML is imported on first use: it is a sizeable share of CLI start-up
+# and commands served from caches (e.g. activate-env) never parse YAML
+_YAML_LOADER = None
+
+# Optimistic rounds update_yaml() tries before doing the whole update under the lock
+UPDATE_RETRIES = 5
 
 
 def save_yaml(path: Path, data: dict):
     """
-    Save a dictionary to a YAML file
+    Save a dictionary to a YAML file. The file is replaced atomically, so
+    readers see either the old or the new content, never a partial write.
     :param path:
     :param data:
     :return:
     """
-    with open(path, 'w', encoding='utf-8') as f:
-        yaml.safe_dump(data, f, default_flow_style=False, sort_keys=False)
+    import yaml
+
+    atomic_write(path, yaml.safe_dump(data, default_flow_style=False, sort_keys=False))
+
+
+def atomic_write(path: Path, text: str):
+    """Write `text` to a temp file next to `path`, fsync it and rename it over `path`."""
+    path = Path(path)
+    tmp = path.with_name(f".{path.name}.{uuid.uuid4().hex}.tmp")
+    try:
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
+        try:
+            os.chmod(tmp, os.stat(path).st_mode & 0o7777)
+        except FileNotFoundError:
+            pass
+        os.replace(tmp, path)
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
 
 
 def load_yaml(path: Path) -> dict:
@@ -20,4 +59,95 @@ def load_yaml(path: Path) -> dict:
     :return:
     """
     with open(path, 'r', encoding='utf-8') as f:
-        return yaml.safe_load(f)
+        return parse_yaml(f)
+
+
+def parse_yaml(raw):
+    """
+    Parse YAML from a string or bytes with the fastest available safe loader
+    :param raw:
+    :return:
+    """
+    import yaml
+
+    return yaml.load(raw, Loader=_yaml_loader())
+
+
+def _yaml_loader():
+    """LibYAML-backed loader when PyYAML was built with it (several times faster)."""
+    global _YAML_LOADER
+    if _YAML_LOADER is None:
+        import yaml
+
+        _YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+    return _YAML_LOADER
+
+
+@contextmanager
+def file_lock(path: Path):
+    """
+    Exclusive advisory lock for `path`, held on a '.<name>.lock' file next to
+    it (the data file itself is replaced on every write, so it can't carry the lock).
+    Blocks until the lock is free; cooperating Nexon processes and threads all use it.
+    """
+    path = Path(path)
+    lock_file = path.with_name(f".{path.name}.lock")
+    fd = os.open(lock_file, os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        if fcntl is not None:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+        else:
+            while True:
+                try:
+                    msvcrt.locking(fd, msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:
+                    # LK_LOCK gives up after ~10s; keep waiting
+                    time.sleep(0.05)
+        yield
+    finally:
+        if fcntl is not None:
+            fcntl.flock(fd, fcntl.LOCK_UN)
+        else:
+            try:
+                os.lseek(fd, 0, os.SEEK_SET)
+                msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+            except OSError:
+                pass
+        os.close(fd)
+
+
+def update_yaml(path: Path, mutate: Callable[[dict], Any], retries: int = UPDATE_RETRIES) -> Any:
+    """
+    Read-modify-write a YAML file safely under concurrent writers.
+
+    `mutate(data)` edits the loaded dictionary in place and returns a result
+    for the caller; it must have no other side effects, as it is re-run
+    whenever another writer got in first. Each round reads and mutates
+    without the lock, then commits under file_lock() only if the file is
+    still byte-for-byte what was read (optimistic concurrency), so slow
+    mutations such as dependency solves run in parallel. After `retries`
+    lost rounds the whole update runs under the lock. Nothing is written
+    when `mutate` leaves the data unchanged; exceptions from it abort the update.
+    Returns mutate's result from the committed round.
+    """
+    path = Path(path)
+    for _ in range(retries):
+        raw = path.read_bytes()
+        data = parse_yaml(raw) or {}
+        before = copy.deepcopy(data)
+        result = mutate(data)
+        if data == before:
+            return result
+        with file_lock(path):
+            if path.read_bytes() == raw:
+                save_yaml(path, data)
+                return result
+
+    with file_lock(path):
+        data = parse_yaml(path.read_bytes()) or {}
+        before = copy.deepcopy(data)
+        result = mutate(data)
+        if data != before:
+            save_yaml(path, data)
+        return result
@@ -11,7 +11,9 @@ WORKSPACES_DIR = BASE_DIR / "workspaces"
 RECIPES_DIR = BASE_DIR / "recipes"
 SETTINGS_PATH = BASE_DIR / "settings.yaml"
 DOCKERFILES_DIR = BASE_DIR / "dockerfiles"
-
-# Ensure all directories exists (call at startup of CLI/core operations)
-for d in (ENVIRONMENTS_DIR, PACKAGES_DIR, WORKSPACES_DIR, RECIPES_DIR):
-    d.mkdir(parents=True, exist_ok=True)
+CATALOG_PATH = BASE_DIR / "catalog.db"
+BUILD_CACHE_DIR = BASE_DIR / "build_cache"
+ACTIVATION_CACHE_DIR = BASE_DIR / "activation"
+BLOB_STORE_DIR = BASE_DIR / "blobs"
+VIEWS_DIR = BASE_DIR / "views"
+DOWNLOAD_CACHE_DIR = BASE_DIR / "downloads"
@@ -0,0 +1,125 @@
+import cProfile
+import functools
+import json
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, List, Optional
+
+# Phase timing is off unless `nexon --profile` turns it on: phase() then costs one global lookup
+_enabled = False
+_stats: Dict[str, List[float]] = {}       # phase -> [calls, total seconds]
+_events: List[tuple] = []                 # ('O'|'C', phase, perf_counter) for speedscope
+_start = 0.0
+_cprofile: Optional[cProfile.Profile] = None
+
+
+def enable(cprofile: bool = False):
+    """Start recording phases (and, optionally, a full cProfile of the process)."""
+    global _enabled, _start, _cprofile
+    _stats.clear()
+    _events.clear()
+    _enabled = True
+    _start = time.perf_counter()
+    if cprofile:
+        _cprofile = cProfile.Profile()
+        _cprofile.enable()
+
+
+def disable():
+    global _enabled, _cprofile
+    _enabled = False
+    if _cprofile is not None:
+        _cprofile.disable()
+
+
+def is_enabled() -> bool:
+    return _enabled
+
+
+@contextmanager
+def phase(name: str):
+    """Time a block as one call of phase `name` (nested phases count towards their parents too)."""
+    if not _enabled:
+        yield
+        return
+    start = time.perf_counter()
+    _events.append(("O", name, start))
+    try:
+        yield
+    finally:
+        end = time.perf_counter()
+        _events.append(("C", name, end))
+        entry = _stats.setdefault(name, [0, 0.0])
+        entry[0] += 1
+        entry[1] += end - start
+
+
+def profiled(name: str):
+    """Decorator form of phase()."""
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return fn(*args, **kwargs)
+            with phase(name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def stats() -> Dict[str, Dict[str, float]]:
+    """{phase: {'calls': n, 'total_ms': ..., 'mean_ms': ...}}, slowest first."""
+    rows = sorted(_stats.items(), key=lambda item: item[1][1], reverse=True)
+    return {
+        name: {"calls": int(calls), "total_ms": total * 1000, "mean_ms": total * 1000 / calls}
+        for name, (calls, total) in rows
+    }
+
+
+def report(output: Optional[Path] = None):
+    """Stop profiling, print the phase table to stderr and write `output` if given."""
+    from rich.console import Console
+    from rich.table import Table
+
+    wall = (time.perf_counter() - _start) * 1000
+    disable()
+    table = Table(title=f"nexon profile ({wall:.1f} ms wall)")
+    table.add_column("Phase")
+    table.add_column("Calls", justify="right")
+    table.add_column("Total ms", justify="right")
+    table.add_column("Mean ms", justify="right")
+    table.add_column("% wall", justify="right")
+    for name, row in stats().items():
+        table.add_row(name, str(row["calls"]), f"{row['total_ms']:.2f}", f"{row['mean_ms']:.3f}",
+                      f"{row['total_ms'] / wall * 100:.1f}" if wall else "-")
+    console = Console(stderr=True)
+    console.print(table)
+
+    if output is not None:
+        output = Path(output)
+        if output.suffix == ".json":
+            output.write_text(json.dumps(_speedscope(output.stem)), encoding="utf-8")
+        elif _cprofile is not None:
+            _cprofile.dump_stats(str(output))
+        console.print(f"Profile written to {output}")
+
+
+def _speedscope(name: str) -> dict:
+    """The recorded phases as a speedscope 'evented' profile (https://www.speedscope.app)."""
+    frames: Dict[str, int] = {}
+    events = []
+    for kind, phase_name, at in _events:
+        frame = frames.setdefault(phase_name, len(frames))
+        events.append({"type": kind, "frame": frame, "at": (at - _start) * 1000})
+    end = (_events[-1][2] - _start) * 1000 if _events else 0.0
+    return {
+        "$schema": "https://www.speedscope.app/file-format-schema.json",
+        "shared": {"frames": [{"name": frame_name} for frame_name in frames]},
+        "profiles": [{
+            "type": "evented", "name": name, "unit": "milliseconds",
+            "startValue": 0, "endValue": end, "events": events,
+        }],
+        "name": name,
+        "exporter": "nexon --profile",
+    }
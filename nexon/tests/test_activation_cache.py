@@ -0,0 +1,56 @@
+import os
+
+import pytest
+
+from nexon_cli.core.activation_cache import ActivationCache
+from nexon_cli.core.package_manager import PackageManager
+from nexon_cli.utils.file_ops import save_yaml
+
+
+@pytest.fixture
+def setup(tmp_path):
+    pkg_dir = tmp_path / "packages"
+    for name, env in (("core", {"PATH": "{root}/bin", "CORE_HOME": "{root}"}),
+                      ("tool", {"PATH": "{root}/bin:{PATH}", "MODE": "fast"})):
+        ver_dir = pkg_dir / name / "1.0"
+        ver_dir.mkdir(parents=True)
+        save_yaml(ver_dir / "package.yaml", {"name": name, "version": "1.0", "env": env})
+    env_file = tmp_path / "env1.yaml"
+    save_yaml(env_file, {"name": "env1", "packages": ["core-1.0", "tool-1.0"]})
+    return pkg_dir, env_file, ActivationCache(pkg_dir, cache_dir=tmp_path / "activation")
+
+
+def test_compiled_steps_match_direct_resolution(setup):
+    pkg_dir, env_file, cache = setup
+    environ = {"PATH": "/usr/bin", "MODE": "slow"}
+    pm = PackageManager()
+    pm.pkg_dir = pkg_dir
+    steps, _ = pm.compile_package_env(["core-1.0", "tool-1.0"])
+
+    assert cache.env_vars("env1", env_file, environ) == pm.apply_package_env(steps, environ)
+    assert cache.env_vars("env1", env_file, environ)["PATH"] == os.pathsep.join(
+        [f"{pkg_dir}/tool/1.0/bin:{pkg_dir}/core/1.0/bin", "/usr/bin"])
+
+
+def test_cache_hit_skips_manifests_and_detects_changes(setup, monkeypatch):
+    pkg_dir, env_file, cache = setup
+    first = cache.load("env1", env_file)
+
+    # A hit never parses YAML
+    monkeypatch.setattr("nexon_cli.core.package_manager.load_yaml", lambda *_: pytest.fail("manifest parsed"))
+    assert cache.load("env1", env_file) == first
+    monkeypatch.undo()
+
+    # Touching a manifest without changing it keeps the context
+    manifest = pkg_dir / "tool" / "1.0" / "package.yaml"
+    os.utime(manifest, ns=(1, 1))
+    assert cache.load("env1", env_file)["steps"] == first["steps"]
+
+    # Editing a manifest recompiles
+    save_yaml(manifest, {"name": "tool", "version": "1.0", "env": {"MODE": "safe"}})
+    assert cache.env_vars("env1", env_file, {})["MODE"] == "safe"
+
+    # Editing the environment file replaces its context
+    save_yaml(env_file, {"name": "env1", "packages": ["core-1.0"]})
+    assert cache.load("env1", env_file)["packages"] == ["core-1.0"]
+    assert len(list((cache.cache_dir / "env1").glob("*.json"))) == 1
@@ -0,0 +1,96 @@
+import fcntl
+import os
+import shutil
+
+import pytest
+
+from nexon_cli.core.blob_store import BlobStore
+from nexon_cli.core.configs import config
+from nexon_cli.core.package_manager import PackageManager
+
+
+@pytest.fixture
+def tool(tmp_path):
+    src = tmp_path / "tool"
+    (src / "bin").mkdir(parents=True)
+    (src / "bin" / "run.sh").write_text("#!/bin/sh\necho hi\n")
+    os.chmod(src / "bin" / "run.sh", 0o755)
+    (src / "lib.py").write_text("VALUE = 1\n")
+    (src / "empty").mkdir()
+    os.symlink("lib.py", src / "alias.py")
+    return src
+
+
+def test_identical_files_are_stored_once(tool, tmp_path):
+    store = BlobStore(tmp_path / "blobs", link_mode="hardlink")
+    first = store.import_tree(tool, tmp_path / "v1")
+    second = store.import_tree(tool, tmp_path / "v2")
+    assert first["files"] == second["files"] == 2
+    assert first["new_bytes"] > 0 and second["new_bytes"] == 0
+
+    v1, v2 = tmp_path / "v1", tmp_path / "v2"
+    assert os.path.samefile(v1 / "lib.py", v2 / "lib.py")
+    assert os.access(v2 / "bin" / "run.sh", os.X_OK) and not os.access(v2 / "lib.py", os.X_OK)
+    assert os.readlink(v2 / "alias.py") == "lib.py" and (v2 / "empty").is_dir()
+
+    # Blobs are read-only so an in-place edit can't leak into other versions
+    assert not (v2 / "lib.py").stat().st_mode & 0o222
+
+    for path in (v1, v2):
+        for f in path.rglob("*"):
+            if f.is_file() and not f.is_symlink():
+                f.unlink()
+    assert store.prune() == 2
+
+
+def test_copy_mode_and_wrap_tool(tool, tmp_path, monkeypatch):
+    store = BlobStore(tmp_path / "blobs", link_mode="copy")
+    store.import_tree(tool, tmp_path / "v1")
+    assert not os.path.samefile(tool / "lib.py", tmp_path / "v1" / "lib.py")
+    assert (tmp_path / "v1" / "lib.py").read_text() == "VALUE = 1\n"
+    assert os.access(tmp_path / "v1" / "bin" / "run.sh", os.X_OK)
+    # Copies don't deduplicate anything, so they bypass the store
+    assert not (tmp_path / "blobs").exists()
+
+    monkeypatch.setattr(config, "base_dir", tmp_path / "base")
+    monkeypatch.setattr("nexon_cli.core.blob_store.BLOB_STORE_DIR", tmp_path / "base" / "blobs")
+    monkeypatch.setenv("NEXON_BLOB_STORE", "1")
+    monkeypatch.delenv("NEXON_BLOB_LINK", raising=False)
+    pm = PackageManager()
+    pm.wrap_tool(str(tool), name="tool", version="1.0.0")
+    pm.wrap_tool(str(tool), name="tool", version="1.1.0")
+    v10, v11 = (pm.pkg_dir / "tool" / v / "src" for v in ("1.0.0", "1.1.0"))
+    assert (v11 / "lib.py").read_text() == "VALUE = 1\n"
+    # auto never shares inodes between versions: each one gets a reflink or a copy
+    assert not os.path.samefile(v10 / "lib.py", v11 / "lib.py")
+    assert os.stat(v10 / "lib.py").st_nlink == 1
+
+
+def test_store_is_opt_in_and_prunable_from_the_cli(tool, tmp_path, monkeypatch):
+    from typer.testing import CliRunner
+    from nexon_cli.cli import cli
+
+    monkeypatch.setattr(config, "base_dir", tmp_path / "base")
+    monkeypatch.setattr("nexon_cli.core.blob_store.BLOB_STORE_DIR", tmp_path / "base" / "blobs")
+    monkeypatch.delenv("NEXON_BLOB_STORE", raising=False)
+    PackageManager().wrap_tool(str(tool), name="tool", version="1.0.0")
+    assert not (tmp_path / "base" / "blobs").exists()
+
+    BlobStore(link_mode="hardlink").import_tree(tool, tmp_path / "v1")
+    shutil.rmtree(tmp_path / "v1")
+    result = CliRunner().invoke(cli, ["prune-blobs"])
+    assert result.exit_code == 0, result.output
+    assert "Removed 2" in result.output
+
+
+def test_auto_without_reflinks_warns_and_skips_the_store(tool, tmp_path, monkeypatch, capsys):
+    def no_reflink(*args):
+        raise OSError("Operation not supported")
+
+    monkeypatch.setattr(fcntl, "ioctl", no_reflink)
+    store = BlobStore(tmp_path / "blobs", link_mode="auto")
+    store.import_tree(tool, tmp_path / "v1")
+    assert (tmp_path / "v1" / "lib.py").read_text() == "VALUE = 1\n"
+    # Only the file that probed for reflink support went through the store
+    assert len(list((tmp_path / "blobs").glob("*/*"))) == 1
+    assert "use hardlink" in capsys.readouterr().out
@@ -0,0 +1,122 @@
+import shutil
+import sys
+
+import pytest
+
+from nexon_cli.core.build_cache import BuildCache
+from nexon_cli.core.build_manager import BuildManager, BuildError, build_levels
+from nexon_cli.utils.file_ops import save_yaml
+
+
+@pytest.fixture
+def pkg_root(tmp_path, monkeypatch):
+    monkeypatch.setattr("nexon_cli.core.package_catalog.CATALOG_PATH", tmp_path / "catalog.db")
+    return tmp_path / "packages"
+
+
+def _add(root, name, version, requires=(), commands=()):
+    ver_dir = root / name / version
+    ver_dir.mkdir(parents=True, exist_ok=True)
+    save_yaml(ver_dir / "package.yaml", {
+        "name": name, "version": version, "requires": list(requires),
+        "build": {"env": {"PKG_ROOT": "{root}"}, "commands": list(commands)},
+    })
+
+
+def _manager(pkg_root, tmp_path, local="cache", shared="shared"):
+    return BuildManager(pkg_root, cache=BuildCache(tmp_path / local, shared_dir=tmp_path / shared))
+
+
+def _record(log, name):
+    """A build command that echoes a line and appends `name` to `log`."""
+    return f'"{sys.executable}" -c "print(\'building {name}\'); open(r\'{log}\', \'a\').write(\'{name}\\n\')"'
+
+
+def test_build_levels():
+    graph = {"app-1": ["lib-1", "util-1"], "lib-1": ["util-1"], "util-1": [], "doc-1": []}
+    assert build_levels(graph) == [["doc-1", "util-1"], ["lib-1"], ["app-1"]]
+    with pytest.raises(BuildError, match="cycle"):
+        build_levels({"a-1": ["b-1"], "b-1": ["a-1"]})
+
+
+def test_build_closure_builds_dependencies_first(pkg_root, tmp_path, capsys):
+    log = tmp_path / "order.log"
+    _add(pkg_root, "app", "1.0", ["lib", "tool"], [_record(log, "app")])
+    _add(pkg_root, "lib", "1.0", ["base"], [_record(log, "lib")])
+    _add(pkg_root, "tool", "1.0", ["base"], [_record(log, "tool")])
+    _add(pkg_root, "base", "1.0", [], [_record(log, "base")])
+
+    status = _manager(pkg_root, tmp_path).build_closure(["app"], jobs=4)
+    assert set(status.values()) == {"built"}
+    order = log.read_text().split()
+    assert order[0] == "base" and order[-1] == "app"
+    assert "[lib-1.0] building lib" in capsys.readouterr().out
+
+
+def test_build_closure_skips_dependants_of_failures(pkg_root, tmp_path):
+    log = tmp_path / "order.log"
+    _add(pkg_root, "app", "1.0", ["broken", "fine"], [_record(log, "app")])
+    _add(pkg_root, "broken", "1.0", ["base"], ["exit 3"])
+    _add(pkg_root, "fine", "1.0", [], [_record(log, "fine")])
+    _add(pkg_root, "base", "1.0", [], [_record(log, "base")])
+
+    status = _manager(pkg_root, tmp_path).build_closure(["app"], jobs=2)
+    assert status == {"app-1.0": "skipped", "broken-1.0": "failed", "fine-1.0": "built", "base-1.0": "built"}
+    assert sorted(log.read_text().split()) == ["base", "fine"]
+
+
+def test_build_cache_restores_unchanged_packages(pkg_root, tmp_path):
+    log = tmp_path / "order.log"
+    make_output = (f'"{sys.executable}" -c "import os, pathlib; p = pathlib.Path(os.environ[\'PKG_ROOT\'], \'build\'); '
+                   f'p.mkdir(exist_ok=True); (p / \'out.txt\').write_text(\'ok\')"')
+    _add(pkg_root, "lib", "1.0", [], [_record(log, "lib")])
+    _add(pkg_root, "app", "1.0", ["lib"], [_record(log, "app"), make_output])
+    output = pkg_root / "app" / "1.0" / "build" / "out.txt"
+
+    _manager(pkg_root, tmp_path).build_package("app", "1.0")
+    assert log.read_text().split() == ["app"]
+
+    # Unchanged inputs: outputs are restored, no command runs
+    output.unlink()
+    _manager(pkg_root, tmp_path).build_package("app", "1.0")
+    assert log.read_text().split() == ["app"]
+    assert output.read_text() == "ok"
+    assert "| app-1.0 | hit-local |" in (tmp_path / "cache" / "build.log").read_text()
+
+    # A fresh local cache is filled from the shared one
+    _manager(pkg_root, tmp_path, local="other").build_package("app", "1.0")
+    assert log.read_text().split() == ["app"]
+    assert "hit-shared" in (tmp_path / "other" / "build.log").read_text()
+
+    # Changing a dependency's sources changes the dependant's input hash
+    (pkg_root / "lib" / "1.0" / "lib.c").write_text("int x;")
+    _manager(pkg_root, tmp_path).build_package("app", "1.0")
+    assert log.read_text().split() == ["app", "app"]
+
+
+def test_packages_without_build_commands_are_not_built(pkg_root, tmp_path, capsys):
+    log = tmp_path / "order.log"
+    _add(pkg_root, "app", "1.0", ["runtime"], [_record(log, "app")])
+    _add(pkg_root, "runtime", "1.0", [], [])
+
+    status = _manager(pkg_root, tmp_path).build_closure(["app"], jobs=2)
+    assert status == {"app-1.0": "built", "runtime-1.0": "no-build"}
+    assert log.read_text().split() == ["app"]
+    out = capsys.readouterr().out
+    assert "nothing to build" in out and "[ERROR]" not in out
+
+
+def test_builds_without_declared_outputs_are_not_cached(pkg_root, tmp_path):
+    log = tmp_path / "order.log"
+    make_lib = (f'"{sys.executable}" -c "import os, pathlib; p = pathlib.Path(os.environ[\'PKG_ROOT\'], \'lib\'); '
+                f'p.mkdir(exist_ok=True); (p / \'tool.so\').write_text(\'ok\')"')
+    _add(pkg_root, "tool", "1.0", [], [_record(log, "tool"), make_lib])
+    lib = pkg_root / "tool" / "1.0" / "lib"
+
+    _manager(pkg_root, tmp_path).build_package("tool", "1.0")
+    shutil.rmtree(lib)
+    # Same inputs, but lib/ isn't under the default build/ output: it must be rebuilt
+    _manager(pkg_root, tmp_path).build_package("tool", "1.0")
+    assert log.read_text().split() == ["tool", "tool"]
+    assert (lib / "tool.so").read_text() == "ok"
+    assert "| tool-1.0 | no-outputs |" in (tmp_path / "cache" / "build.log").read_text()
@@ -0,0 +1,34 @@
+import json
+import subprocess
+import sys
+
+HEAVY = ["kubernetes", "celery", "jinja2", "sentry_sdk", "requests", "textual", "cryptography", "pydantic"]
+
+
+def _run(code, base_dir):
+    env = {"NEXON_BASE_DIR": str(base_dir), "PYTHONPATH": ":".join(sys.path)}
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, env=env, check=True)
+    return out.stdout
+
+
+def test_importing_cli_has_no_side_effects(tmp_path):
+    base = tmp_path / "nexon"
+    loaded = json.loads(_run(
+        "import json, sys; import nexon_cli.cli; "
+        f"print(json.dumps([m for m in {HEAVY!r} if m in sys.modules]))", base))
+    assert loaded == []
+    assert not base.exists()
+
+
+def test_activate_env_imports_only_its_command(tmp_path):
+    base = tmp_path / "nexon"
+    loaded = json.loads(_run(
+        "import json, sys\n"
+        "from nexon_cli.cli import cli\n"
+        "try:\n"
+        "    cli(['activate-env', 'missing'])\n"
+        "except SystemExit:\n"
+        "    pass\n"
+        f"print(json.dumps([m for m in {HEAVY!r} + ['nexon_cli.commands.create_env'] if m in sys.modules]))",
+        base).splitlines()[-1])
+    assert loaded == []
@@ -0,0 +1,153 @@
+import pytest
+
+from nexon_cli.core.dependency_solver import DependencySolver, DependencyError
+from nexon_cli.utils.file_ops import save_yaml
+
+
+def _add(root, name, version, requires=()):
+    ver_dir = root / name / version
+    ver_dir.mkdir(parents=True, exist_ok=True)
+    save_yaml(ver_dir / "package.yaml", {"name": name, "version": version, "requires": list(requires)})
+
+
+@pytest.fixture
+def pkg_root(tmp_path, monkeypatch):
+    monkeypatch.setattr("nexon_cli.core.package_catalog.CATALOG_PATH", tmp_path / "catalog.db")
+    return tmp_path / "packages"
+
+
+def test_backtracks_out_of_greedy_choice(pkg_root):
+    # Newest B pins D<2, but C needs D>=2: only B-1.0 works
+    _add(pkg_root, "A", "1.0", ["B", "C"])
+    _add(pkg_root, "B", "1.0", ["D"])
+    _add(pkg_root, "B", "2.0", ["D<2"])
+    _add(pkg_root, "C", "1.0", ["D>=2"])
+    _add(pkg_root, "D", "1.0")
+    _add(pkg_root, "D", "2.0")
+
+    solver = DependencySolver(pkg_root)
+    assert solver.resolve_all(["A"]) == ["A-1.0", "B-1.0", "C-1.0", "D-2.0"]
+    assert solver.build_graph(["A"]) == {
+        "A-1.0": ["B-1.0", "C-1.0"],
+        "B-1.0": ["D-2.0"],
+        "C-1.0": ["D-2.0"],
+        "D-2.0": [],
+    }
+
+
+def test_one_version_per_name(pkg_root):
+    _add(pkg_root, "app", "1.0", ["lib>=1.0"])
+    _add(pkg_root, "lib", "1.0")
+    _add(pkg_root, "lib", "1.5")
+
+    resolved = DependencySolver(pkg_root).resolve_all(["app", "lib<1.5"])
+    assert resolved == ["app-1.0", "lib-1.0"]
+
+
+def test_skips_versions_with_unsatisfiable_requirements(pkg_root):
+    _add(pkg_root, "tool", "1.0")
+    _add(pkg_root, "tool", "2.0", ["missing>=1"])
+
+    assert DependencySolver(pkg_root).resolve_all(["tool"]) == ["tool-1.0"]
+
+
+def test_reports_conflict(pkg_root):
+    _add(pkg_root, "X", "1.0", ["Y<1"])
+    _add(pkg_root, "Z", "1.0", ["Y>=1"])
+    _add(pkg_root, "Y", "0.5")
+    _add(pkg_root, "Y", "1.0")
+
+    with pytest.raises(DependencyError, match="'Y'"):
+        DependencySolver(pkg_root).resolve_all(["X", "Z"])
+
+
+def test_lazy_mode_reads_only_the_closure(pkg_root, monkeypatch):
+    _add(pkg_root, "A", "1.0", ["B>=1"])
+    _add(pkg_root, "B", "1.0")
+    _add(pkg_root, "B", "2.0")
+    _add(pkg_root, "unrelated", "1.0", ["A"])
+    (pkg_root / "broken" / "1.0").mkdir(parents=True)
+    (pkg_root / "broken" / "1.0" / "package.yaml").write_text("{not: yaml")
+
+    import nexon_cli.core.dependency_solver as solver_mod
+    loaded = []
+    real_load = solver_mod.load_yaml
+    monkeypatch.setattr(solver_mod, "load_yaml", lambda path: loaded.append(path) or real_load(path))
+
+    solver = DependencySolver(pkg_root, lazy=True)
+    assert solver.resolve("B<2") == "B-1.0"
+    assert loaded == []
+    assert solver.resolve_all(["A"]) == ["A-1.0", "B-2.0"]
+    assert sorted(p.parent.parent.name + "-" + p.parent.name for p in loaded) == ["A-1.0", "B-2.0"]
+
+    # Parsed specs are shared by every solver in the process
+    assert DependencySolver(pkg_root, lazy=True).build_graph(["A"]) == {"A-1.0": ["B-2.0"], "B-2.0": []}
+    assert len(loaded) == 2
+    assert not (pkg_root.parent / "catalog.db").exists()
+
+
+def test_resolution_cache_skips_solver_until_catalog_changes(pkg_root, monkeypatch):
+    _add(pkg_root, "A", "1.0", ["B"])
+    _add(pkg_root, "B", "1.0")
+    assert DependencySolver(pkg_root).build_graph(["A"]) == {"A-1.0": ["B-1.0"], "B-1.0": []}
+
+    def no_solve(self, requirements):
+        raise AssertionError("solver should not run on a cache hit")
+
+    with monkeypatch.context() as m:
+        m.setattr(DependencySolver, "_solve", no_solve)
+        # Same requirement set, differently spelled and ordered
+        assert DependencySolver(pkg_root).resolve_all(["A", "A"]) == ["A-1.0", "B-1.0"]
+        assert DependencySolver(pkg_root).build_graph(["A"]) == {"A-1.0": ["B-1.0"], "B-1.0": []}
+
+    # A new package version bumps the catalog generation: the cached entry is not reused
+    _add(pkg_root, "B", "2.0")
+    assert DependencySolver(pkg_root).resolve_all(["A"]) == ["A-1.0", "B-2.0"]
+
+
+def test_switching_packages_directory_invalidates_cached_resolutions(pkg_root, tmp_path):
+    _add(pkg_root, "A", "1.0")
+    assert DependencySolver(pkg_root).resolve_all(["A"]) == ["A-1.0"]
+
+    # Same index file, new (empty) root: the scan finds no changes, but A is gone
+    (tmp_path / "other").mkdir()
+    with pytest.raises(DependencyError):
+        DependencySolver(tmp_path / "other").resolve_all(["A"])
+
+
+def test_resolution_cache_evicts_least_recently_used(pkg_root, monkeypatch):
+    monkeypatch.setenv("NEXON_RESOLUTION_CACHE_SIZE", "2")
+    for name in "XYZ":
+        _add(pkg_root, name, "1.0")
+    solver = DependencySolver(pkg_root)
+    for reqs in (["X"], ["Y"], ["X"], ["Z"]):
+        solver.resolve_all(reqs)
+
+    generation = solver.catalog.generation
+    cached = {reqs: solver.cache.get(solver.cache.key(reqs, generation)) is not None
+              for reqs in (("X",), ("Y",), ("Z",))}
+    assert cached == {("X",): True, ("Y",): False, ("Z",): True}
+
+
+def test_conflicts_learned_under_other_requirements_are_forgotten(pkg_root):
+    # With C<2, A-2.0 is impossible (E needs C>=2); without it, A-2.0 is the answer
+    _add(pkg_root, "X", "1.0", ["A"])
+    _add(pkg_root, "A", "1.0")
+    _add(pkg_root, "A", "2.0", ["E"])
+    _add(pkg_root, "E", "1.0", ["C>=2"])
+    _add(pkg_root, "C", "1.0")
+    _add(pkg_root, "C", "2.0")
+
+    solver = DependencySolver(pkg_root, lazy=True)
+    assert solver.resolve_all(["X", "C<2"]) == ["A-1.0", "C-1.0", "X-1.0"]
+    assert solver.resolve_all(["X"]) == ["A-2.0", "C-2.0", "E-1.0", "X-1.0"]
+
+
+@pytest.mark.parametrize("lazy", [False, True])
+def test_version_directories_without_package_yaml_are_ignored(pkg_root, lazy):
+    _add(pkg_root, "A", "1.0")
+    (pkg_root / "A" / "2.0").mkdir()
+    (pkg_root / "A" / "3.0").mkdir()
+    (pkg_root / "A" / "3.0" / "notes.txt").write_text("not installed")
+
+    assert DependencySolver(pkg_root, lazy=lazy).resolve_all(["A"]) == ["A-1.0"]
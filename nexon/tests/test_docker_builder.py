@@ -0,0 +1,105 @@
+import os
+import stat
+import sys
+
+import pytest
+
+from nexon_cli.core import docker_builder
+from nexon_cli.core.docker_builder import DockerBuildError, _dockerfile, build_docker_image, docker_layers
+from nexon_cli.core.lockfile import create_lock, lock_path
+from nexon_cli.utils.file_ops import save_yaml
+
+# Stand-in for `docker build -t TAG CONTEXT`: records the context's files (and inode numbers) as "path inode" lines
+FAKE_DOCKER = """#!{python}
+import os, sys, tarfile
+out = open(os.environ["FAKE_DOCKER_LOG"], "w")
+ctx = sys.argv[-1]
+if ctx == "-":
+    with tarfile.open(fileobj=sys.stdin.buffer, mode="r|") as tar:
+        for member in tar:
+            out.write(member.name + " 0\\n")
+else:
+    for dirpath, _, filenames in os.walk(ctx):
+        for f in filenames:
+            path = os.path.join(dirpath, f)
+            out.write(os.path.relpath(path, ctx) + " " + str(os.lstat(path).st_ino) + "\\n")
+"""
+
+
+@pytest.fixture
+def docker_env(tmp_path, monkeypatch):
+    pkg_dir = tmp_path / "packages"
+    for name, version, requires in (("app", "1.0", ["lib"]), ("lib", "2.0", []), ("unused", "1.0", [])):
+        ver_dir = pkg_dir / name / version
+        (ver_dir / "bin").mkdir(parents=True)
+        save_yaml(ver_dir / "package.yaml", {"name": name, "version": version, "requires": requires})
+        (ver_dir / "bin" / name).write_text(name)
+    env_dir = tmp_path / "environments"
+    env_dir.mkdir()
+    save_yaml(env_dir / "env1.yaml", {"name": "env1", "packages": ["app-1.0"]})
+
+    bin_dir = tmp_path / "bin"
+    bin_dir.mkdir()
+    (bin_dir / "docker").write_text(FAKE_DOCKER.format(python=sys.executable))
+    (bin_dir / "docker").chmod(0o755 | stat.S_IXUSR)
+    monkeypatch.setenv("PATH", f"{bin_dir}{os.pathsep}{os.environ['PATH']}")
+    monkeypatch.setenv("FAKE_DOCKER_LOG", str(tmp_path / "docker.log"))
+    monkeypatch.setattr(docker_builder, "PACKAGES_DIR", pkg_dir)
+    monkeypatch.setattr(docker_builder, "ENVIRONMENTS_DIR", env_dir)
+    monkeypatch.setattr(docker_builder, "DOCKERFILES_DIR", tmp_path / "dockerfiles")
+    return tmp_path
+
+
+def _context(tmp_path):
+    lines = (tmp_path / "docker.log").read_text().splitlines()
+    return dict(line.rsplit(" ", 1) for line in lines)
+
+
+def test_context_holds_only_the_closure_hard_linked(docker_env):
+    build_docker_image("env1", "env1:test")
+    context = _context(docker_env)
+    assert set(context) == {"Dockerfile", "environments/env1.yaml",
+                            "layers/app-1.0/app/1.0/package.yaml", "layers/app-1.0/app/1.0/bin/app",
+                            "layers/lib-2.0/lib/2.0/package.yaml", "layers/lib-2.0/lib/2.0/bin/lib"}
+    source = docker_env / "packages" / "lib" / "2.0" / "bin" / "lib"
+    assert context["layers/lib-2.0/lib/2.0/bin/lib"] == str(source.stat().st_ino)
+    assert not list((docker_env / "dockerfiles").iterdir())
+
+
+def test_streamed_context_includes_trusted_lock(docker_env):
+    env_file = docker_env / "environments" / "env1.yaml"
+    save_yaml(lock_path(env_file), create_lock("env1", env_file, docker_env / "packages"))
+    build_docker_image("env1", "env1:test", stream=True)
+    context = _context(docker_env)
+    assert {"Dockerfile", "environments/env1.lock.yaml", "layers/lib-2.0/lib/2.0/bin/lib"} <= set(context)
+    assert not any("unused" in name for name in context)
+
+
+def test_unresolvable_environment_fails_before_docker(docker_env):
+    save_yaml(docker_env / "environments" / "env1.yaml", {"name": "env1", "packages": ["app-9.9"]})
+    with pytest.raises(DockerBuildError):
+        build_docker_image("env1")
+    assert not (docker_env / "docker.log").exists()
+
+
+GRAPH = {"app-1.0": ["lib-2.0", "util-1.1"], "lib-2.0": ["base-3.0"], "util-1.1": ["base-3.0"],
+         "tool-0.1": ["base-3.0"], "base-3.0": []}
+
+
+def test_layers_follow_the_dag_from_stable_to_volatile():
+    layers = docker_layers(GRAPH, 64)
+    assert layers == [("base-3.0", ["base-3.0"]), ("lib-2.0", ["lib-2.0"]), ("tool-0.1", ["tool-0.1"]),
+                      ("util-1.1", ["util-1.1"]), ("app-1.0", ["app-1.0"])]
+    dockerfile = _dockerfile("env1", [name for name, _ in layers])
+    copies = [line for line in dockerfile.splitlines() if line.startswith("COPY --link")]
+    assert copies[0] == "COPY --link layers/base-3.0 /root/.nexon/packages"
+    assert dockerfile.index("layers/app-1.0") < dockerfile.index("RUN nexon activate-env env1")
+
+
+def test_layer_budget_groups_the_most_stable_levels():
+    layers = docker_layers(GRAPH, 3)
+    assert [packages for _, packages in layers] == [["base-3.0"], ["lib-2.0", "tool-0.1", "util-1.1"],
+                                                     ["app-1.0"]]
+    assert layers[1][0].startswith("group-") and layers[1][0] == docker_layers(GRAPH, 3)[1][0]
+    assert [packages for _, packages in docker_layers(GRAPH, 1)] == [
+        ["base-3.0", "lib-2.0", "tool-0.1", "util-1.1", "app-1.0"]]
@@ -0,0 +1,46 @@
+import os
+
+from nexon_cli.core.activation_cache import ActivationCache
+from nexon_cli.core.env_view import build_view
+from nexon_cli.core.lockfile import create_lock, lock_path
+from nexon_cli.utils.file_ops import save_yaml
+
+
+def _package(pkg_dir, name, files, env):
+    root = pkg_dir / name / "1.0"
+    for rel in files:
+        (root / rel).parent.mkdir(parents=True, exist_ok=True)
+        (root / rel).write_text(name)
+    save_yaml(root / "package.yaml", {"name": name, "version": "1.0", "env": env})
+
+
+def test_view_collapses_search_paths(tmp_path):
+    pkg_dir = tmp_path / "packages"
+    _package(pkg_dir, "a", ["bin/tool", "src/ns/a.py", "src/pkga/__init__.py"],
+             {"PATH": "{root}/bin:{PATH}", "PYTHONPATH": "{root}/src:{PATH}"})
+    _package(pkg_dir, "b", ["bin/tool", "bin/other", "src/ns/b.py"],
+             {"PATH": "{root}/bin:/opt/vendor/bin:{PATH}", "PYTHONPATH": "{root}/src", "B_ROOT": "{root}"})
+    env_file = tmp_path / "env1.yaml"
+    save_yaml(env_file, {"name": "env1", "packages": ["a-1.0", "b-1.0"]})
+
+    lock = create_lock("env1", env_file, pkg_dir)
+    view = build_view("env1", lock, pkg_dir, tmp_path / "views")
+    root = tmp_path / "views" / "env1"
+    assert [p.name for p in root.iterdir()] == [os.path.basename(view["path"])]
+
+    bin_dir = os.path.join(view["path"], "bin")
+    src_dir = os.path.join(view["path"], "src")
+    # b is activated after a, so it comes first on PATH and its tool wins
+    assert open(os.path.join(bin_dir, "tool")).read() == "b"
+    assert os.path.exists(os.path.join(bin_dir, "other"))
+    # Namespace package directories are merged, regular packages linked whole
+    assert sorted(os.listdir(os.path.join(src_dir, "ns"))) == ["a.py", "b.py"]
+    assert os.path.islink(os.path.join(src_dir, "pkga"))
+    assert view["vars"]["PATH"] == [["prepend", os.pathsep.join([bin_dir, "/opt/vendor/bin"])]]
+
+    lock["lock"]["view"] = view
+    save_yaml(lock_path(env_file), lock)
+    env = ActivationCache(pkg_dir, tmp_path / "activation").env_vars("env1", env_file, {"PATH": "/usr/bin"})
+    assert env["PATH"] == os.pathsep.join([bin_dir, "/opt/vendor/bin", "/usr/bin"])
+    assert env["PYTHONPATH"] == src_dir
+    assert env["B_ROOT"] == str(pkg_dir / "b" / "1.0")
@@ -0,0 +1,37 @@
+import multiprocessing
+import threading
+
+from nexon_cli.utils.file_ops import load_yaml, save_yaml, update_yaml
+
+
+def _append(path, item):
+    def mutate(data):
+        data.setdefault("items", []).append(item)
+        return len(data["items"])
+    return update_yaml(path, mutate)
+
+
+def test_concurrent_updates_are_not_lost(tmp_path):
+    path = tmp_path / "env.yaml"
+    save_yaml(path, {"name": "env", "items": []})
+
+    threads = [threading.Thread(target=_append, args=(path, f"t{i}")) for i in range(16)]
+    procs = [multiprocessing.get_context("spawn").Process(target=_append, args=(path, f"p{i}")) for i in range(4)]
+    for worker in threads + procs:
+        worker.start()
+    for worker in threads + procs:
+        worker.join()
+
+    items = load_yaml(path)["items"]
+    assert sorted(items) == sorted([f"t{i}" for i in range(16)] + [f"p{i}" for i in range(4)])
+    # Only the data file and its lock file remain: every temp file was renamed into place
+    assert sorted(p.name for p in tmp_path.iterdir()) == [".env.yaml.lock", "env.yaml"]
+
+
+def test_unchanged_data_is_not_rewritten(tmp_path):
+    path = tmp_path / "ws.yaml"
+    save_yaml(path, {"environments": ["a"]})
+    before = path.stat().st_mtime_ns
+    assert update_yaml(path, lambda data: "a" in data["environments"]) is True
+    assert path.stat().st_mtime_ns == before
+    assert not (tmp_path / ".ws.yaml.lock").exists()
@@ -0,0 +1,72 @@
+import pytest
+
+from nexon_cli.core.configs import config
+from nexon_cli.core.dependency_solver import DependencyError
+from nexon_cli.core.package_manager import PackageManager
+from nexon_cli.core.plugin_manager import plugin_manager
+from nexon_cli.utils.file_ops import load_yaml, save_yaml
+
+
+@pytest.fixture
+def pm(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, "base_dir", tmp_path)
+    monkeypatch.setattr("nexon_cli.core.package_catalog.CATALOG_PATH", tmp_path / "catalog.db")
+    monkeypatch.setattr("nexon_cli.core.activation_cache.ACTIVATION_CACHE_DIR", tmp_path / "activation")
+    events = []
+    monkeypatch.setattr("nexon_cli.core.package_manager.log", lambda *args, **kw: events.append(("audit", args)))
+    monkeypatch.setattr(plugin_manager, "trigger", lambda hook, **kw: events.append((hook, kw)))
+
+    for name, version, requires in (("app", "1.0", ["lib>=1.0"]), ("lib", "1.0", []), ("lib", "2.0", []),
+                                    ("tool", "1.0", ["lib<2.0"]), ("extra", "3.0", [])):
+        ver_dir = tmp_path / "packages" / name / version
+        ver_dir.mkdir(parents=True)
+        save_yaml(ver_dir / "package.yaml", {"name": name, "version": version, "requires": requires})
+    manager = PackageManager()
+    save_yaml(manager.env_dir / "env1.yaml", {"name": "env1", "packages": []})
+    manager.events = events
+    return manager
+
+
+def test_requirements_are_solved_jointly_and_written_once(pm):
+    # Solved one at a time, app would pick lib-2.0 and tool would then add lib-1.0 beside it
+    added = pm.install_packages("env1", ["app", "tool", "extra"])
+    assert sorted(added) == ["app-1.0", "extra-3.0", "lib-1.0", "tool-1.0"]
+    assert load_yaml(pm.env_dir / "env1.yaml")["packages"] == sorted(added)
+
+    hooks = [event for event, _ in pm.events]
+    assert hooks == ["pre_install_package"] * 3 + ["audit", "post_install_package"]
+    assert [kw["requirement"] for _, kw in pm.events[:3]] == ["app", "tool", "extra"]
+    assert sorted(pm.events[-1][1]["added"]) == sorted(added)
+
+
+def test_installed_packages_stay_pinned(pm):
+    pm.install_packages("env1", ["tool"])
+    with pytest.raises(DependencyError):
+        pm.install_packages("env1", ["lib>=2.0"])
+    # Naming an installed package lets the solve replace it
+    save_yaml(pm.env_dir / "env1.yaml", {"name": "env1", "packages": ["lib-1.0"]})
+    assert pm.install_packages("env1", ["lib>=2.0"]) == ["lib-2.0"]
+    assert load_yaml(pm.env_dir / "env1.yaml")["packages"] == ["lib-2.0"]
+
+
+def test_dry_run_and_requirements_file(pm, tmp_path):
+    req_file = tmp_path / "requirements.txt"
+    req_file.write_text("# toolset\napp  # main app\n\nextra-3.0\n")
+    requirements = pm.read_requirements(req_file)
+    assert requirements == ["app", "extra-3.0"]
+    assert sorted(pm.install_packages("env1", requirements, dry_run=True)) == ["app-1.0", "extra-3.0", "lib-2.0"]
+    assert load_yaml(pm.env_dir / "env1.yaml")["packages"] == []
+
+
+def test_hooks_get_only_the_arguments_they_declare():
+    from nexon_cli.core.plugin_manager import PluginManager
+
+    calls = []
+    manager = PluginManager()
+    manager._loaded = True
+    manager._hooks["pre_install_package"] = [
+        lambda env_name, requirement: calls.append(("strict", env_name, requirement)),
+        lambda env_name, **kwargs: calls.append(("open", env_name, sorted(kwargs))),
+    ]
+    manager.trigger("pre_install_package", env_name="env1", requirement="app", requirements=["app"])
+    assert calls == [("strict", "env1", "app"), ("open", "env1", ["requirement", "requirements"])]
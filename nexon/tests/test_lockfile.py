@@ -0,0 +1,68 @@
+import pytest
+
+from nexon_cli.core.activation_cache import ActivationCache
+from nexon_cli.core.lockfile import LockError, check_lock, create_lock, lock_path, trusted_lock
+from nexon_cli.utils.file_ops import save_yaml
+
+
+@pytest.fixture
+def env(tmp_path):
+    pkg_dir = tmp_path / "packages"
+    for name, version, requires in (("app", "1.0", ["lib>=2.0"]), ("lib", "2.1", []), ("lib", "1.0", [])):
+        ver_dir = pkg_dir / name / version
+        ver_dir.mkdir(parents=True)
+        save_yaml(ver_dir / "package.yaml", {"name": name, "version": version, "requires": requires,
+                                             "env": {f"{name.upper()}_ROOT": "{root}"}})
+        (ver_dir / "bin").mkdir()
+        (ver_dir / "bin" / name).write_text("v1")
+    env_file = tmp_path / "env1.yaml"
+    save_yaml(env_file, {"name": "env1", "packages": ["app-1.0"]})
+    return env_file, pkg_dir
+
+
+def test_lock_records_closure_and_hashes(env):
+    env_file, pkg_dir = env
+    lock = create_lock("env1", env_file, pkg_dir)
+    assert lock["name"] == "env1"
+    assert lock["packages"] == ["app-1.0", "lib-2.1"]
+    assert set(lock["lock"]["hashes"]) == {"app-1.0", "lib-2.1"}
+    assert lock["lock"]["interpreter"]
+    assert check_lock(lock, env_file.read_bytes(), pkg_dir, payload=True) == []
+
+
+def test_staleness_is_detected(env):
+    env_file, pkg_dir = env
+    lock = create_lock("env1", env_file, pkg_dir)
+
+    (pkg_dir / "lib" / "2.1" / "bin" / "lib").write_text("v2")
+    assert check_lock(lock, env_file.read_bytes(), pkg_dir) == []
+    assert check_lock(lock, env_file.read_bytes(), pkg_dir, payload=True) == ["lib-2.1 payload changed"]
+
+    save_yaml(pkg_dir / "app" / "1.0" / "package.yaml", {"name": "app", "version": "1.0"})
+    assert check_lock(lock, env_file.read_bytes(), pkg_dir) == ["app-1.0 manifest changed"]
+    assert check_lock(lock, b"packages: []\n", pkg_dir)
+    assert check_lock({"packages": ["app-1.0"]}, env_file.read_bytes(), pkg_dir)
+
+
+def test_activation_uses_valid_lock_only(env, tmp_path):
+    env_file, pkg_dir = env
+    cache = ActivationCache(pkg_dir, cache_dir=tmp_path / "activation")
+    assert cache.load("env1", env_file)["packages"] == ["app-1.0"]
+
+    save_yaml(lock_path(env_file), create_lock("env1", env_file, pkg_dir))
+    context = cache.load("env1", env_file)
+    assert context["locked"] and context["packages"] == ["app-1.0", "lib-2.1"]
+    assert "LIB_ROOT" in context["steps"]
+
+    save_yaml(env_file, {"name": "env1", "packages": ["app-1.0", "lib-1.0"]})
+    context = cache.load("env1", env_file)
+    assert not context["locked"] and context["lock_problems"]
+    assert context["packages"] == ["app-1.0", "lib-1.0"]
+    assert trusted_lock("env1", env_file, pkg_dir) is None
+
+
+def test_unsolvable_environment_cannot_be_locked(env):
+    env_file, pkg_dir = env
+    save_yaml(env_file, {"name": "env1", "packages": ["app-1.0", "lib-1.0"]})
+    with pytest.raises(LockError):
+        create_lock("env1", env_file, pkg_dir)
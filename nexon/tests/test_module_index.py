@@ -0,0 +1,122 @@
+import json
+import os
+import subprocess
+import sys
+
+from nexon_cli.core.activation_cache import ActivationCache
+from nexon_cli.core.configs import config
+from nexon_cli.core.module_index import build_index
+from nexon_cli.utils.file_ops import save_yaml
+
+PROBE = """
+import json, sys
+import alpha, shared, ns.one, ns.two, json as stdlib_json
+finders = [getattr(f, "__name__", type(f).__name__) for f in sys.meta_path]
+print(json.dumps({"alpha": alpha.__file__, "shared": shared.WHO, "ns": sorted(ns.__path__),
+                  "finders": finders, "stdlib": stdlib_json.__file__}))
+"""
+
+
+def _package(pkg_dir, name, files):
+    root = pkg_dir / name / "1.0"
+    for rel, text in files.items():
+        (root / "python" / rel).parent.mkdir(parents=True, exist_ok=True)
+        (root / "python" / rel).write_text(text)
+    save_yaml(root / "package.yaml", {"name": name, "version": "1.0", "env": {"PYTHONPATH": "{root}/python:{PATH}"}})
+
+
+def test_imports_resolve_from_index(tmp_path, monkeypatch):
+    pkg_dir = tmp_path / "packages"
+    _package(pkg_dir, "a", {"alpha/__init__.py": "", "shared.py": "WHO = 'a'", "ns/one.py": ""})
+    _package(pkg_dir, "b", {"shared.py": "WHO = 'b'", "ns/two.py": "", "notes.txt": ""})
+    env_file = tmp_path / "env1.yaml"
+    save_yaml(env_file, {"name": "env1", "packages": ["a-1.0", "b-1.0"]})
+
+    monkeypatch.setenv("NEXON_IMPORT_INDEX", "1")
+    assert config.import_index
+    cache = ActivationCache(pkg_dir, tmp_path / "activation")
+    env = cache.env_vars("env1", env_file, {})
+    index = json.loads(open(env["NEXON_MODULE_INDEX"]).read())
+    assert set(index["modules"]) == {"alpha", "shared", "ns"}
+    # b is activated last, so it is first on PYTHONPATH
+    assert index["modules"]["shared"][0][1].startswith(str(pkg_dir / "b"))
+
+    run_env = {"PATH": os.environ["PATH"], "NEXON_MODULE_INDEX": env["NEXON_MODULE_INDEX"],
+               "PYTHONPATH": env["PYTHONPATH"]}
+    out = subprocess.run([sys.executable, "-c", PROBE], env=run_env, capture_output=True, text=True, check=True)
+    result = json.loads(out.stdout)
+    finders = result["finders"]
+    assert finders[finders.index("NexonIndexFinder") + 1] == "PathFinder"
+    assert finders.index("BuiltinImporter") < finders.index("NexonIndexFinder")
+    assert result["alpha"].startswith(str(pkg_dir / "a")) and result["shared"] == "b"
+    assert len(result["ns"]) == 2
+    assert not result["stdlib"].startswith(str(pkg_dir))
+
+
+def test_index_order_within_a_directory(tmp_path):
+    (tmp_path / "mod").mkdir()
+    (tmp_path / "mod" / "__init__.py").write_text("")
+    (tmp_path / "mod.py").write_text("")
+    (tmp_path / "not-a-module.py").write_text("")
+    index = build_index([str(tmp_path), str(tmp_path / "missing")])
+    assert [kind for kind, _ in index["modules"]["mod"]] == ["package", "module"]
+    assert "not-a-module" not in index["modules"]
+
+
+def test_clear_removes_module_indexes(tmp_path, monkeypatch):
+    pkg_dir = tmp_path / "packages"
+    _package(pkg_dir, "a", {"alpha/__init__.py": ""})
+    env_file = tmp_path / "env1.yaml"
+    save_yaml(env_file, {"name": "env1", "packages": ["a-1.0"]})
+
+    monkeypatch.setenv("NEXON_IMPORT_INDEX", "1")
+    cache = ActivationCache(pkg_dir, tmp_path / "activation")
+    cache.env_vars("env1", env_file, {})
+    assert {f.suffix for f in (tmp_path / "activation" / "env1").iterdir()} == {".json", ".modules"}
+
+    cache.clear()
+    assert list((tmp_path / "activation" / "env1").iterdir()) == []
+
+
+MISS_PROBE = """
+import json, sys
+from importlib.machinery import PathFinder
+
+probed = []
+
+class Recorder:
+    @staticmethod
+    def find_spec(name, path=None, target=None):
+        probed.append(name)
+        return PathFinder.find_spec(name, path, target)
+
+sys.meta_path[sys.meta_path.index(PathFinder)] = Recorder
+import faulthandler
+try:
+    import no_such_module
+    missing = False
+except ModuleNotFoundError:
+    missing = True
+print(json.dumps({"faulthandler": faulthandler.__spec__.origin, "missing": missing, "probed": probed}))
+"""
+
+
+def test_builtins_win_and_misses_are_not_rescanned(tmp_path, monkeypatch):
+    pkg_dir = tmp_path / "packages"
+    _package(pkg_dir, "a", {"alpha/__init__.py": ""})
+    env_file = tmp_path / "env1.yaml"
+    save_yaml(env_file, {"name": "env1", "packages": ["a-1.0"]})
+    monkeypatch.setenv("NEXON_IMPORT_INDEX", "1")
+    env = ActivationCache(pkg_dir, tmp_path / "activation").env_vars("env1", env_file, {})
+
+    # A module in the working directory named like a built-in one must not shadow it
+    workdir = tmp_path / "work"
+    workdir.mkdir()
+    (workdir / "faulthandler.py").write_text("raise SystemExit('shadowed')")
+    run_env = {"PATH": os.environ["PATH"], "NEXON_MODULE_INDEX": env["NEXON_MODULE_INDEX"],
+               "PYTHONPATH": env["PYTHONPATH"]}
+    out = subprocess.run([sys.executable, "-c", MISS_PROBE], env=run_env, cwd=workdir,
+                         capture_output=True, text=True, check=True)
+    result = json.loads(out.stdout)
+    assert result["faulthandler"] == "built-in"
+    assert result["missing"] and "no_such_module" not in result["probed"]
@@ -0,0 +1,80 @@
+import shutil
+
+import pytest
+
+from nexon_cli.core.package_catalog import PackageCatalog
+from nexon_cli.core.dependency_solver import DependencySolver
+from nexon_cli.utils.file_ops import save_yaml
+
+
+@pytest.fixture
+def pkg_root(tmp_path):
+    root = tmp_path / "packages"
+    for name, version, requires in (("A", "1.0.0", ["B>=1.0"]),
+                                    ("B", "1.0.0", []),
+                                    ("B", "1.1.0", [])):
+        ver_dir = root / name / version
+        ver_dir.mkdir(parents=True)
+        save_yaml(ver_dir / "package.yaml", {"name": name, "version": version, "requires": requires})
+    return root
+
+
+def _catalog(tmp_path, pkg_root):
+    return PackageCatalog(pkg_root, index_path=tmp_path / "catalog.db")
+
+
+def test_catalog_indexes_tree(tmp_path, pkg_root):
+    catalog = _catalog(tmp_path, pkg_root)
+    stats = catalog.refresh()
+    assert stats["parsed"] == 3
+    versions = {name: sorted(vers) for name, vers in catalog.versions().items()}
+    assert versions == {"A": ["1.0.0"], "B": ["1.0.0", "1.1.0"]}
+    defs = catalog.definitions()
+    assert defs["A"]["1.0.0"]["requires"] == ["B>=1.0"]
+    assert catalog.generation == 1
+
+
+def test_catalog_refresh_is_incremental(tmp_path, pkg_root):
+    _catalog(tmp_path, pkg_root).refresh()
+
+    # A fresh process with nothing changed re-parses nothing
+    catalog = _catalog(tmp_path, pkg_root)
+    stats = catalog.refresh()
+    assert stats["parsed"] == 0
+    assert catalog.generation == 1
+
+    # Editing one spec re-parses only that spec
+    save_yaml(pkg_root / "B" / "1.1.0" / "package.yaml",
+              {"name": "B", "version": "1.1.0", "requires": ["C"]})
+    catalog = _catalog(tmp_path, pkg_root)
+    stats = catalog.refresh()
+    assert stats["parsed"] == 1
+    assert catalog.generation == 2
+    assert catalog.definitions()["B"]["1.1.0"]["requires"] == ["C"]
+
+    # Removing a package drops it from the index
+    shutil.rmtree(pkg_root / "A")
+    catalog = _catalog(tmp_path, pkg_root)
+    catalog.refresh()
+    assert "A" not in catalog.versions()
+    assert catalog.generation == 3
+
+
+def test_solver_reads_catalog(tmp_path, pkg_root, monkeypatch):
+    monkeypatch.setattr("nexon_cli.core.package_catalog.CATALOG_PATH", tmp_path / "catalog.db")
+    solver = DependencySolver(pkg_root)
+    assert solver.resolve_all(["A"]) == ["A-1.0.0", "B-1.1.0"]
+    assert (tmp_path / "catalog.db").exists()
+
+
+@pytest.mark.parametrize("jobs, processes", [(1, False), (4, False), (2, True)])
+def test_catalog_parallel_refresh_matches_serial(tmp_path, pkg_root, jobs, processes):
+    catalog = PackageCatalog(pkg_root, index_path=tmp_path / "catalog.db", jobs=jobs, processes=processes)
+    stats = catalog.refresh()
+    assert (stats["scanned"], stats["parsed"]) == (3, 3)
+    assert stats["files_per_sec"] > 0
+    assert catalog.definitions()["A"]["1.0.0"]["requires"] == ["B>=1.0"]
+
+    # --rebuild: clearing the index re-parses everything
+    catalog.clear()
+    assert catalog.refresh()["parsed"] == 3
@@ -0,0 +1,47 @@
+import json
+import pstats
+
+from nexon_cli.utils import profiler
+
+
+@profiler.profiled("outer")
+def _outer():
+    for _ in range(3):
+        with profiler.phase("inner"):
+            pass
+
+
+def test_phases_are_only_recorded_when_enabled():
+    profiler.enable()
+    profiler.disable()
+    _outer()
+    assert profiler.stats() == {}
+
+    profiler.enable()
+    _outer()
+    stats = profiler.stats()
+    profiler.disable()
+    assert stats["outer"]["calls"] == 1
+    assert stats["inner"]["calls"] == 3
+    assert stats["outer"]["total_ms"] >= stats["inner"]["total_ms"]
+
+
+def test_report_writes_speedscope(tmp_path, capsys):
+    profiler.enable()
+    _outer()
+    profiler.report(tmp_path / "run.json")
+    assert "outer" in capsys.readouterr().err
+
+    data = json.loads((tmp_path / "run.json").read_text())
+    events = data["profiles"][0]["events"]
+    assert [e["type"] for e in events][:2] == ["O", "O"]
+    assert len(events) == 8
+    assert {f["name"] for f in data["shared"]["frames"]} == {"outer", "inner"}
+
+
+def test_report_writes_pstats(tmp_path):
+    profiler.enable(cprofile=True)
+    _outer()
+    profiler.report(tmp_path / "run.pstats")
+    functions = {func[2] for func in pstats.Stats(str(tmp_path / "run.pstats")).stats}
+    assert "_outer" in functions
@@ -0,0 +1,180 @@
+import io
+import os
+import stat
+import sys
+import tarfile
+import time
+import zipfile
+
+import pytest
+
+from nexon_cli.core.configs import config
+from nexon_cli.core.download_cache import DownloadCache
+from nexon_cli.core.python_importer import PythonPackageImporter, PythonImporterError
+
+# Stand-in for `pip download --no-deps --dest DIR REQ`: copies REQ's wheel from $FAKE_INDEX and logs the call
+FAKE_PIP = """#!{python}
+import os, re, shutil, sys, time
+args = sys.argv[1:]
+dest, req = args[args.index("--dest") + 1], args[-1]
+with open(os.environ["FAKE_PIP_LOG"], "a") as log:
+    log.write(req + "\\n")
+time.sleep(0.2)
+name = re.split(r"[<>=!~;\\[ ]", req, 1)[0].lower()
+for wheel in os.listdir(os.environ["FAKE_INDEX"]):
+    if wheel.split("-")[0].lower() == name:
+        shutil.copy(os.path.join(os.environ["FAKE_INDEX"], wheel), dest)
+        sys.exit(0)
+sys.exit("no distribution for " + req)
+"""
+
+
+def make_wheel(directory, name, version, requires=()):
+    path = directory / f"{name}-{version}-py3-none-any.whl"
+    dist_info = f"{name}-{version}.dist-info"
+    metadata = f"Metadata-Version: 2.1\nName: {name}\nVersion: {version}\n"
+    metadata += "".join(f"Requires-Dist: {req}\n" for req in requires)
+    with zipfile.ZipFile(path, "w") as zf:
+        zf.writestr(f"{name}/__init__.py", "")
+        zf.writestr(f"{dist_info}/METADATA", metadata)
+        zf.writestr(f"{dist_info}/WHEEL", "Wheel-Version: 1.0\nGenerator: test\nRoot-Is-Purelib: true\nTag: py3-none-any\n")
+        zf.writestr(f"{dist_info}/RECORD", f"{name}/__init__.py,,\n{dist_info}/METADATA,,\n"
+                                           f"{dist_info}/WHEEL,,\n{dist_info}/RECORD,,\n")
+    return path
+
+
+@pytest.fixture
+def index(tmp_path, monkeypatch):
+    wheels = tmp_path / "index"
+    wheels.mkdir()
+    make_wheel(wheels, "app", "1.0", ["liba>=1", "libb", "libc; extra == 'test'", "libd; python_version < '3'"])
+    make_wheel(wheels, "liba", "1.2", ["common"])
+    make_wheel(wheels, "libb", "2.0", ["Common>=0.5"])
+    make_wheel(wheels, "common", "0.9")
+
+    bin_dir = tmp_path / "bin"
+    bin_dir.mkdir()
+    (bin_dir / "pip").write_text(FAKE_PIP.format(python=sys.executable))
+    (bin_dir / "pip").chmod(0o755 | stat.S_IXUSR)
+    monkeypatch.setenv("PATH", f"{bin_dir}{os.pathsep}{os.environ['PATH']}")
+    monkeypatch.setenv("FAKE_INDEX", str(wheels))
+    monkeypatch.setenv("FAKE_PIP_LOG", str(tmp_path / "pip.log"))
+    monkeypatch.setattr(config, "base_dir", tmp_path / "base")
+    monkeypatch.setattr("nexon_cli.core.blob_store.BLOB_STORE_DIR", tmp_path / "base" / "blobs")
+    monkeypatch.setattr("nexon_cli.core.download_cache.DOWNLOAD_CACHE_DIR", tmp_path / "base" / "downloads")
+    return tmp_path
+
+
+def test_dependencies_are_fetched_once_in_parallel(index):
+    imported = PythonPackageImporter().import_from_pypi("app", include_deps=True, jobs=4)
+    assert sorted(imported) == ["app-1.0", "common-0.9", "liba-1.2", "libb-2.0"]
+
+    fetched = (index / "pip.log").read_text().split()
+    assert sorted(r.split(">")[0].split("=")[0].lower() for r in fetched) == ["app", "common", "liba", "libb"]
+    for pkgver in imported:
+        name, version = pkgver.rsplit("-", 1)
+        assert (config.packages_dir / name / version / "package.yaml").exists()
+
+
+def test_failed_download_aborts_the_import(index):
+    make_wheel(index / "index", "broken", "1.0", ["missing-dep"])
+    with pytest.raises(PythonImporterError, match="missing-dep"):
+        PythonPackageImporter().import_from_pypi("broken", include_deps=True, jobs=2)
+
+
+def test_any_worker_error_cancels_queued_fetches(index, monkeypatch):
+    fetched = []
+
+    def fetch(self, req, index_url, extra_index_url):
+        fetched.append(req)
+        time.sleep(0.05)
+        raise OSError(f"disk full while fetching {req}")
+
+    monkeypatch.setattr(PythonPackageImporter, "_fetch", fetch)
+    with pytest.raises(OSError, match="disk full"):
+        PythonPackageImporter().import_requirements([f"pkg{i}" for i in range(20)], jobs=1)
+    # The single worker may have picked up the next one before the rest were cancelled
+    assert len(fetched) <= 2
+
+
+def test_repeat_import_is_served_from_the_cache(index):
+    PythonPackageImporter().import_from_pypi("app", include_deps=True, jobs=4)
+    (index / "pip.log").unlink()
+
+    imported = PythonPackageImporter(offline=True).import_from_pypi("app>=1", include_deps=True, jobs=4)
+    assert sorted(imported) == ["app-1.0", "common-0.9", "liba-1.2", "libb-2.0"]
+    assert not (index / "pip.log").exists()
+
+
+def test_offline_import_uses_find_links_or_fails(index):
+    with pytest.raises(PythonImporterError, match="offline"):
+        PythonPackageImporter(offline=True).import_from_pypi("common")
+
+    imported = PythonPackageImporter(offline=True, find_links=str(index / "index")).import_from_pypi("common<1")
+    assert imported == ["common-0.9"]
+    assert not (index / "pip.log").exists()
+
+
+def test_cache_drops_corrupt_files_and_evicts_lru(tmp_path):
+    cache = DownloadCache(tmp_path / "cache", max_bytes=10 ** 9)
+    old = cache.add(make_wheel(tmp_path, "old", "1.0"))
+    new = cache.add(make_wheel(tmp_path, "new", "1.0"))
+    assert cache.find("old==1.0") == old and cache.find("old>1") is None
+
+    new.write_bytes(b"tampered")
+    assert cache.find("new") is None
+    assert not new.parent.exists()
+
+    os.utime(old.parent, (0, 0))
+    cache.add(make_wheel(tmp_path, "newer", "2.0"))
+    cache.max_bytes = cache.find("newer").stat().st_size
+    cache.evict()
+    assert cache.find("old") is None and cache.find("newer") is not None
+
+
+def test_cache_never_evicts_the_entry_it_returns(tmp_path):
+    wheel = make_wheel(tmp_path, "big", "1.0")
+    size = wheel.stat().st_size
+    cache = DownloadCache(tmp_path / "cache", max_bytes=size - 1)
+    assert cache.add(wheel) is None and cache.find("big") is None
+
+    cache.max_bytes = size + 1
+    old = cache.add(make_wheel(tmp_path, "old", "1.0"))
+    os.utime(old.parent, (0, 0))
+    stored = cache.add(wheel)
+    assert stored.exists() and cache.find("big") == stored
+    assert cache.find("old") is None
+
+
+def test_metadata_is_read_from_the_dist_info_member_only(tmp_path):
+    wheel = make_wheel(tmp_path, "big", "3.1", ["numpy>=1.20", "torch; sys_platform == 'linux'"])
+    with zipfile.ZipFile(wheel, "a") as zf:
+        zf.writestr("vendored-0.1.dist-info/METADATA", "Name: vendored\nVersion: 0.1\n")
+        zf.writestr("big/payload.bin", os.urandom(1024))
+    assert PythonPackageImporter()._inspect_metadata(wheel) == (
+        "big", "3.1", ["numpy>=1.20", "torch; sys_platform == 'linux'"])
+
+
+def test_sdist_metadata_prefers_top_level_pkg_info(tmp_path):
+    sdist = tmp_path / "tool-0.5.tar.gz"
+    with tarfile.open(sdist, "w:gz") as tar:
+        for name, text in (("tool-0.5/src/tool.egg-info/PKG-INFO", "Name: tool\nVersion: 0.0\n"),
+                           ("tool-0.5/PKG-INFO", "Metadata-Version: 2.1\nName: tool\nVersion: 0.5\n"
+                                                 "Requires-Dist: click\nRequires-Dist: rich>=10;\n"
+                                                 "  python_version >= '3.8'\n\nLong description: ignored\n")):
+            data = text.encode()
+            info = tarfile.TarInfo(name)
+            info.size = len(data)
+            tar.addfile(info, io.BytesIO(data))
+    assert PythonPackageImporter()._inspect_metadata(sdist) == (
+        "tool", "0.5", ["click", "rich>=10; python_version >= '3.8'"])
+
+
+def test_metadata_does_not_depend_on_the_file_name(tmp_path):
+    renamed = tmp_path / "local_build.whl"
+    make_wheel(tmp_path, "tool", "2.0", ["click"]).rename(renamed)
+    assert PythonPackageImporter()._inspect_metadata(renamed) == ("tool", "2.0", ["click"])
+
+    (tmp_path / "junk.whl").write_bytes(b"not a zip")
+    with pytest.raises(PythonImporterError, match="junk.whl"):
+        PythonPackageImporter()._inspect_metadata(tmp_path / "junk.whl")
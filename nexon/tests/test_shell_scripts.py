@@ -0,0 +1,85 @@
+import os
+import shutil
+import subprocess
+
+import pytest
+
+from nexon_cli.core.activation_cache import ActivationCache
+from nexon_cli.core.shell_scripts import SHELLS, render_script, write_activation_scripts
+from nexon_cli.utils.file_ops import save_yaml
+
+# Source the script, then dump the resulting environment NUL-separated
+SHELL_COMMANDS = {
+    "bash": ["bash", "-c", 'source "$0"; env -0'],
+    "zsh": ["zsh", "-c", 'source "$0"; env -0'],
+    "fish": ["fish", "-c", 'source $argv[1]; env -0'],
+}
+
+
+@pytest.fixture
+def env(tmp_path):
+    pkg_dir = tmp_path / "packages"
+    for name, env_vars in (("core", {"PATH": "{root}/bin", "QUOTED": 'say "$HOME" `x` \\ it\'s'}),
+                           ("tool", {"PATH": "{root}/bin:{PATH}", "EMPTY": "{PATH}", "NEW": "{root}/lib"})):
+        ver_dir = pkg_dir / name / "1.0"
+        ver_dir.mkdir(parents=True)
+        save_yaml(ver_dir / "package.yaml", {"name": name, "version": "1.0", "env": env_vars})
+    env_file = tmp_path / "env1.yaml"
+    save_yaml(env_file, {"name": "env1", "packages": ["core-1.0", "tool-1.0"]})
+    return env_file, ActivationCache(pkg_dir, cache_dir=tmp_path / "activation")
+
+
+@pytest.mark.parametrize("shell", sorted(SHELL_COMMANDS))
+def test_sourced_script_matches_activation(env, shell):
+    if not shutil.which(shell):
+        pytest.skip(f"{shell} not installed")
+    env_file, cache = env
+    script = write_activation_scripts("env1", env_file, shells=[shell], cache=cache)[shell]
+    start = {"PATH": os.environ["PATH"], "HOME": "/home/artist"}
+
+    out = subprocess.run([*SHELL_COMMANDS[shell], str(script)], env=start, capture_output=True, check=True).stdout
+    sourced = dict(item.split("=", 1) for item in out.decode().split("\0") if "=" in item)
+
+    expected = cache.env_vars("env1", env_file, start)
+    for key, value in expected.items():
+        assert sourced.get(key, "") == value, key
+    assert sourced["NEXON_ENV"] == "env1"
+
+
+def test_deactivate_restores_environment(env):
+    env_file, cache = env
+    script = write_activation_scripts("env1", env_file, shells=["bash"], cache=cache)["bash"]
+    start = {"PATH": os.environ["PATH"], "QUOTED": "before"}
+    out = subprocess.run(["bash", "-c", 'source "$0"; nexon_deactivate; env -0', str(script)],
+                         env=start, capture_output=True, check=True).stdout
+    after = dict(item.split("=", 1) for item in out.decode().split("\0") if "=" in item)
+    assert after["PATH"] == start["PATH"] and after["QUOTED"] == "before"
+    assert "NEW" not in after and "NEXON_ENV" not in after
+
+
+def test_scripts_regenerate_only_when_inputs_change(env, tmp_path):
+    env_file, cache = env
+    paths = write_activation_scripts("env1", env_file, shells=SHELLS, cache=cache)
+    assert set(paths) == set(SHELLS)
+    mtimes = {shell: path.stat().st_mtime_ns for shell, path in paths.items()}
+    os.utime(paths["bash"], ns=(1, 1))
+
+    write_activation_scripts("env1", env_file, shells=SHELLS, cache=cache)
+    assert paths["bash"].stat().st_mtime_ns == 1
+    assert paths["fish"].stat().st_mtime_ns == mtimes["fish"]
+
+    save_yaml(tmp_path / "packages" / "tool" / "1.0" / "package.yaml",
+              {"name": "tool", "version": "1.0", "env": {"NEW": "changed"}})
+    write_activation_scripts("env1", env_file, shells=["bash"], cache=cache)
+    assert "changed" in paths["bash"].read_text()
+    assert "$env:NEW = " in render_script("powershell", "env1", cache.load("env1", env_file))
+
+
+def test_scripts_are_opt_in(env, monkeypatch):
+    env_file, cache = env
+    monkeypatch.delenv("NEXON_ACTIVATION_SCRIPTS", raising=False)
+    assert write_activation_scripts("env1", env_file, cache=cache) == {}
+    assert not (cache.cache_dir / "env1").exists()
+
+    monkeypatch.setenv("NEXON_ACTIVATION_SCRIPTS", "bash, fish")
+    assert set(write_activation_scripts("env1", env_file, cache=cache)) == {"bash", "fish"}
@@ -0,0 +1,40 @@
+import pytest
+from packaging.specifiers import SpecifierSet
+from packaging.version import Version
+
+from nexon_cli.core.version_table import VersionTable
+
+VERSIONS = [
+    "0.9", "1.0a1", "1.0b2", "1.0rc1", "1.0", "1.0.0.post1", "1.0+local", "1.0.1", "1.1.dev0",
+    "1.1", "1.4.5", "1.4.9", "1.5", "2.0", "2.0.1", "2.2", "2.9", "3.0.dev1", "3.0", "1!0.5",
+]
+
+SPECS = [
+    "", ">=1.0", ">1.0", "<=1.0", "<1.0", "==1.0", "==1.0.0", "~=1.4.5", "~=2.2", ">=1.0,<2",
+    ">1.0,<=2.0.1", "!=1.1", "==1.*", ">=1.0,!=1.5,<3", "==1.0+local", "<1!0", ">=3.0.dev0",
+    "~=1.0rc1", "<=0.9", ">9",
+]
+
+
+@pytest.fixture(scope="module")
+def table():
+    return VersionTable.from_strings("pkg", VERSIONS)
+
+
+@pytest.mark.parametrize("spec", SPECS)
+def test_match_agrees_with_linear_scan(table, spec):
+    spec_set = SpecifierSet(spec)
+    expected = sorted((Version(v) for v in VERSIONS if Version(v) in spec_set), reverse=True)
+    assert table.match(spec_set) == expected
+
+
+def test_best_and_keys(table):
+    assert table.best(SpecifierSet("<2")) == Version("1.5")
+    assert table.best(SpecifierSet(">9,<1!0")) is None
+    assert table.key_of(Version("1.0.0.post1")) == "1.0.0.post1"
+    assert table.newest_first[0] == Version("1!0.5")
+
+
+def test_invalid_versions_are_skipped():
+    table = VersionTable.from_strings("pkg", ["1.0", "not-a-version"])
+    assert len(table) == 1